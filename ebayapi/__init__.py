@@ -1,2 +1,15 @@
 # ebayapi/__init__.py
 from .ebayapi import EbayAPI
+from .ad_report import AdReportTable
+from .cache import ResponseCache
+from .finances import TransactionIndex
+from .fulfillment import FulfillmentLedger
+from .inventory_sync import InventorySnapshot, load_stock_table
+from .instrumentation import HistogramCollector
+from .log import configure_logging
+from .message_queue import MessageQueue
+from .notifications import NotificationReceiver, NotificationServer, OrderStore
+from .ratelimit import RateLimiter
+from .reconciliation import ReconciliationTable
+from .token_cache import TokenCache
+from .records import Ad, Listing, Order, Transaction
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Promoted Listings 广告报告的本地表示。
+
+将 ad_report_task 生成的 TSV 报告逐行解析为以 (listing_id, day) 为键的本地表，
+花费、销售额和 ROAS 等汇总查询直接在本地完成，无需再逐单扫描 Finances 交易。
+"""
+import csv
+import re
+
+# 报告列名（规范化后）到内部字段名的映射
+_COLUMN_ALIASES = {
+    'listing_id': 'listing_id',
+    'item_id': 'listing_id',
+    'day': 'day',
+    'date': 'day',
+    'impressions': 'impressions',
+    'clicks': 'clicks',
+    'sale_quantity': 'sale_quantity',
+    'sold_quantity': 'sale_quantity',
+    'quantity_sold': 'sale_quantity',
+    'sales': 'sales',
+    'sale_amount': 'sales',
+    'sales_amount': 'sales',
+    'ad_fees': 'spend',
+    'ad_fee': 'spend',
+    'ad_fees_amount': 'spend',
+    'spend': 'spend',
+}
+
+_METRIC_FIELDS = ('impressions', 'clicks', 'sale_quantity', 'sales', 'spend')
+
+
+def _normalize_column(name: str) -> str:
+    """'Ad fees (USD)' -> 'ad_fees'；'listingId' -> 'listing_id'。"""
+    name = re.sub(r'\(.*?\)', '', name or '')
+    name = re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name.strip())
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def _parse_number(value) -> float:
+    """解析报告中的数值，兼容 '$1,234.56'、'12%'、空值等格式。"""
+    if value is None:
+        return 0.0
+    cleaned = re.sub(r'[^0-9.\-]', '', str(value))
+    if cleaned in ('', '-', '.', '-.'):
+        return 0.0
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0.0
+
+
+class AdReportTable:
+    """
+    以 (listing_id, day) 为键的广告效果本地表。
+
+    每行保存 impressions、clicks、sale_quantity、sales、spend 五项指标；
+    同一键重复出现时（例如同一商品在多个活动中）指标会累加。
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add_row(self, listing_id: str, day: str, metrics: dict):
+        """累加一行指标到 (listing_id, day)。"""
+        key = (str(listing_id), str(day))
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = {field: 0.0 for field in _METRIC_FIELDS}
+        for field in _METRIC_FIELDS:
+            row[field] += metrics.get(field, 0.0)
+
+    def load_tsv(self, lines) -> int:
+        """
+        从 TSV 文本行（可迭代对象，逐行读取，不整体载入内存）中解析报告。
+        报告开头可能包含说明性文字，遇到含 listing 列的表头行后才开始读取数据。
+
+        返回:
+            int: 读取的数据行数
+        """
+        reader = csv.reader(lines, delimiter='\t')
+        columns = None
+        count = 0
+        for record in reader:
+            if not record or not any(cell.strip() for cell in record):
+                continue
+            if columns is None:
+                normalized = [_COLUMN_ALIASES.get(_normalize_column(cell)) for cell in record]
+                if 'listing_id' in normalized:
+                    columns = normalized
+                continue
+
+            values = dict(zip(columns, record))
+            listing_id = (values.get('listing_id') or '').strip()
+            if not listing_id:
+                continue
+            day = (values.get('day') or '').strip()[:10]
+            metrics = {field: _parse_number(values.get(field)) for field in _METRIC_FIELDS if field in values}
+            self.add_row(listing_id, day, metrics)
+            count += 1
+        return count
+
+    def _iter_rows(self, listing_id=None, date_from: str = None, date_to: str = None):
+        for (row_listing_id, day), row in self.rows.items():
+            if listing_id is not None and row_listing_id != str(listing_id):
+                continue
+            if date_from and day < date_from:
+                continue
+            if date_to and day > date_to:
+                continue
+            yield row_listing_id, day, row
+
+    def summary_by_listing(self, date_from: str = None, date_to: str = None) -> dict:
+        """
+        按商品汇总指标。
+
+        参数:
+            date_from / date_to: 'YYYY-MM-DD' 格式的日期范围（含两端），可选
+
+        返回:
+            dict: {listing_id: {'impressions', 'clicks', 'sale_quantity', 'sales', 'spend', 'roas'}}
+        """
+        summary = {}
+        for listing_id, _, row in self._iter_rows(date_from=date_from, date_to=date_to):
+            total = summary.get(listing_id)
+            if total is None:
+                total = summary[listing_id] = {field: 0.0 for field in _METRIC_FIELDS}
+            for field in _METRIC_FIELDS:
+                total[field] += row[field]
+        for total in summary.values():
+            total['roas'] = total['sales'] / total['spend'] if total['spend'] else None
+        return summary
+
+    def totals(self, listing_id=None, date_from: str = None, date_to: str = None) -> dict:
+        """
+        汇总整个表（或单个商品）在日期范围内的指标。
+
+        返回:
+            dict: {'impressions', 'clicks', 'sale_quantity', 'sales', 'spend', 'roas'}
+        """
+        total = {field: 0.0 for field in _METRIC_FIELDS}
+        for _, _, row in self._iter_rows(listing_id, date_from, date_to):
+            for field in _METRIC_FIELDS:
+                total[field] += row[field]
+        total['roas'] = total['sales'] / total['spend'] if total['spend'] else None
+        return total
+
+    def spend_for_listing(self, listing_id, date_from: str = None, date_to: str = None) -> float:
+        """返回单个商品在日期范围内的广告花费。"""
+        return self.totals(listing_id, date_from, date_to)['spend']
+
+    def to_dataframe(self):
+        """转换为 pandas DataFrame（列：listing_id, day 及各项指标）。"""
+        import pandas as pd
+        records = [dict(listing_id=listing_id, day=day, **row) for (listing_id, day), row in self.rows.items()]
+        return pd.DataFrame(records, columns=['listing_id', 'day', *_METRIC_FIELDS])
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+ebayapi-auth：一条命令完成 Refresh Token 的获取与写入。
+
+代替 getRefresh_token 目录下的三个手动步骤（capture_code.py → exchange_code.py → calculate_expiry.py → 手动编辑
+ebay_rest.json）：启动本地回调服务器并打开授权页面，收到回调后自动用授权码换取 Refresh Token，
+计算 refresh_token_expiry，并以原子方式写回配置文件。
+
+    ebayapi-auth login --config ebay_rest.json --application prod --user seller1
+    ebayapi-auth status --config ebay_rest.json --user seller1
+    # 定时任务：Refresh Token 剩余有效期不足 30 天时才重新授权
+    ebayapi-auth login --config ebay_rest.json --application prod --user seller1 --if-expiring-within 30
+
+公网 HTTPS 回调地址仍需由 ngrok 等工具转发到本地端口，并配置在 eBay 后台的 RuName 中（见 getRefresh_token/readme.md）。
+"""
+import argparse
+import base64
+import http.server
+import json
+import os
+import secrets
+import sys
+import tempfile
+import time
+import webbrowser
+from datetime import datetime, timedelta, timezone
+from html import escape
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import requests
+
+AUTHORIZE_URL = 'https://auth.ebay.com/oauth2/authorize'
+TOKEN_URL = 'https://api.ebay.com/identity/v1/oauth2/token'
+
+# 与 ebay_rest 默认申请的用户 scope 一致
+DEFAULT_SCOPES = (
+    'https://api.ebay.com/oauth/api_scope',
+    'https://api.ebay.com/oauth/api_scope/sell.inventory',
+    'https://api.ebay.com/oauth/api_scope/sell.marketing',
+    'https://api.ebay.com/oauth/api_scope/sell.account',
+    'https://api.ebay.com/oauth/api_scope/sell.fulfillment',
+)
+
+
+def expiry_string(seconds_from_now: int, now: datetime = None) -> str:
+    """把有效期秒数转换为 ebay_rest.json 要求的时间字符串，如 2027-03-14T07:06:14.000Z。"""
+    expiry = (now or datetime.now(timezone.utc)) + timedelta(seconds=int(seconds_from_now))
+    return expiry.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def parse_expiry(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def authorization_url(app_id: str, ru_name: str, scopes, state: str) -> str:
+    query = {'client_id': app_id, 'response_type': 'code', 'redirect_uri': ru_name,
+             'scope': ' '.join(scopes), 'state': state}
+    return f'{AUTHORIZE_URL}?{urlencode(query)}'
+
+
+def exchange_code(app_id: str, cert_id: str, ru_name: str, code: str, timeout: int = 30) -> dict:
+    """
+    用授权码换取令牌（与 exchange_code.py 相同的请求）。
+
+    返回:
+        dict: eBay 返回的令牌数据（access_token、refresh_token、refresh_token_expires_in 等）
+    异常:
+        RuntimeError: eBay 返回错误
+    """
+    credentials = base64.b64encode(f'{app_id}:{cert_id}'.encode('utf-8')).decode('utf-8')
+    response = requests.post(TOKEN_URL, timeout=timeout, headers={
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'Authorization': f'Basic {credentials}',
+    }, data={'grant_type': 'authorization_code', 'code': code, 'redirect_uri': ru_name})
+    if response.status_code != 200:
+        raise RuntimeError(f'换取令牌失败（HTTP {response.status_code}）: {response.text}')
+    return response.json()
+
+
+def _user_token_section(config: dict, user: str) -> dict:
+    """返回保存 refresh_token 的配置节：用户下有 token 对象时写入其中，否则直接写入用户配置。"""
+    user_config = config.setdefault('users', {}).setdefault(user, {})
+    token = user_config.get('token')
+    return token if isinstance(token, dict) else user_config
+
+
+def read_refresh_token_expiry(config_path: str, user: str) -> datetime:
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    value = _user_token_section(config, user).get('refresh_token_expiry')
+    return parse_expiry(value) if value else None
+
+
+def write_refresh_token(config_path: str, user: str, refresh_token: str, refresh_token_expiry: str):
+    """把 refresh_token 和 refresh_token_expiry 写回配置文件（先写临时文件再替换，保留其他内容和文件权限）。"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    section = _user_token_section(config, user)
+    section['refresh_token'] = refresh_token
+    section['refresh_token_expiry'] = refresh_token_expiry
+
+    directory = os.path.dirname(os.path.abspath(config_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4, ensure_ascii=False)
+        f.write('\n')
+    os.chmod(tmp_path, os.stat(config_path).st_mode & 0o777)
+    os.replace(tmp_path, config_path)
+
+
+class _CallbackHandler(http.server.BaseHTTPRequestHandler):
+    """接收 eBay 授权回调，与 capture_code.py 的处理方式相同，捕获后自动交给后续步骤。"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        if 'code' in query:
+            if query.get('state', [None])[0] != self.server.expected_state:
+                self._respond(400, '<h1>state 参数不匹配，已忽略此回调。</h1>')
+                return
+            self.server.auth_code = query['code'][0]
+            self._respond(200, '<h1>✅ 授权成功</h1><p>可以关闭此页面，返回终端查看结果。</p>')
+        elif 'error' in query:
+            self.server.auth_error = query.get('error_description', query['error'])[0]
+            self._respond(200, f'<h1>授权失败</h1><p>{escape(self.server.auth_error)}</p>')
+        else:
+            self._respond(200, '<p>服务器正在运行，等待来自 eBay 的授权跳转...</p>')
+
+    def _respond(self, status: int, html: str):
+        body = f'<html><body style="font-family: sans-serif; text-align: center; padding-top: 50px;">{html}' \
+               f'</body></html>'.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def capture_code(port: int, state: str, timeout: int) -> str:
+    """启动本地回调服务器，等待授权码（超时或用户拒绝授权时抛出 RuntimeError）。"""
+    with http.server.HTTPServer(('', port), _CallbackHandler) as httpd:
+        httpd.expected_state = state
+        httpd.auth_code = None
+        httpd.auth_error = None
+        httpd.timeout = 1
+        deadline = time.monotonic() + timeout
+        while httpd.auth_code is None and httpd.auth_error is None:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'{timeout} 秒内没有收到授权回调')
+            httpd.handle_request()
+        if httpd.auth_error:
+            raise RuntimeError(f'用户未授权: {httpd.auth_error}')
+        return httpd.auth_code
+
+
+def _load_app(config_path: str, application: str) -> tuple:
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    try:
+        return config['applications'][application], config.get('users', {})
+    except KeyError:
+        raise SystemExit(f'配置文件中没有应用 {application}')
+
+
+def cmd_login(args) -> int:
+    if args.if_expiring_within is not None:
+        expiry = read_refresh_token_expiry(args.config, args.user)
+        if expiry and expiry - datetime.now(timezone.utc) > timedelta(days=args.if_expiring_within):
+            print(f'Refresh Token 有效期至 {expiry.isoformat()}，无需更新。')
+            return 0
+
+    app, users = _load_app(args.config, args.application)
+    ru_name = args.ru_name or app.get('redirect_uri')
+    if not ru_name:
+        raise SystemExit('需要 --ru-name，或在应用配置中设置 redirect_uri')
+    scopes = args.scopes or (users.get(args.user) or {}).get('scopes') or DEFAULT_SCOPES
+
+    state = secrets.token_urlsafe(16)
+    url = authorization_url(app['app_id'], ru_name, scopes, state)
+    print(f'本地回调服务器已在 http://localhost:{args.port} 启动，请确保 ngrok 正在转发到此端口。')
+    print(f'请在浏览器中完成授权：\n\n    {url}\n')
+    if not args.no_browser:
+        webbrowser.open(url)
+
+    code = capture_code(args.port, state, args.timeout)
+    print('已收到授权码，正在换取 Refresh Token...')
+    token_data = exchange_code(app['app_id'], app['cert_id'], ru_name, code)
+    refresh_token = token_data.get('refresh_token')
+    if not refresh_token:
+        raise RuntimeError(f'响应中没有 refresh_token: {token_data}')
+    expiry = expiry_string(token_data.get('refresh_token_expires_in', 47304000))
+    write_refresh_token(args.config, args.user, refresh_token, expiry)
+    print(f'🎉 已更新 {args.config} 中用户 {args.user} 的 Refresh Token，有效期至 {expiry}。')
+    return 0
+
+
+def cmd_status(args) -> int:
+    expiry = read_refresh_token_expiry(args.config, args.user)
+    if expiry is None:
+        print(f'用户 {args.user} 没有 Refresh Token。')
+        return 1
+    remaining = expiry - datetime.now(timezone.utc)
+    print(f'Refresh Token 有效期至 {expiry.isoformat()}（剩余 {remaining.days} 天）。')
+    return 0 if remaining > timedelta(days=args.warn_days) else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='ebayapi-auth', description='获取并写入 eBay Refresh Token')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    login = subparsers.add_parser('login', help='运行授权流程并把 Refresh Token 写入配置文件')
+    login.add_argument('--config', default='ebay_rest.json', help='ebay_rest.json 路径')
+    login.add_argument('--application', required=True, help='配置文件中的应用名')
+    login.add_argument('--user', required=True, help='配置文件中的用户名')
+    login.add_argument('--ru-name', help='RuName，默认取应用配置中的 redirect_uri')
+    login.add_argument('--scopes', nargs='+', help='申请的 scope，默认取用户配置中的 scopes')
+    login.add_argument('--port', type=int, default=8000, help='本地回调端口（ngrok 转发的端口）')
+    login.add_argument('--timeout', type=int, default=600, help='等待授权回调的秒数')
+    login.add_argument('--no-browser', action='store_true', help='不自动打开浏览器，只打印授权地址')
+    login.add_argument('--if-expiring-within', type=int, metavar='DAYS',
+                       help='只有 Refresh Token 在 DAYS 天内过期时才重新授权（用于定时任务）')
+    login.set_defaults(func=cmd_login)
+
+    status = subparsers.add_parser('status', help='查看 Refresh Token 的有效期')
+    status.add_argument('--config', default='ebay_rest.json', help='ebay_rest.json 路径')
+    status.add_argument('--user', required=True, help='配置文件中的用户名')
+    status.add_argument('--warn-days', type=int, default=30, help='剩余天数少于该值时以退出码 1 结束')
+    status.set_defaults(func=cmd_status)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (RuntimeError, OSError, requests.RequestException) as e:
+        print(f'错误: {e}', file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
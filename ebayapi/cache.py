@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+只读调用的响应缓存。
+
+按 (操作名, 规范化参数) 缓存结果，支持：
+    - 每个操作单独设置 TTL
+    - 内存 LRU（条目数上限）
+    - 可选的磁盘缓存（JSON 文件，可在多个脚本/进程间共享，同样有条目数上限；目录权限为 0700）
+    - 按操作名显式失效（EbayAPI 在自身执行写操作后调用）
+
+条目以 JSON 文本保存（datetime、date、set、Decimal 带类型标记），每次命中都解码出新的对象，
+调用方修改返回值不会影响之后的命中。磁盘缓存不使用 pickle，共享目录中的文件不会被当作代码执行。
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+# 各只读操作的默认 TTL（秒）
+DEFAULT_TTLS = {
+    'get_all_listings': 600,
+    'get_all_campaigns': 300,
+    'get_campaign_ads': 300,
+    'get_orders_last_days': 60,
+}
+
+
+def _cache_key(params) -> str:
+    canonical = json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def _encode_value(obj):
+    """json.dumps 的 default：为 JSON 不支持的常见类型加上类型标记，其余类型转为字符串。"""
+    if isinstance(obj, datetime):
+        return {'__datetime__': obj.isoformat()}
+    if isinstance(obj, date):
+        return {'__date__': obj.isoformat()}
+    if isinstance(obj, (set, frozenset)):
+        try:
+            items = sorted(obj)
+        except TypeError:
+            items = list(obj)
+        return {'__set__': items}
+    if isinstance(obj, Decimal):
+        return {'__decimal__': str(obj)}
+    return str(obj)
+
+
+def _decode_value(obj: dict):
+    """json.loads 的 object_hook：还原 _encode_value 标记的类型。"""
+    if len(obj) == 1:
+        key, value = next(iter(obj.items()))
+        if key == '__datetime__':
+            return datetime.fromisoformat(value)
+        if key == '__date__':
+            return date.fromisoformat(value)
+        if key == '__set__':
+            return set(value)
+        if key == '__decimal__':
+            return Decimal(value)
+    return obj
+
+
+def dumps(value) -> str:
+    return json.dumps(value, default=_encode_value, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(text: str):
+    return json.loads(text, object_hook=_decode_value)
+
+
+class ResponseCache:
+    """
+    参数:
+        max_entries: 内存中最多保留的条目数（LRU 淘汰）
+        directory: 磁盘缓存目录，None 表示只用内存
+        max_disk_entries: 磁盘上最多保留的条目数（按最近访问时间淘汰）
+        ttls: {操作名: 秒} 覆盖 DEFAULT_TTLS
+        default_ttl: 未配置 TTL 的操作使用的默认值
+    """
+
+    def __init__(self, max_entries: int = 128, directory: str = None, max_disk_entries: int = 1024,
+                 ttls: dict = None, default_ttl: int = 300):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def ttl_for(self, operation: str) -> int:
+        return self.ttls.get(operation, self.default_ttl)
+
+    def _disk_path(self, operation: str, key: str) -> str:
+        return os.path.join(self.directory, operation, f'{key}.json')
+
+    def get(self, operation: str, params):
+        """
+        返回:
+            tuple: (是否命中, 缓存值)
+        """
+        key = _cache_key(params)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((operation, key))
+            if entry is not None:
+                expires_at, text = entry
+                if expires_at > now:
+                    self._memory.move_to_end((operation, key))
+                    self.hits += 1
+                    return True, loads(text)
+                del self._memory[(operation, key)]
+
+            if self.directory:
+                path = self._disk_path(operation, key)
+                try:
+                    # 文件格式：第一行为过期时间戳，第二行为 JSON 编码的值
+                    with open(path, 'r', encoding='utf-8') as f:
+                        expires_at, text = f.read().split('\n', 1)
+                    expires_at = float(expires_at)
+                    value = loads(text)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning("读取磁盘缓存失败 %s: %s", path, e)
+                else:
+                    if expires_at > now:
+                        os.utime(path)
+                        self._remember(operation, key, expires_at, text)
+                        self.hits += 1
+                        return True, value
+                    self._remove_file(path)
+
+            self.misses += 1
+            return False, None
+
+    def set(self, operation: str, params, value, ttl: int = None):
+        """写入缓存，ttl 默认取该操作配置的 TTL。"""
+        ttl = self.ttl_for(operation) if ttl is None else ttl
+        if ttl <= 0:
+            return
+        key = _cache_key(params)
+        expires_at = time.time() + ttl
+        text = dumps(value)
+        with self._lock:
+            self._remember(operation, key, expires_at, text)
+            if self.directory:
+                self._write_disk(operation, key, expires_at, text)
+
+    def _remember(self, operation: str, key: str, expires_at: float, text: str):
+        self._memory[(operation, key)] = (expires_at, text)
+        self._memory.move_to_end((operation, key))
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _write_disk(self, operation: str, key: str, expires_at: float, text: str):
+        path = self._disk_path(operation, key)
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            # 先写临时文件再替换，避免其他进程读到写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(f'{expires_at!r}\n{text}')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("写入磁盘缓存失败 %s: %s", path, e)
+            return
+        self._prune_disk()
+
+    def _disk_files(self) -> list:
+        files = []
+        for root, _, names in os.walk(self.directory):
+            files.extend(os.path.join(root, name) for name in names if name.endswith('.json'))
+        return files
+
+    def _prune_disk(self):
+        files = self._disk_files()
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=lambda path: os.path.getmtime(path))
+        for path in files[:len(files) - self.max_disk_entries]:
+            self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def invalidate(self, *operations: str):
+        """使指定操作的所有缓存条目失效；不传参数时清空全部缓存。"""
+        with self._lock:
+            if not operations:
+                self._memory.clear()
+            else:
+                for cache_key in [k for k in self._memory if k[0] in operations]:
+                    del self._memory[cache_key]
+            if self.directory:
+                for path in self._disk_files():
+                    operation = os.path.basename(os.path.dirname(path))
+                    if not operations or operation in operations:
+                        self._remove_file(path)
+        logger.debug("缓存已失效: %s", ', '.join(operations) if operations else '全部')
+
+    def clear(self):
+        self.invalidate()
@@ -1,14 +1,99 @@
 # -*- coding: utf-8 -*-
+import copy
+import gzip
+import inspect
+import io
 import json
+import logging
+import math
 import os
-import sys
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
+from urllib.parse import urlparse
+
+import requests
+import urllib3
 from ebay_rest import API, Error
 from ebaysdk.trading import Connection as Trading
 from ebaysdk.exception import ConnectionError
 
-from datetime import datetime, timezone, timedelta
-from dateutil import parser
+from .ad_report import AdReportTable
+from .cache import ResponseCache
+from .finances import TransactionIndex, is_advertising_fee
+from .fulfillment import FulfillmentLedger
+from .reconciliation import ReconciliationTable
+from .instrumentation import Instrumentation, InstrumentedRestClient, make_event
+from .inventory_sync import InventorySnapshot, diff_inventory, load_stock_table
+from .message_queue import MessageQueue
+from .notifications import ORDER_EVENTS, NotificationReceiver, OrderStore
+from .parsing import TradingResponseStream, iter_xml_records, parse_trading_page
+from .ratelimit import RateLimiter
+from .singleflight import SingleFlight
+from .token_cache import TokenCache
+from .records import Listing
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _snake_to_camel(snake_str: str) -> str:
+    """
+    将 snake_case 字段名转换为 camelCase（与 API 文档一致）。
+    字段名集合有限，按字符串缓存转换结果，避免每次调用重复拆分拼接。
+    """
+    components = snake_str.split('_')
+    return components[0] + ''.join(x.capitalize() for x in components[1:])
+
+
+def _normalize_keys(obj):
+    """递归地将字典的 snake_case 键转换为 camelCase。"""
+    if isinstance(obj, dict):
+        return {_snake_to_camel(k): _normalize_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_normalize_keys(item) for item in obj]
+    return obj
+
+
+def _coalesce_key_default(value):
+    """内部方法：合并键中 datetime 参数的序列化；其他无法 JSON 序列化的参数抛出 TypeError。"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'无法作为合并键的参数类型: {type(value).__name__}')
+
+
+def _coalesced(method):
+    """
+    只读方法的装饰器：同一实例上参数相同的并发调用只执行一次，其余线程等待并拿到结果的深拷贝
+    （见 ebayapi.singleflight）。参数无法确定地序列化为合并键时不合并，直接执行。
+    """
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.coalesce_requests:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = {name: value for name, value in bound.arguments.items() if name != 'self'}
+        try:
+            key = (method.__name__, json.dumps(params, sort_keys=True, default=_coalesce_key_default))
+        except (TypeError, ValueError) as e:
+            logger.debug("%s 的参数不能作为合并键，不合并: %s", method.__name__, e)
+            return method(self, *args, **kwargs)
+        result, shared = self.single_flight.do(key, lambda: method(self, *args, **kwargs), copy=copy.deepcopy)
+        if shared:
+            logger.debug("%s 复用了进行中的相同请求", method.__name__)
+        return result
+
+    return wrapper
+
 
 class EbayAPI:
     """
@@ -16,14 +101,75 @@ class EbayAPI:
     支持订单、交易、商品刊登等常用操作。
     """
 
-    def __init__(self, application: str, user: str, config_path: str, marketplace_id: str = 'EBAY_US'):
+    # Marketing 批量接口（bulkCreateAds 等）单次请求允许的最大条目数
+    MARKETING_BULK_LIMIT = 500
+    # 批量接口中可自动重试的逐条目状态码（限流与服务端临时错误）
+    RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+    # Trading 调用 Ack 为 Failure 时仍可重试的错误码（10007 内部错误，518 调用次数超限）
+    TRADING_RETRYABLE_ERROR_CODES = ('10007', '518')
+    # REST API 的生产环境根地址（用于 ebay_rest 未覆盖的分页/下载请求）
+    REST_BASE_URL = 'https://api.ebay.com'
+    # Trading API 的域名与协议（回放测试时可在实例上改为本地桩服务器）
+    TRADING_DOMAIN = 'api.ebay.com'
+    TRADING_HTTPS = True
+    # 跨进程共享的用户访问令牌缓存（见 ebayapi.token_cache），为 None 时每个进程各自向 ebay_rest 取令牌
+    token_cache = None
+    # 响应录制器（见 ebayapi.replay），为 None 时不录制
+    recorder = None
+    # 埋点事件分发器（见 ebayapi.instrumentation），注册第一个钩子时创建
+    instrumentation = None
+    # 只读调用的响应缓存（见 ebayapi.cache），调用 enable_cache 后启用
+    cache = None
+    # 交易索引（TransactionIndex）的复用时间（秒）与最多保留的索引个数
+    TRANSACTION_INDEX_TTL = 300
+    TRANSACTION_INDEX_LIMIT = 8
+    # 已拉取的交易索引，首次查询时在实例上创建
+    _transaction_indexes = None
+    # getTransactions 支持的服务端过滤条件：参数名 -> API 字段名
+    FINANCE_FILTER_FIELDS = {
+        'transaction_type': 'transactionType',
+        'transaction_status': 'transactionStatus',
+        'payout_id': 'payoutId',
+        'order_id': 'orderId',
+        'buyer_username': 'buyerUsername',
+        'sales_record_reference': 'salesRecordReference',
+    }
+    # 有调用频率限制的接口：调用名 -> (窗口内最大次数, 窗口秒数)，同一实例的所有线程共享额度
+    RATE_LIMITS = {
+        'AddMemberMessageAAQToPartner': (75, 60),
+        'ReviseInventoryStatus': (100, 60),
+    }
+    # ReviseInventoryStatus 单次调用最多修改的商品数
+    REVISE_INVENTORY_LIMIT = 4
+    # 按调用名创建的限流器，首次使用时在实例上创建
+    _rate_limiters = None
+    # 是否合并并发的相同只读调用（get_all_listings、get_campaign_ads 等），见 ebayapi.singleflight
+    coalesce_requests = True
+    # 进行中的只读调用，首次使用时在实例上创建
+    _single_flight = None
+    # 写操作（Trading 调用名 / 批量接口操作名）执行时需要失效的缓存操作
+    CACHE_INVALIDATIONS = {
+        'AddItem': ('get_all_listings',),
+        'CompleteSale': ('get_orders_last_days', 'get_all_listings'),
+        'ReviseInventoryStatus': ('get_all_listings',),
+        'createShippingFulfillment': ('get_orders_last_days',),
+        'bulk_create_ads': ('get_campaign_ads',),
+        'bulk_update_ads_bid': ('get_campaign_ads',),
+        'bulk_delete_ads': ('get_campaign_ads',),
+    }
+
+    def __init__(self, application: str, user: str, config_path: str, marketplace_id: str = 'EBAY_US',
+                 token_cache=None):
         """
         初始化 EbayAPI 类，加载配置并创建 API 客户端。
+        token_cache: TokenCache 实例或缓存文件路径；多个进程使用同一文件时共享有效的访问令牌
         """
         self.application = application
         self.user = user
         self.config_path = config_path
         self.marketplace_id = marketplace_id
+        if token_cache is not None:
+            self.token_cache = token_cache if isinstance(token_cache, TokenCache) else TokenCache(token_cache)
         self._load_config()
 
         self.access_token = None
@@ -51,38 +197,553 @@ class EbayAPI:
         获取 access_token 并创建 API 实例。
         """
         try:
-            print("正在初始化 eBay REST API 客户端...")
+            logger.debug("正在初始化 eBay REST API 客户端...")
             self.api_rest = API(path='.', application=self.application, user=self.user, header='US')
-            # 获取 access_token 以供 Trading API 使用
-            self.access_token = self.api_rest._user_token.get()
+            # 获取 access_token 以供 Trading API 使用（启用令牌缓存时优先读取缓存）
+            self.access_token = self._user_access_token()
             if not self.access_token:
-                print("通过 REST API 客户端获取 access_token 失败。", file=sys.stderr)
+                logger.error("通过 REST API 客户端获取 access_token 失败。")
                 return
 
-            print("正在初始化 eBay Trading API 客户端...")
-            self.api_trading = Trading(
-                token=self.access_token,
-                config_file=None,
-                appid=self.APP_ID,
-                devid=self.DEV_ID,
-                certid=self.CERT_ID,
-                siteid='0',
-                environment='production'
-            )
-            print("API 客户端初始化成功。")
+            logger.debug("正在初始化 eBay Trading API 客户端...")
+            self.api_trading = self._new_trading_connection()
+            logger.info("API 客户端初始化成功。")
 
         except Error as e:
-            print(f"初始化 REST API 客户端失败: {e}", file=sys.stderr)
+            logger.error("初始化 REST API 客户端失败: %s", e)
         except ConnectionError as e:
-            print(f"初始化 Trading API 客户端失败: {e}", file=sys.stderr)
+            logger.error("初始化 Trading API 客户端失败: %s", e)
+        except Exception as e:
+            logger.error("API 初始化过程中发生未知错误: %s", e)
+
+
+    def _instance_lock(self, name: str, factory):
+        """
+        内部方法：返回实例自己的锁，首次使用时创建并保存在实例上。
+        不放在 __init__ 中创建，是因为回放环境和测试通过 __new__ 创建实例。
+        """
+        lock = self.__dict__.get(name)
+        if lock is None:
+            lock = self.__dict__.setdefault(name, factory())
+        return lock
+
+    @property
+    def _state_lock(self):
+        """保护实例上延迟创建的共享对象（single-flight、埋点分发器）。"""
+        return self._instance_lock('_state_lock_instance', threading.RLock)
+
+    @property
+    def _rate_limiters_lock(self):
+        """保护按调用名创建限流器的字典。"""
+        return self._instance_lock('_rate_limiters_lock_instance', threading.Lock)
+
+    def _user_access_token(self) -> str:
+        """
+        内部方法：返回有效的用户访问令牌。
+        启用 token_cache 时先在文件锁内读取共享缓存，命中时把令牌注入 ebay_rest，不发起 OAuth 请求；
+        缓存缺失或即将过期时由持锁的进程通过 ebay_rest 刷新并写回缓存。
+        """
+        user_token = self.api_rest._user_token
+        if self.token_cache is None or not self._supports_token_cache(user_token):
+            return user_token.get()
+
+        # 不持有实例锁：并发刷新由 TokenCache 的文件锁串行化，后到的线程在锁内直接读到新令牌
+        return self._cached_user_access_token(user_token)
+
+    @staticmethod
+    def _oauth_token_class():
+        """ebay_rest 内部的令牌类；当前安装的版本中不存在时返回 None。"""
+        try:
+            from ebay_rest.token import _OAuthToken
+        except ImportError:
+            return None
+        return _OAuthToken
+
+    # 令牌缓存路径用到的 ebay_rest UserToken 内部属性（按 ebay_rest 1.1 实现）
+    _USER_TOKEN_INTERNALS = ('_user_token', '_user_scopes', '_determine_user_scopes')
+
+    @classmethod
+    def _supports_token_cache(cls, user_token) -> bool:
+        """
+        令牌缓存依赖 ebay_rest 的私有实现，其中任何一项缺失（ebay_rest 版本变化）时返回 False，
+        调用方退回 user_token.get()，即不使用缓存的普通路径。
+        """
+        if not all(hasattr(user_token, name) for name in cls._USER_TOKEN_INTERNALS):
+            logger.warning("当前 ebay_rest 版本的 UserToken 不支持令牌缓存，改为直接获取令牌。")
+            return False
+        if cls._oauth_token_class() is None:
+            logger.warning("当前 ebay_rest 版本缺少 _OAuthToken，改为直接获取令牌。")
+            return False
+        return True
+
+    def _cached_user_access_token(self, user_token) -> str:
+        """内部方法：_user_access_token 的令牌缓存路径。"""
+        if user_token._user_scopes is None:
+            user_token._determine_user_scopes()
+        current = user_token._user_token
+        if current is not None and current.token_expiry is not None:
+            expiry = current.token_expiry.replace(tzinfo=timezone.utc)
+            if expiry - timedelta(minutes=5) > datetime.now(timezone.utc):
+                return current.access_token
+
+        def refresh():
+            access_token = user_token.get()
+            return access_token, user_token._user_token.token_expiry
+
+        access_token, expiry, from_cache = self.token_cache.get_or_refresh(
+            self.application, self.user, user_token._user_scopes, refresh)
+        if from_cache:
+            # ebay_rest 内部按 naive UTC 时间判断令牌是否过期
+            oauth_token = self._oauth_token_class()
+            user_token._user_token = oauth_token(access_token=access_token,
+                                                 token_expiry=expiry.astimezone(timezone.utc).replace(tzinfo=None))
+            logger.debug("使用缓存的访问令牌（%s 过期）", expiry.isoformat())
+        return access_token
+
+    def add_instrumentation_hook(self, hook):
+        """
+        注册埋点钩子。每次 Trading 调用、REST 调用和 to_dict_recursive 转换结束后，
+        钩子会收到一个事件 dict（字段见 ebayapi.instrumentation）。
+        可直接注册内置收集器：api.add_instrumentation_hook(HistogramCollector())
+        """
+        with self._state_lock:
+            if self.instrumentation is None:
+                self.instrumentation = Instrumentation()
+                if self.api_rest is not None and not isinstance(self.api_rest, InstrumentedRestClient):
+                    self.api_rest = InstrumentedRestClient(self.api_rest, self.instrumentation)
+            self.instrumentation.add_hook(hook)
+
+    def remove_instrumentation_hook(self, hook):
+        """移除已注册的埋点钩子。"""
+        if self.instrumentation is not None:
+            self.instrumentation.remove_hook(hook)
+
+    def enable_cache(self, directory: str = None, max_entries: int = 128, ttls: dict = None,
+                     cache: ResponseCache = None) -> ResponseCache:
+        """
+        启用只读调用的响应缓存（get_all_listings / get_active_listings、get_all_campaigns、
+        get_campaign_ads、get_orders_last_days）。
+
+        参数:
+            directory: 磁盘缓存目录，多个脚本指向同一目录即可共享缓存；None 表示只用内存
+            max_entries: 内存缓存的最大条目数
+            ttls: {操作名: 秒}，覆盖默认 TTL（见 ebayapi.cache.DEFAULT_TTLS）
+            cache: 直接使用已有的 ResponseCache 实例（忽略以上参数）
+
+        返回:
+            ResponseCache: 当前使用的缓存对象
+        """
+        self.cache = cache or ResponseCache(max_entries=max_entries, directory=directory, ttls=ttls)
+        return self.cache
+
+    def disable_cache(self):
+        """停用响应缓存（已写入磁盘的条目保留）。"""
+        self.cache = None
+
+    def invalidate_cache(self, *operations: str):
+        """使指定操作的缓存失效；不传参数时清空全部缓存。"""
+        if self.cache is not None:
+            self.cache.invalidate(*operations)
+
+    def _cache_params(self, params: dict) -> dict:
+        """缓存键包含账号和站点，避免不同账号共享同一磁盘缓存目录时串数据。"""
+        return dict(params, _account=(getattr(self, 'application', None), getattr(self, 'user', None),
+                                      self.marketplace_id))
+
+    def _cache_get(self, operation: str, params: dict):
+        """内部方法：查询缓存，返回 (是否命中, 缓存值)。未启用缓存时总是未命中。"""
+        if self.cache is None:
+            return False, None
+        hit, value = self.cache.get(operation, self._cache_params(params))
+        if hit:
+            logger.debug("%s 命中缓存", operation)
+        return hit, value
+
+    def _cache_set(self, operation: str, params: dict, value):
+        """内部方法：写入缓存（仅在启用缓存时）。"""
+        if self.cache is not None:
+            self.cache.set(operation, self._cache_params(params), value)
+
+    def _invalidate_for_write(self, operation: str):
+        """
+        内部方法：写操作返回后（无论成功与否）使受影响的缓存失效。
+        在写操作之后执行，避免写入期间的并发读取把写入前的数据重新缓存一个 TTL。
+        """
+        if self.cache is not None and operation in self.CACHE_INVALIDATIONS:
+            self.cache.invalidate(*self.CACHE_INVALIDATIONS[operation])
+
+    def _trading_execute(self, connection, verb: str, data=None, page: int = None, rate_limit_wait: float = 0.0,
+                         **kwargs):
+        """
+        内部方法：执行 Trading 调用，并在启用埋点时记录耗时和收发字节数。
+        rate_limit_wait 为调用前因限流等待的秒数（_throttle 的返回值），记录在埋点事件中。
+        """
+        if connection is self.api_trading:
+            connection = self._thread_trading_connection()
+        if self.instrumentation is None:
+            try:
+                return connection.execute(verb, data, **kwargs)
+            finally:
+                self._invalidate_for_write(verb)
+
+        start = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = connection.execute(verb, data, **kwargs)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            request_body = getattr(getattr(connection, 'request', None), 'body', None)
+            content = getattr(response, 'content', None)
+            if content is None and error is not None:
+                content = getattr(getattr(error, 'response', None), 'content', None)
+            self.instrumentation.emit(make_event(
+                'trading', verb, time.perf_counter() - start,
+                bytes_sent=len(request_body) if request_body is not None else None,
+                bytes_received=len(content) if content is not None else None,
+                page=page,
+                rate_limit_wait=rate_limit_wait,
+                success=error is None,
+                error=str(error) if error is not None else None
+            ))
+            self._invalidate_for_write(verb)
+
+    def _trading_execute_raw(self, connection, verb: str, data=None, page: int = None) -> bytes:
+        """
+        内部方法：发送 Trading 请求并返回原始响应 XML，不在当前进程中解析。
+        Ack 失败等业务错误需由调用方在解析结果中检查；HTTP 错误抛出 ConnectionError。
+        """
+        if connection is self.api_trading:
+            connection = self._thread_trading_connection()
+        start = time.perf_counter()
+        connection._reset()
+        connection.build_request(verb, data, None)
+        try:
+            connection.execute_request()
+            response = connection.response
+            if response.status_code != 200:
+                raise ConnectionError(f"{verb}: HTTP {response.status_code} {response.reason}", response)
+        except Exception as e:
+            if self.instrumentation is not None:
+                self.instrumentation.emit(make_event('trading', verb, time.perf_counter() - start,
+                                                     page=page, success=False, error=str(e)))
+            raise
+        finally:
+            connection.session.close()
+            self._invalidate_for_write(verb)
+
+        content = response.content
+        if self.instrumentation is not None:
+            request_body = connection.request.body
+            self.instrumentation.emit(make_event(
+                'trading', verb, time.perf_counter() - start,
+                bytes_sent=len(request_body) if request_body is not None else None,
+                bytes_received=len(content), page=page
+            ))
+        if self.recorder is not None:
+            self.recorder.record_trading(verb, page or 1, content, data)
+        return content
+
+    @staticmethod
+    def _trading_parse_config(connection, verb: str) -> tuple:
+        """内部方法：取出连接对象中与 verb 相关的列表节点和 datetime 节点，供离线解析使用。"""
+        prefix = f"{verb.lower()}response."
+        list_nodes = [node for node in connection.base_list_nodes if node.startswith(prefix)]
+        return list_nodes, list(connection.datetime_nodes)
+
+    def _iter_trading_records(self, verb: str, build_call_data, container: str, element: str,
+                              has_more_tag: str):
+        """
+        内部方法：逐页拉取 Trading 响应并用 TradingResponseStream 流式解析，逐条产出记录字典。
+        使用独立的连接对象，生成器在两次迭代之间可以安全地穿插其他调用。
+        Ack 失败时抛出 ConnectionError。
+        """
+        connection = self._new_trading_connection()
+        list_nodes, datetime_nodes = self._trading_parse_config(connection, verb)
+        page_number = 1
+        started = time.perf_counter()
+        total = 0
+        while True:
+            content = self._trading_execute_raw(connection, verb, build_call_data(page_number), page=page_number)
+            stream = TradingResponseStream(content, verb, container, element, list_nodes, datetime_nodes)
+            for record in stream:
+                yield record
+            if stream.error:
+                logger.error("%s 第 %s 页调用失败: %s", verb, page_number, stream.error)
+                raise ConnectionError(stream.error)
+            total += stream.count
+            logger.debug("%s 第 %s 页（%s 条）", verb, page_number, stream.count)
+            if stream.fields.get(has_more_tag, 'false') == 'false':
+                break
+            page_number += 1
+        duration = time.perf_counter() - started
+        logger.info("%s 流式拉取完成，共 %s 条（%s 页，%.2f 秒）。", verb, total, page_number, duration,
+                    extra={'operation': verb, 'count': total, 'pages': page_number, 'duration': duration})
+
+    def _iter_trading_pages_in_processes(self, verb: str, build_call_data, container: str, element: str,
+                                         has_more_tag: str, process_workers: int):
+        """
+        内部方法：在当前线程中逐页拉取 Trading 响应，把原始 XML 交给进程池解析和转换，
+        按页码顺序产出 (页码, 解析结果)。拉取下一页与解析前几页并行进行。
+
+        参数:
+            build_call_data: 接收页码、返回请求数据的函数
+            container / element: 记录所在节点，如 ItemArray / Item
+            has_more_tag: 表示还有下一页的节点名，如 HasMoreItems
+            process_workers: 解析进程数
+
+        返回:
+            generator: (page_number, {'ack', 'error', 'records', 'duration'})
+        """
+        connection = self._thread_trading_connection()
+        list_nodes, datetime_nodes = self._trading_parse_config(connection, verb)
+        has_more_marker = f"<{has_more_tag}>true</{has_more_tag}>".encode()
+
+        with ProcessPoolExecutor(max_workers=process_workers) as executor:
+            pending = deque()
+            page_number = 1
+            while True:
+                content = self._trading_execute_raw(connection, verb, build_call_data(page_number), page=page_number)
+                pending.append((page_number, executor.submit(parse_trading_page, content, verb, list_nodes,
+                                                             datetime_nodes, container, element)))
+                # 已解析完成的页先交给调用方，避免结果全部堆积在内存中
+                while pending and pending[0][1].done():
+                    yield self._parsed_page(verb, *pending.popleft())
+                # 只检查原始字节中的翻页标记，无需等待子进程解析完成
+                if has_more_marker not in content:
+                    break
+                page_number += 1
+            while pending:
+                yield self._parsed_page(verb, *pending.popleft())
+
+    def _parsed_page(self, verb: str, page_number: int, future) -> tuple:
+        result = future.result()
+        if self.instrumentation is not None:
+            self.instrumentation.emit(make_event('convert', verb, result['duration'],
+                                                 page=page_number, records=len(result['records'])))
+        logger.debug("%s 第 %s 页解析完成（%s 条）", verb, page_number, len(result['records']))
+        return page_number, result
+
+    def _convert_records(self, objs, operation: str, page: int = None) -> list:
+        """
+        内部方法：用 to_dict_recursive 转换一批 SDK 对象，启用埋点时记录转换耗时。
+        """
+        if self.instrumentation is None:
+            return [self.to_dict_recursive(obj) for obj in objs]
+
+        start = time.perf_counter()
+        records = [self.to_dict_recursive(obj) for obj in objs]
+        self.instrumentation.emit(make_event('convert', operation, time.perf_counter() - start,
+                                             page=page, records=len(records)))
+        return records
+
+    def get_rate_limiter(self, verb: str) -> RateLimiter:
+        """返回调用 verb 使用的限流器（按 RATE_LIMITS 创建）；没有频率限制的调用返回 None。"""
+        if verb not in self.RATE_LIMITS:
+            return None
+        with self._rate_limiters_lock:
+            if self._rate_limiters is None:
+                self._rate_limiters = {}
+            limiter = self._rate_limiters.get(verb)
+            if limiter is None:
+                limiter = self._rate_limiters[verb] = RateLimiter(*self.RATE_LIMITS[verb])
+            return limiter
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        """合并并发只读调用的 SingleFlight 对象（executed / shared 为执行和复用的次数）。"""
+        if self._single_flight is None:
+            with self._state_lock:
+                if self._single_flight is None:
+                    self._single_flight = SingleFlight()
+        return self._single_flight
+
+    def _throttle(self, verb: str) -> float:
+        """内部方法：按 RATE_LIMITS 等待调用额度，返回等待的秒数。"""
+        limiter = self.get_rate_limiter(verb)
+        if limiter is None:
+            return 0.0
+        waited = limiter.acquire()
+        if waited:
+            logger.debug("%s 达到频率限制，等待 %.1f 秒", verb, waited)
+        return waited
+
+    def _thread_trading_connection(self):
+        """
+        返回当前线程使用的 Trading 连接：主线程使用 api_trading，
+        其他线程各自创建并复用一个连接（ebaysdk 的连接对象不能在线程间共享）。
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.api_trading
+        local = self.__dict__.get('_thread_local')
+        if local is None:
+            local = self.__dict__.setdefault('_thread_local', threading.local())
+        connection = getattr(local, 'trading', None)
+        if connection is None:
+            connection = local.trading = self._new_trading_connection()
+        return connection
+
+    def _new_trading_connection(self) -> Trading:
+        """
+        创建一个新的 Trading API 连接对象。
+        ebaysdk 的连接对象在调用之间保存请求状态（verb、response 等），
+        需要独立状态的调用（图片上传、AddItem、并发请求）应各自使用新连接。
+        """
+        connection = Trading(
+            token=self.access_token,
+            config_file=None,
+            appid=self.APP_ID,
+            devid=self.DEV_ID,
+            certid=self.CERT_ID,
+            siteid='0',
+            environment='production',
+            domain=self.TRADING_DOMAIN
+        )
+        if not self.TRADING_HTTPS:
+            connection.config.set('https', False, force=True)
+        if self.recorder is not None:
+            connection = self.recorder.wrap_trading(connection)
+        return connection
+
+    def _rest_request(self, method: str, path: str, params: dict = None, body: dict = None,
+                      headers: dict = None, timeout: int = 60, stream: bool = False) -> requests.Response:
+        """
+        内部方法：直接发送 REST API 请求。
+        用于 ebay_rest 不支持的场景（如显式指定 offset 的单页查询、报告文件下载）。
+
+        参数:
+            method: HTTP 方法（GET/POST/...）
+            path: 以 / 开头的 API 路径，或完整 URL
+            params: 查询参数
+            body: JSON 请求体
+            headers: 额外请求头
+            stream: 是否以流式方式读取响应体（用于下载大文件）
+
+        返回:
+            requests.Response: 已检查状态码的响应对象（非 2xx 时抛出 requests.HTTPError）
+        """
+        url = path if path.startswith('http') else f"{self.REST_BASE_URL}{path}"
+        request_headers = {
+            # 每次从 ebay_rest 取 token，过期时由其自动刷新
+            'Authorization': f"Bearer {self._user_access_token()}",
+            'Accept': 'application/json',
+            'X-EBAY-C-MARKETPLACE-ID': self.marketplace_id,
+        }
+        if body is not None:
+            request_headers['Content-Type'] = 'application/json'
+        if headers:
+            request_headers.update(headers)
+
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, params=params, json=body,
+                                        headers=request_headers, timeout=timeout, stream=stream)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if self.instrumentation is not None:
+                self.instrumentation.emit(make_event('rest', f"{method} {urlparse(url).path}",
+                                                     time.perf_counter() - start, success=False, error=str(e)))
+            raise
+        if self.instrumentation is not None:
+            self.instrumentation.emit(make_event(
+                'rest', f"{method} {urlparse(url).path}", time.perf_counter() - start,
+                bytes_sent=len(response.request.body or b'') if response.request is not None else None,
+                bytes_received=None if stream else len(response.content)
+            ))
+        if self.recorder is not None and not stream:
+            self.recorder.record_http(method, path, params, response)
+        return response
+
+    @classmethod
+    def _finance_filter(cls, filters: dict) -> str:
+        """
+        内部方法：把过滤参数转换为 getTransactions 的 filter 语法（不含 transactionDate），
+        如 {'transaction_type': ['SALE', 'REFUND']} -> 'transactionType:{REFUND|SALE}'。
+        值的顺序不影响结果，便于判断两次查询能否复用同一索引。
+        """
+        parts = []
+        for name, value in sorted(filters.items()):
+            if value is None:
+                continue
+            if name not in cls.FINANCE_FILTER_FIELDS:
+                raise ValueError(f"不支持的交易过滤条件: {name}，可选: {', '.join(cls.FINANCE_FILTER_FIELDS)}")
+            values = [value] if isinstance(value, str) else sorted(str(v) for v in value)
+            parts.append(f"{cls.FINANCE_FILTER_FIELDS[name]}:{{{'|'.join(values)}}}")
+        return ','.join(parts)
+
+    @_coalesced
+    def get_transaction_index(self, date_from: datetime, date_to: datetime, **filters) -> TransactionIndex:
+        """
+        获取 [date_from, date_to] 时间窗口内交易记录的索引。
+        若 TRANSACTION_INDEX_TTL 秒内已拉取过覆盖该窗口、过滤条件相同的索引则复用（只保留窗口内的交易），
+        否则拉取一次并建立索引。
+
+        参数:
+            date_from: 窗口开始时间（datetime，无时区时按 UTC）
+            date_to: 窗口结束时间
+            **filters: 服务端过滤条件（见 FINANCE_FILTER_FIELDS），值可以是字符串或列表，例如
+                transaction_type='NON_SALE_CHARGE'
+                transaction_type=['SALE', 'REFUND'], transaction_status='PAYOUT'
+                payout_id='6123456789'
+
+        返回:
+            TransactionIndex: 可按订单号、payout 号、交易号查询；调用失败时返回 None
+        """
+        if not self.api_rest:
+            logger.error("REST API 客户端未初始化，无法查询交易信息。")
+            return None
+
+        filter_extra = self._finance_filter(filters)
+
+        now = time.time()
+        # 索引列表在锁内读取和替换（不原地修改），拉取交易时不持有锁
+        with self._state_lock:
+            self._transaction_indexes = [index for index in self._transaction_indexes or ()
+                                         if now - index.created_at < self.TRANSACTION_INDEX_TTL]
+            cached = next((index for index in self._transaction_indexes
+                           if index.covers(date_from, date_to, filter_extra or None)), None)
+        if cached is not None:
+            narrowed = cached.window(date_from, date_to)
+            logger.debug("复用已拉取的交易索引（%s 条记录中的 %s 条）", len(cached), len(narrowed))
+            return narrowed
+
+        # 格式化为 Zulu (UTC) 格式
+        date_from_zulu = date_from.strftime('%Y-%m-%dT%H:%M:%SZ')
+        date_to_zulu = date_to.strftime('%Y-%m-%dT%H:%M:%SZ')
+        filter_query = f"transactionDate:[{date_from_zulu}..{date_to_zulu}]"
+        if filter_extra:
+            filter_query = f"{filter_query},{filter_extra}"
+        logger.debug("生成的 API 查询过滤器: %s", filter_query)
+
+        try:
+            started = time.perf_counter()
+            response = self.api_rest.sell_finances_get_transactions(filter=filter_query, x_ebay_c_marketplace_id=self.marketplace_id)
+            index = TransactionIndex(date_from=date_from, date_to=date_to, filter_query=filter_extra or None)
+            for tx_wrapper in response:
+                record = tx_wrapper.get('record')
+                if isinstance(record, dict):
+                    index.add(record)
         except Exception as e:
-            print(f"API 初始化过程中发生未知错误: {e}", file=sys.stderr)
+            logger.error("调用 API 或处理数据时发生错误: %s", e)
+            return None
 
+        duration = time.perf_counter() - started
+        logger.info("拉取 %s 至 %s 的交易记录 %s 条并建立索引（过滤条件: %s，%.2f 秒）。",
+                    date_from_zulu, date_to_zulu, len(index), filter_extra or '无', duration,
+                    extra={'operation': 'getTransactions', 'count': len(index), 'duration': duration})
+        with self._state_lock:
+            indexes = list(self._transaction_indexes or ()) + [index]
+            self._transaction_indexes = indexes[-self.TRANSACTION_INDEX_LIMIT:]
+        return index
 
     def get_transactions_for_order(self, order_id: str, order_date: datetime, days_window: int = 2) -> list:
         """
         获取指定订单ID的所有交易信息。
         以 order_date 为中心，搜索前后 days_window 天范围内的交易。
+        窗口内的交易只拉取一次并建立索引（见 get_transaction_index），同一窗口内的多个订单查询直接命中索引。
         参数：
             order_id: 订单ID
             order_date: 订单时间（datetime对象）
@@ -90,79 +751,81 @@ class EbayAPI:
         返回：交易信息列表
         """
         if not self.api_rest:
-            print("REST API 客户端未初始化，无法查询交易信息。", file=sys.stderr)
+            logger.error("REST API 客户端未初始化，无法查询交易信息。")
             return []
 
         # 验证 order_date 必须是 datetime 对象
         if not isinstance(order_date, datetime):
             error_msg = f"错误: order_date 必须是 datetime 对象，实际类型: {type(order_date)}"
-            print(error_msg, file=sys.stderr)
+            logger.error(error_msg)
             raise TypeError(error_msg)
-        
-        # # 确保 datetime 对象有时区信息，如果没有则假定为 UTC
-        # if order_date.tzinfo is None:
-        #     dt_utc = order_date.replace(tzinfo=timezone.utc)
-        #     print(f"订单时间无时区信息，假定为UTC: {order_date} -> {dt_utc}")
-        # else:
-        #     # 转换为 UTC 时区
-        #     dt_utc = order_date.astimezone(timezone.utc)
-        #     print(f"订单时间转换为UTC: {order_date} -> {dt_utc}")
-        
-        # print(f"成功处理订单时间: {dt_utc}")
 
         # 计算查询窗口
         date_from = order_date - timedelta(days=days_window)
         date_to = order_date + timedelta(days=days_window)
 
-        # 格式化为 Zulu (UTC) 格式
-        date_from_zulu = date_from.strftime('%Y-%m-%dT%H:%M:%SZ')
-        date_to_zulu = date_to.strftime('%Y-%m-%dT%H:%M:%SZ')
-
-        filter_query = f"transactionDate:[{date_from_zulu}..{date_to_zulu}]"
-        print(f"生成的 API 查询过滤器: {filter_query}")
+        index = self.get_transaction_index(date_from, date_to)
+        if index is None:
+            return []
 
-        try:
-            response = self.api_rest.sell_finances_get_transactions(filter=filter_query, x_ebay_c_marketplace_id=self.marketplace_id)
-    
-            all_transactions = list(response)
-            if not all_transactions:
-                return []
+        order_transactions = index.by_order(order_id)
+        logger.debug("订单 %s: 从 %s 条交易记录中找到 %s 条相关记录。", order_id, len(index), len(order_transactions))
+        return order_transactions
 
-            # 筛选与订单ID相关的交易
-            order_transactions = []
-            print(f"正在从 {len(all_transactions)} 条记录中筛选与订单ID '{order_id}' 相关的交易...")
+    def get_transactions_for_orders(self, order_ids: list, date_from: datetime, date_to: datetime) -> dict:
+        """
+        批量查询多个订单的交易信息：窗口内的交易只拉取一次，每个订单按索引直接查找。
 
-            for tx_wrapper in all_transactions:
-                record = tx_wrapper.get('record')
-                if not isinstance(record, dict):
-                    continue
+        参数:
+            order_ids: 订单ID列表
+            date_from / date_to: 查询窗口，应覆盖这些订单的交易日期
 
-                found_order_id = record.get('order_id')
-                if not found_order_id:
-                    references = record.get('references', [])
-                    if isinstance(references, list):
-                        for ref in references:
-                            if isinstance(ref, dict) and ref.get('reference_type') == 'ORDER_ID':
-                                found_order_id = ref.get('reference_id')
-                                break
+        返回:
+            dict: {order_id: [交易记录, ...]}，调用失败时为空字典
+        """
+        index = self.get_transaction_index(date_from, date_to)
+        if index is None:
+            return {}
+        return {order_id: index.by_order(order_id) for order_id in order_ids}
 
-                if found_order_id == order_id:
-                    order_transactions.append(record)
+    def get_advertising_fees(self, date_from: datetime, date_to: datetime) -> dict:
+        """
+        获取时间窗口内的全部 Promoted Listings 广告费。
+        服务端只返回 NON_SALE_CHARGE 类型的交易，不再拉取并扫描销售、退款等记录。
 
-            if not order_transactions:
-                print(f"成功查询交易，但未找到与订单 {order_id} 相关的交易信息。")
-            else:
-                print(f"已找到 {len(order_transactions)} 条与订单 {order_id} 相关的交易记录。")
+        返回:
+            dict: {'success': bool, 'fees': [交易记录], 'by_order': {order_id: 金额合计},
+                   'total': float, 'currency': str, 'error': str}
+        """
+        index = self.get_transaction_index(date_from, date_to, transaction_type='NON_SALE_CHARGE')
+        if index is None:
+            return {'success': False, 'fees': [], 'by_order': {}, 'total': 0.0, 'currency': None,
+                    'error': '获取交易记录失败'}
 
-            return order_transactions
+        fees = [tx for tx in index if is_advertising_fee(tx)]
+        by_order = {}
+        total = 0.0
+        currency = None
+        for tx in fees:
+            amount_data = tx.get('amount') or {}
+            amount = float(amount_data.get('value', 0) or 0)
+            currency = currency or amount_data.get('currency')
+            total += amount
+            order_ids = [ref.get('reference_id') for ref in tx.get('references') or []
+                         if isinstance(ref, dict) and ref.get('reference_type') == 'ORDER_ID']
+            order_id = tx.get('order_id') or (order_ids[0] if order_ids else None)
+            if order_id:
+                by_order[order_id] = by_order.get(order_id, 0.0) + amount
 
-        except Exception as e:
-            print(f"调用 API 或处理数据时发生错误: {e}", file=sys.stderr)
-            return []
+        logger.info("广告费: %s 条，合计 %.2f %s（涉及 %s 个订单）", len(fees), total, currency or '', len(by_order),
+                    extra={'operation': 'getAdvertisingFees', 'count': len(fees)})
+        return {'success': True, 'fees': fees, 'by_order': by_order, 'total': round(total, 2),
+                'currency': currency, 'error': None}
 
     def check_order_advertising_fees(self, order_id: str, order_date: datetime, days_window: int = 2) -> dict:
         """
         检查指定订单是否有相关的广告费扣款。
+        只向服务端请求 NON_SALE_CHARGE 类型的交易（广告费属于此类），再按订单号从索引中查找。
         
         参数:
             order_id: 订单ID
@@ -172,26 +835,20 @@ class EbayAPI:
         返回:
             dict: 广告费信息，包含是否有广告费、交易详情、金额等
         """
-        # 获取订单相关的所有交易
-        transactions = self.get_transactions_for_order(order_id, order_date, days_window)
-        
-        if not transactions:
-            return {
-                'has_advertising_fees': False,
-                'advertising_transaction': None,
-                'amount': None,
-                'currency': None,
-                'transaction_date': None,
-                'order_id': order_id
-            }
+        if not isinstance(order_date, datetime):
+            error_msg = f"错误: order_date 必须是 datetime 对象，实际类型: {type(order_date)}"
+            logger.error(error_msg)
+            raise TypeError(error_msg)
+
+        index = self.get_transaction_index(order_date - timedelta(days=days_window),
+                                           order_date + timedelta(days=days_window),
+                                           transaction_type='NON_SALE_CHARGE')
+        transactions = index.by_order(order_id) if index is not None else []
         
         # 查找广告费交易
-        ad_keyword = 'Promoted Listings'
         advertising_transaction = None
-        
         for transaction in transactions:
-            memo = transaction.get('transaction_memo', '')
-            if memo and ad_keyword in memo:
+            if is_advertising_fee(transaction):
                 advertising_transaction = transaction
                 break
         
@@ -216,53 +873,292 @@ class EbayAPI:
                 'order_id': order_id
             }
 
-    def get_orders_last_days(self, days=7, order_status='All') -> list:
+    @staticmethod
+    def _orders_request(create_time_from: datetime, create_time_to: datetime, order_status: str,
+                        page: int, entries_per_page: int = 100) -> dict:
+        """内部方法：构建 GetOrders 的分页请求数据（默认每页 100 条，为 GetOrders 的上限）。"""
+        return {
+            'CreateTimeFrom': create_time_from.isoformat(),
+            'CreateTimeTo': create_time_to.isoformat(),
+            'OrderStatus': order_status,
+            'Pagination': {'EntriesPerPage': entries_per_page, 'PageNumber': page}
+        }
+
+    @staticmethod
+    def _time_slices(start: datetime, end: datetime, slice_days: float) -> list:
+        """内部方法：把 [start, end] 按 slice_days 天切分为连续的时间段列表 [(from, to), ...]。"""
+        if not slice_days or slice_days <= 0:
+            return [(start, end)]
+        step = timedelta(days=slice_days)
+        slices = []
+        current = start
+        while current < end:
+            slices.append((current, min(current + step, end)))
+            current += step
+        return slices or [(start, end)]
+
+    def _get_orders_window(self, create_time_from: datetime, create_time_to: datetime, order_status: str) -> tuple:
+        """
+        内部方法：逐页拉取一个时间段内创建的订单，使用当前线程的 Trading 连接，可在工作线程中调用。
+
+        返回:
+            tuple: (订单列表, 页数, 是否完整)；Ack 失败时返回已拉取的部分，网络错误时抛出 ConnectionError
+        """
+        connection = self._thread_trading_connection()
+        orders = []
+        page_number = 1
+        while True:
+            request = self._orders_request(create_time_from, create_time_to, order_status, page_number)
+            response = self._trading_execute(connection, 'GetOrders', request, page=page_number)
+            if response.reply.Ack not in ['Success', 'Warning']:
+                logger.error("GetOrders API调用失败: %s", response.reply.Errors[0].LongMessage)
+                return orders, page_number, False
+
+            order_array = getattr(response.reply, 'OrderArray', None)
+            if not (order_array and hasattr(order_array, 'Order')):
+                break
+
+            orders.extend(self._convert_records(order_array.Order, 'GetOrders', page_number))
+            logger.debug("GetOrders %s ~ %s 第 %s 页（累计 %s 个）", create_time_from.date(), create_time_to.date(),
+                         page_number, len(orders))
+            if getattr(response.reply, 'HasMoreOrders', 'false') == 'false':
+                break
+            page_number += 1
+        return orders, page_number, True
+
+    def iter_orders(self, days: int = 7, order_status: str = 'All'):
+        """
+        流式获取最近 days 天的订单：直接解析原始 XML，每次产出一个订单字典（与 get_orders_last_days 的元素一致），
+        处理完的 XML 元素随即释放，适合订单量大、只需逐条处理的场景。
+
+        返回:
+            generator: 订单字典；调用失败时抛出 ConnectionError
+        """
+        now = datetime.now(timezone.utc)
+        create_time_from = now - timedelta(days=days)
+        return self._iter_trading_records(
+            'GetOrders', lambda page: self._orders_request(create_time_from, now, order_status, page),
+            'OrderArray', 'Order', 'HasMoreOrders')
+
+    @_coalesced
+    def get_orders_last_days(self, days=7, order_status='All', process_workers: int = None,
+                             max_workers: int = 4, slice_days: float = 7) -> list:
         """
         获取最近 days 天的订单列表。
-        参数：days 查询天数，order_status 订单状态
+        参数：days 查询天数，order_status 订单状态，
+              process_workers 解析进程数（设置后 XML 解析与转换在进程池中进行，适合大批量拉取；
+                              页数少时进程开销大于收益，且不按时间段并发，见 get_all_listings）
+              max_workers 并发拉取的线程数：时间窗口按 slice_days 天切分，各时间段并发分页拉取（每页 100 条），
+                          合并后按 OrderID 去重；为 1 时依次拉取各时间段
+              slice_days 每个时间段的天数，为 None 或 0 时不切分
         Order_status 可选值：
             - All: 所有订单
             - Active: 尚未确认付款的订单
             - Completed: 已付款 （已取消的订单也包含在内）
-        返回：订单列表
+        返回：订单列表（按时间段先后排列）
         """
         if not self.api_trading:
-            print("Trading API 客户端未初始化。", file=sys.stderr)
+            logger.error("Trading API 客户端未初始化。")
             return []
+        cache_params = {'days': days, 'order_status': order_status}
+        hit, cached = self._cache_get('get_orders_last_days', cache_params)
+        if hit:
+            return cached
         try:
             now = datetime.now(timezone.utc)
             create_time_from = now - timedelta(days=days)
             page_number = 1
             all_orders = []
-            while True:
-                request = {
-                    'CreateTimeFrom': create_time_from.isoformat(),
-                    'CreateTimeTo': now.isoformat(),
-                    'OrderStatus': order_status,
-                    'Pagination': {'EntriesPerPage': 50, 'PageNumber': page_number}
-                }
-                response = self.api_trading.execute('GetOrders', request)
-                if response.reply.Ack not in ['Success', 'Warning']:
-                    print(f"GetOrders API调用失败: {response.reply.Errors[0].LongMessage}", file=sys.stderr)
-                    break
-                
-                order_array = getattr(response.reply, 'OrderArray', None)
-                if not (order_array and hasattr(order_array, 'Order')):
-                    break
+            complete = True
+            started = time.perf_counter()
 
-                for order in order_array.Order:
-                    all_orders.append(self.to_dict_recursive(order))
-                
-                if getattr(response.reply, 'HasMoreOrders', 'false') == 'false':
-                    break
-                page_number += 1
+            def build_request(page):
+                return self._orders_request(create_time_from, now, order_status, page)
+
+            if process_workers:
+                for page_number, parsed in self._iter_trading_pages_in_processes(
+                        'GetOrders', build_request, 'OrderArray', 'Order', 'HasMoreOrders', process_workers):
+                    if parsed['error']:
+                        logger.error("GetOrders API调用失败: %s", parsed['error'])
+                        complete = False
+                        break
+                    all_orders.extend(parsed['records'])
+            else:
+                slices = self._time_slices(create_time_from, now, slice_days)
+
+                def fetch(window):
+                    return self._get_orders_window(window[0], window[1], order_status)
+
+                if len(slices) > 1 and max_workers > 1:
+                    with ThreadPoolExecutor(max_workers=min(max_workers, len(slices))) as executor:
+                        results = list(executor.map(fetch, slices))
+                else:
+                    results = [fetch(window) for window in slices]
+
+                page_number = 0
+                seen = set()
+                for orders, pages, ok in results:
+                    page_number += pages
+                    complete = complete and ok
+                    # 时间段边界上的订单可能被相邻两段同时返回
+                    for order in orders:
+                        order_id = order.get('OrderID')
+                        if order_id is not None:
+                            if order_id in seen:
+                                continue
+                            seen.add(order_id)
+                        all_orders.append(order)
+            duration = time.perf_counter() - started
+            logger.info("获取最近 %s 天的订单完成，共 %s 个（%s 页，%.2f 秒）。",
+                        days, len(all_orders), page_number, duration,
+                        extra={'operation': 'GetOrders', 'count': len(all_orders),
+                               'pages': page_number, 'duration': duration})
+            if complete:
+                self._cache_set('get_orders_last_days', cache_params, all_orders)
             return all_orders
         except ConnectionError as e:
-            print(f"GetOrders API连接或请求出错: {e.response.text if e.response else e}", file=sys.stderr)
+            logger.error("GetOrders API连接或请求出错: %s", e.response.text if e.response else e)
             return []
         except Exception as e:
-            print(f"处理GetOrders时发生未知错误: {e}", file=sys.stderr)
+            logger.error("处理GetOrders时发生未知错误: %s", e)
+            return []
+
+    @staticmethod
+    def _rest_datetime(value):
+        """内部方法：把 REST API 的 ISO 8601 时间转换为与 ebaysdk 一致的 naive UTC datetime。"""
+        if not value:
+            return None
+        if not isinstance(value, str):
+            return value
+        try:
+            # Python 3.11 之前的 fromisoformat 不接受 'Z' 后缀
+            dt = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+        except ValueError:
+            return value
+        return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+    @classmethod
+    def _fulfillment_order_to_trading(cls, order: dict) -> dict:
+        """
+        内部方法：把 Fulfillment API 的订单转换为 GetOrders 订单字典的结构，
+        使 _is_order_unshipped、records.Order、ReconciliationTable 等可以直接处理。
+        结果只是 GetOrders 字段的子集，与 GetOrders 的差异：
+            - 没有 ShippingDetails（运单号需另外查询 shipping_fulfillment）、CheckoutStatus、MonetaryDetails 等
+            - REST 不返回发货时间，已完成发货（FULFILLED）的订单和行项目以最后修改时间作为 ShippedTime
+            - TransactionID 为 REST 的 lineItemId，OrderLineItemID 由 legacyItemId 和 lineItemId 拼成，
+              不保证与 GetOrders 返回的值相同
+        """
+        order = _normalize_keys(order)
+        modified = cls._rest_datetime(order.get('lastModifiedDate'))
+
+        cancel_state = (order.get('cancelStatus') or {}).get('cancelState')
+        payment_status = order.get('orderPaymentStatus')
+        if cancel_state == 'CANCELED':
+            order_status = 'Cancelled'
+        elif cancel_state == 'IN_PROGRESS':
+            order_status = 'CancelPending'
+        elif payment_status in ('PENDING', 'FAILED'):
+            order_status = 'Active'
+        else:
+            order_status = 'Completed'
+
+        transactions = []
+        for line_item in order.get('lineItems') or []:
+            transaction = {
+                'TransactionID': line_item.get('lineItemId'),
+                'OrderLineItemID': f"{line_item.get('legacyItemId')}-{line_item.get('lineItemId')}",
+                'Item': {'ItemID': line_item.get('legacyItemId'), 'SKU': line_item.get('sku'),
+                         'Title': line_item.get('title')},
+                'QuantityPurchased': str(line_item.get('quantity', '')),
+                'TransactionPrice': {'value': (line_item.get('lineItemCost') or {}).get('value')},
+                'CreatedDate': cls._rest_datetime(order.get('creationDate')),
+            }
+            if line_item.get('legacyVariationId'):
+                transaction['Variation'] = {'SKU': line_item.get('sku')}
+            if line_item.get('lineItemFulfillmentStatus') == 'FULFILLED':
+                transaction['ShippedTime'] = modified
+            transactions.append(transaction)
+
+        payments = (order.get('paymentSummary') or {}).get('payments') or []
+        paid_time = cls._rest_datetime(payments[0].get('paymentDate')) if payments else None
+        result = {
+            'OrderID': order.get('orderId'),
+            'OrderStatus': order_status,
+            'OrderFulfillmentStatus': order.get('orderFulfillmentStatus'),
+            'BuyerUserID': (order.get('buyer') or {}).get('username'),
+            'CreatedTime': cls._rest_datetime(order.get('creationDate')),
+            'PaidTime': paid_time,
+            'Total': {'value': ((order.get('pricingSummary') or {}).get('total') or {}).get('value')},
+            'TransactionArray': {'Transaction': transactions},
+        }
+        if order.get('orderFulfillmentStatus') == 'FULFILLED':
+            result['ShippedTime'] = modified
+
+        instructions = order.get('fulfillmentStartInstructions') or []
+        shipping_step = (instructions[0].get('shippingStep') or {}) if instructions else {}
+        ship_to = shipping_step.get('shipTo') or {}
+        if ship_to:
+            address = ship_to.get('contactAddress') or {}
+            result['ShippingAddress'] = {
+                'Name': ship_to.get('fullName'),
+                'Street1': address.get('addressLine1'),
+                'Street2': address.get('addressLine2'),
+                'CityName': address.get('city'),
+                'StateOrProvince': address.get('stateOrProvince'),
+                'PostalCode': address.get('postalCode'),
+                'Country': address.get('countryCode'),
+                'Phone': (ship_to.get('primaryPhone') or {}).get('phoneNumber'),
+            }
+        if shipping_step.get('shippingServiceCode'):
+            result['ShippingServiceSelected'] = {'ShippingService': shipping_step['shippingServiceCode']}
+        return result
+
+    def iter_fulfillment_orders(self, days: int = 7, fulfillment_status=None, by_last_modified: bool = False):
+        """
+        通过 Fulfillment API（sell_fulfillment_get_orders，JSON，每页 200 个）流式获取订单，
+        产出 get_orders_last_days 元素结构的订单字典；只含常用字段，与 GetOrders 的差异见 _fulfillment_order_to_trading。
+
+        参数:
+            days: 查询最近多少天
+            fulfillment_status: 服务端按发货状态过滤，如 'NOT_STARTED' 或 ['NOT_STARTED', 'IN_PROGRESS']
+            by_last_modified: 按最后修改时间（lastmodifieddate）而不是创建时间（creationdate）筛选
+
+        返回:
+            generator: 订单字典；调用失败时抛出异常
+        """
+        if not self.api_rest:
+            raise RuntimeError('REST API client not initialized')
+        date_from = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        filters = [f"{'lastmodifieddate' if by_last_modified else 'creationdate'}:[{date_from}..]"]
+        if fulfillment_status:
+            statuses = [fulfillment_status] if isinstance(fulfillment_status, str) else list(fulfillment_status)
+            filters.append(f"orderfulfillmentstatus:{{{'|'.join(statuses)}}}")
+        filter_query = ','.join(filters)
+        logger.debug("Fulfillment getOrders 过滤条件: %s", filter_query)
+
+        for wrapper in self.api_rest.sell_fulfillment_get_orders(filter=filter_query):
+            record = wrapper.get('record') if isinstance(wrapper, dict) else None
+            if isinstance(record, dict):
+                yield self._fulfillment_order_to_trading(record)
+
+    @_coalesced
+    def get_fulfillment_orders(self, days: int = 7, fulfillment_status=None, by_last_modified: bool = False) -> list:
+        """
+        通过 Fulfillment API 获取最近 days 天的订单，参数见 iter_fulfillment_orders。
+        与 get_orders_last_days 相比不需要解析 XML，每页 200 个订单，并支持服务端按发货状态过滤。
+
+        返回：订单列表（get_orders_last_days 结构的子集，见 _fulfillment_order_to_trading）；失败时返回空列表
+        """
+        try:
+            started = time.perf_counter()
+            orders = list(self.iter_fulfillment_orders(days, fulfillment_status, by_last_modified))
+        except Exception as e:
+            logger.error("Fulfillment getOrders 调用失败: %s", e)
             return []
+        duration = time.perf_counter() - started
+        logger.info("通过 Fulfillment API 获取最近 %s 天的订单完成，共 %s 个（%.2f 秒）。", days, len(orders), duration,
+                    extra={'operation': 'getOrders', 'count': len(orders), 'duration': duration})
+        return orders
 
     def _is_order_unshipped(self, order: dict) -> bool:
         """
@@ -303,52 +1199,62 @@ class EbayAPI:
         # 默认情况下，如果没有明确的发货时间，认为是未发货
         return True
 
-    def get_orders_requiring_shipment(self, days=7) -> list:
+    @_coalesced
+    def get_orders_requiring_shipment(self, days=7, use_fulfillment_api: bool = False) -> list:
         """
         获取需要发货的订单（状态为Completed且未发货的订单）。
         只返回已付款但尚未发货的订单，供卖家处理发货。
         
         参数:
             days (int): 查询天数，默认7天
+            use_fulfillment_api (bool): 使用 Fulfillment API 在服务端按发货状态
+                （NOT_STARTED / IN_PROGRESS）过滤，不拉取已发货订单；REST 客户端不可用时改用 GetOrders。
+                返回的订单只含常用字段（没有 ShippingDetails 等，见 _fulfillment_order_to_trading），默认 False
             
         返回:
             list: 需要发货的订单列表
         """
-        if not self.api_trading:
-            print("Trading API 客户端未初始化。", file=sys.stderr)
+        if not self.api_trading and not (use_fulfillment_api and self.api_rest):
+            logger.error("Trading API 客户端未初始化。")
             return []
         
         try:
-            print(f"正在获取最近 {days} 天内需要发货的订单...")
+            logger.debug("正在获取最近 %s 天内需要发货的订单...", days)
             
-            # 获取已付款订单状态的订单
-            completed_orders = self.get_orders_last_days(days=days, order_status='Completed')
+            if use_fulfillment_api and self.api_rest:
+                # 部分发货（IN_PROGRESS）的订单仍有未发货的行项目，与 GetOrders 路径的判断保持一致
+                completed_orders = self.get_fulfillment_orders(days=days,
+                                                               fulfillment_status=['NOT_STARTED', 'IN_PROGRESS'])
+            else:
+                # 获取已付款订单状态的订单
+                completed_orders = self.get_orders_last_days(days=days, order_status='Completed')
             orders_requiring_shipment = []
             
             for order in completed_orders:
                 # 检查是否未发货且订单状态为Completed（未取消）
                 if self._is_order_unshipped(order) and order.get('OrderStatus') == 'Completed':
                     orders_requiring_shipment.append(order)
-            print(f"共找到 {len(orders_requiring_shipment)} 个需要发货的订单")
+            logger.info("共找到 %s 个需要发货的订单", len(orders_requiring_shipment))
             return orders_requiring_shipment
             
         except Exception as e:
-            print(f"获取需要发货订单时发生错误: {e}", file=sys.stderr)
+            logger.error("获取需要发货订单时发生错误: %s", e)
             return []
 
+    @_coalesced
     def get_active_listings(self) -> list:
         """
         获取所有在售商品列表。
         使用 get_all_listings 方法获取数据，然后筛选出在售商品。
         返回：在售商品列表
         """
-        print('正在获取在售商品...')
+        logger.debug('正在获取在售商品...')
         
         # 使用 get_all_listings 方法获取过去120天的所有商品（Coarse级别）
         all_listings = self.get_all_listings(days=120, granularity_level='Coarse')
         
         if not all_listings:
-            print("未获取到任何商品数据。")
+            logger.warning("未获取到任何商品数据。")
             return []
         
         # 筛选出在售商品
@@ -371,10 +1277,46 @@ class EbayAPI:
             if is_active:
                 active_items.append(item_dict)
         
-        print(f"从 {len(all_listings)} 个商品中筛选出 {len(active_items)} 个在售商品。")
+        logger.info("从 %s 个商品中筛选出 %s 个在售商品。", len(all_listings), len(active_items))
         return active_items
 
-    def get_all_listings(self, days: int = 120, granularity_level: str = 'Coarse') -> list:
+    @staticmethod
+    def _seller_list_request(start_time_from: datetime, start_time_to: datetime, granularity_level: str,
+                             page: int) -> dict:
+        """内部方法：构建 GetSellerList 的分页请求数据。"""
+        call_data = {
+            'StartTimeFrom': start_time_from.isoformat(),
+            'StartTimeTo': start_time_to.isoformat(),
+            'IncludeWatchCount': True,
+            'Pagination': {
+                'EntriesPerPage': 30,  # 建议使用较大的值以提高效率
+                'PageNumber': page
+            },
+        }
+
+        # 只有当granularity_level不为None时才添加GranularityLevel参数
+        if granularity_level is not None:
+            call_data['GranularityLevel'] = granularity_level
+        return call_data
+
+    def iter_listings(self, days: int = 120, granularity_level: str = 'Coarse'):
+        """
+        流式获取指定天数内的所有listings：直接解析原始 XML，每次产出一个商品字典
+        （与 get_all_listings 的元素一致），处理完的 XML 元素随即释放。
+        与 get_all_listings 相比，每页只做一次解析，也不需要在内存中同时保留整页的对象树。
+
+        返回:
+            generator: 商品字典；调用失败时抛出 ConnectionError
+        """
+        now = datetime.now(timezone.utc)
+        start_time_from = now - timedelta(days=days)
+        return self._iter_trading_records(
+            'GetSellerList', lambda page: self._seller_list_request(start_time_from, now, granularity_level, page),
+            'ItemArray', 'Item', 'HasMoreItems')
+
+    @_coalesced
+    def get_all_listings(self, days: int = 120, granularity_level: str = 'Coarse',
+                         process_workers: int = None) -> list:
         """
         获取指定天数内的所有listings。
         
@@ -385,83 +1327,347 @@ class EbayAPI:
                 - Coarse: 粗粒度，包含标题、当前价格、竞价次数、商品状态等基本信息
                 - Medium: 中等粒度，在Coarse基础上增加保留价格信息
                 - Fine: 细粒度，包含最高竞价者信息和运费详情，数据量约为Medium的两倍
+            process_workers: 解析进程数。设置后 XML 解析与 to_dict_recursive 转换在进程池中进行，
+                            拉取下一页与解析已到达的页同时进行，适合 Fine 粒度的大批量拉取。
+                            只有单页解析耗时接近网络往返时才有收益；Coarse 粒度或页数较少时，
+                            启动进程和传回结果的开销大于解析本身，应保持为 None
         
         返回：商品列表
         """
         if not self.api_trading:
-            print("Trading API 客户端未初始化。", file=sys.stderr)
+            logger.error("Trading API 客户端未初始化。")
             return []
         
         # 验证 granularity_level 参数
         valid_granularity_levels = [None, 'Coarse', 'Medium', 'Fine']
         
         if granularity_level not in valid_granularity_levels:
-            print(f"无效的GranularityLevel参数: {granularity_level}", file=sys.stderr)
-            print(f"有效值包括: {', '.join([str(x) for x in valid_granularity_levels])}", file=sys.stderr)
+            logger.error("无效的GranularityLevel参数: %s", granularity_level)
+            logger.error("有效值包括: %s", ', '.join([str(x) for x in valid_granularity_levels]))
             return []
         
+        cache_params = {'days': days, 'granularity_level': granularity_level}
+        hit, cached = self._cache_get('get_all_listings', cache_params)
+        if hit:
+            return cached
+
         try:
             page_number = 1
             all_listings = []
+            complete = True
             
             now = datetime.now(timezone.utc)
             start_time_from = now - timedelta(days=days)
             
             granularity_desc = granularity_level if granularity_level else "最低级别(仅ItemID)"
-            print(f'正在获取过去{days}天内的所有listings，粒度级别: {granularity_desc}，当前页数:', end='')
-            
-            while True:
-                call_data = {
-                    'StartTimeFrom': start_time_from.isoformat(),
-                    'StartTimeTo': now.isoformat(),
-                    'IncludeWatchCount': True,
-                    'Pagination': {
-                        'EntriesPerPage': 30,  # 建议使用较大的值以提高效率
-                        'PageNumber': page_number
-                    },
-                }
-                
-                # 只有当granularity_level不为None时才添加GranularityLevel参数
-                if granularity_level is not None:
-                    call_data['GranularityLevel'] = granularity_level
-
-                response = self.api_trading.execute('GetSellerList', call_data)
-                print(f" {page_number}", end='', flush=True)
-
-                if response.reply.Ack not in ['Success', 'Warning']:
-                    error_message = ""
-                    if hasattr(response.reply, 'Errors') and response.reply.Errors:
-                        error_message = response.reply.Errors[0].LongMessage
-                    print(f"\nAPI调用失败: {error_message}", file=sys.stderr)
-                    break
+            logger.debug("正在获取过去%s天内的所有listings，粒度级别: %s", days, granularity_desc)
+            started = time.perf_counter()
 
-                item_array = getattr(response.reply, 'ItemArray', None)
-                if not (item_array and hasattr(item_array, 'Item')):
-                    break
+            def build_call_data(page):
+                return self._seller_list_request(start_time_from, now, granularity_level, page)
+
+            if process_workers:
+                for page_number, parsed in self._iter_trading_pages_in_processes(
+                        'GetSellerList', build_call_data, 'ItemArray', 'Item', 'HasMoreItems', process_workers):
+                    if parsed['error']:
+                        logger.error("API调用失败: %s", parsed['error'])
+                        complete = False
+                        break
+                    all_listings.extend(parsed['records'])
+            else:
+                while True:
+                    call_data = build_call_data(page_number)
+                    response = self._trading_execute(self.api_trading, 'GetSellerList', call_data, page=page_number)
+                    logger.debug("GetSellerList 第 %s 页", page_number)
+
+                    if response.reply.Ack not in ['Success', 'Warning']:
+                        error_message = ""
+                        if hasattr(response.reply, 'Errors') and response.reply.Errors:
+                            error_message = response.reply.Errors[0].LongMessage
+                        logger.error("API调用失败: %s", error_message)
+                        complete = False
+                        break
+
+                    item_array = getattr(response.reply, 'ItemArray', None)
+                    if not (item_array and hasattr(item_array, 'Item')):
+                        break
                 
-                items = item_array.Item
-                if not isinstance(items, list):
-                    items = [items]
+                    items = item_array.Item
+                    if not isinstance(items, list):
+                        items = [items]
 
-                for item in items:
-                    item_dict = self.to_dict_recursive(item)
-                    all_listings.append(item_dict)
+                    all_listings.extend(self._convert_records(items, 'GetSellerList', page_number))
 
-                if getattr(response.reply, 'HasMoreItems', 'false') == 'false':
-                    break
+                    if getattr(response.reply, 'HasMoreItems', 'false') == 'false':
+                        break
                 
-                page_number += 1
+                    page_number += 1
                 
-            print(f"\n获取过去{days}天内的所有listings完成，共获取到{len(all_listings)}个商品。")
+            duration = time.perf_counter() - started
+            logger.info("获取过去%s天内的所有listings完成，共获取到%s个商品（%s 页，%.2f 秒）。",
+                        days, len(all_listings), page_number, duration,
+                        extra={'operation': 'GetSellerList', 'count': len(all_listings),
+                               'pages': page_number, 'duration': duration})
+            if complete:
+                self._cache_set('get_all_listings', cache_params, all_listings)
             return all_listings
             
         except ConnectionError as e:
-            print(f"\nAPI 连接或请求出错: {e.response.text if e.response else e}", file=sys.stderr)
+            logger.error("API 连接或请求出错: %s", e.response.text if e.response else e)
             return []
         except Exception as e:
-            print(f"\n处理GetSellerList时发生未知错误: {e}", file=sys.stderr)
+            logger.error("处理GetSellerList时发生未知错误: %s", e)
             return []
 
+    @staticmethod
+    def _inventory_status_outcomes(chunk: list, reply: dict, error: str = None) -> dict:
+        """
+        内部方法：把一次 ReviseInventoryStatus 响应拆分为逐商品的结果。
+        响应中出现在 InventoryStatus 里的商品修改成功；其余商品视为失败，
+        错误信息优先取 ErrorParameters 中引用了该商品ID的错误。
+        """
+        statuses = (reply or {}).get('InventoryStatus') or []
+        if isinstance(statuses, dict):
+            statuses = [statuses]
+        revised = {str(status.get('ItemID')): status for status in statuses if isinstance(status, dict)}
+
+        errors = (reply or {}).get('Errors') or []
+        if isinstance(errors, dict):
+            errors = [errors]
+        item_errors = {}
+        general_errors = []
+        for err in errors:
+            if not isinstance(err, dict) or err.get('SeverityCode') == 'Warning':
+                continue
+            message = err.get('LongMessage') or err.get('ShortMessage') or '未知错误'
+            params = err.get('ErrorParameters') or []
+            if isinstance(params, dict):
+                params = [params]
+            values = {str(param.get('Value')) for param in params if isinstance(param, dict)}
+            matched = [entry['ItemID'] for entry in chunk if entry['ItemID'] in values]
+            for item_id in matched:
+                item_errors.setdefault(item_id, message)
+            if not matched:
+                general_errors.append(message)
+
+        outcomes = {}
+        for entry in chunk:
+            item_id = entry['ItemID']
+            if item_id in revised:
+                status = revised[item_id]
+                outcomes[item_id] = {'status': 'revised', 'price': status.get('StartPrice', entry.get('StartPrice')),
+                                     'quantity': status.get('Quantity', entry.get('Quantity')), 'error': None}
+            else:
+                message = item_errors.get(item_id) or '; '.join(general_errors) or error or '响应中没有该商品的结果'
+                outcomes[item_id] = {'status': 'failed', 'price': entry.get('StartPrice'),
+                                     'quantity': entry.get('Quantity'), 'error': message}
+        return outcomes
+
+    @staticmethod
+    def _revision_error(price, quantity) -> str:
+        """内部方法：检查 revise_inventory_bulk 的一条修改，无效时返回错误信息，有效时返回 None。"""
+        if quantity is not None:
+            try:
+                valid = not isinstance(quantity, bool) and float(quantity) == int(quantity)
+            except (TypeError, ValueError, OverflowError):
+                valid = False
+            if not valid:
+                return f'库存数量无效: {quantity!r}'
+            if int(quantity) < 0:
+                return '库存数量不能为负数'
+        if price is not None:
+            try:
+                value = float(price)
+            except (TypeError, ValueError):
+                return f'价格无效: {price!r}'
+            if not math.isfinite(value) or value <= 0:
+                return f'价格必须大于 0: {price!r}'
+        return None
+
+    def revise_inventory_bulk(self, revisions: dict, current_listings: list = None, skip_unchanged: bool = True,
+                              max_workers: int = 4) -> dict:
+        """
+        批量修改在售商品的价格和/或库存，使用 ReviseInventoryStatus（每次调用最多 4 个商品）。
+        多个线程并发提交，共享 ReviseInventoryStatus 的限流额度（见 RATE_LIMITS）。
+
+        参数:
+            revisions: {item_id: (price, quantity)}，price 或 quantity 为 None 表示不修改该项
+            current_listings: 用于比对的当前商品状态（get_all_listings / get_active_listings 的结果）；
+                              为 None 且 skip_unchanged 为 True 时调用 get_active_listings 获取
+            skip_unchanged: 是否跳过价格和可售数量都与当前状态相同的商品
+            max_workers: 并发提交的线程数
+
+        返回:
+            dict: {
+                'success': bool,        # 所有需要修改的商品都修改成功
+                'results': {item_id: {'status': 'revised' | 'unchanged' | 'failed',
+                                      'price': ..., 'quantity': ..., 'error': str}},
+                'revised': int, 'unchanged': int, 'failed': int,
+                'calls': int, 'duration': float
+            }
+
+        注意:
+            - quantity 是修改后的可售数量（不含已售出数量），比对时与 Quantity - QuantitySold 比较
+            - 不在 current_listings 中的商品（如 120 天前刊登的 GTC 商品）无法比对，总是提交
+            - 数量为负数或不是整数、价格不是正数的商品直接判为失败，不会提交
+        """
+        started = time.perf_counter()
+        results = {}
+        if not revisions:
+            return {'success': True, 'results': results, 'revised': 0, 'unchanged': 0, 'failed': 0,
+                    'calls': 0, 'duration': 0.0}
+        if not self.api_trading:
+            logger.error("Trading API 客户端未初始化。")
+            return {'success': False, 'error': 'Trading API client not initialized', 'results': results}
+
+        known = {}
+        if skip_unchanged:
+            if current_listings is None:
+                current_listings = self.get_active_listings()
+            for item in current_listings:
+                listing = item if isinstance(item, Listing) else Listing.from_dict(item)
+                if listing.item_id:
+                    known[str(listing.item_id)] = listing
+
+        entries = []
+        for item_id, (price, quantity) in revisions.items():
+            item_id = str(item_id)
+            # 无效的价格或数量在提交前即判为失败，不占用调用额度，也不影响同批的其他商品
+            error = self._revision_error(price, quantity)
+            if error:
+                results[item_id] = {'status': 'failed', 'price': price, 'quantity': quantity, 'error': error}
+                continue
+            listing = known.get(item_id)
+            price_changed = price is not None and (
+                listing is None or listing.price is None or round(float(price), 2) != round(listing.price, 2))
+            quantity_changed = quantity is not None and (
+                listing is None or listing.quantity_available != int(quantity))
+            if not price_changed and not quantity_changed:
+                results[item_id] = {'status': 'unchanged', 'price': price, 'quantity': quantity, 'error': None}
+                continue
+            entry = {'ItemID': item_id}
+            if price_changed:
+                entry['StartPrice'] = f'{float(price):.2f}'
+            if quantity_changed:
+                entry['Quantity'] = str(int(quantity))
+            entries.append(entry)
+
+        def submit(chunk):
+            try:
+                waited = self._throttle('ReviseInventoryStatus')
+                response = self._trading_execute(self._thread_trading_connection(), 'ReviseInventoryStatus',
+                                                 {'InventoryStatus': chunk}, rate_limit_wait=waited)
+                return self._inventory_status_outcomes(chunk, self.to_dict_recursive(response.reply))
+            except ConnectionError as e:
+                # Ack 为 Failure 时 ebaysdk 抛出 ConnectionError，响应中仍可能包含部分成功的商品
+                reply = getattr(getattr(e, 'response', None), 'reply', None)
+                return self._inventory_status_outcomes(
+                    chunk, self.to_dict_recursive(reply) if reply is not None else None, str(e))
+            except Exception as e:
+                logger.warning("ReviseInventoryStatus 调用失败（%s 个商品）: %s", len(chunk), e)
+                return self._inventory_status_outcomes(chunk, None, str(e))
+
+        chunks = self._chunked(entries, self.REVISE_INVENTORY_LIMIT)
+        logger.debug("需要修改 %s 个商品（%s 次调用），跳过 %s 个未变化的商品",
+                     len(entries), len(chunks), sum(1 for r in results.values() if r['status'] == 'unchanged'))
+        if chunks:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+                for outcomes in executor.map(submit, chunks):
+                    results.update(outcomes)
+
+        counts = {'revised': 0, 'unchanged': 0, 'failed': 0}
+        for outcome in results.values():
+            counts[outcome['status']] += 1
+        duration = time.perf_counter() - started
+        logger.info("批量修改库存完成: %s 个已修改, %s 个未变化, %s 个失败（%s 次调用，%.1f 秒）",
+                    counts['revised'], counts['unchanged'], counts['failed'], len(chunks), duration,
+                    extra={'operation': 'ReviseInventoryStatus', 'count': len(results),
+                           'succeeded': counts['revised'], 'failed': counts['failed'], 'duration': duration})
+        if counts['failed'] and logger.isEnabledFor(logging.WARNING):
+            failures = [f"{item_id}: {r['error']}" for item_id, r in results.items() if r['status'] == 'failed']
+            logger.warning("修改失败的商品: %s", '; '.join(failures[:20]))
+        return {'success': counts['failed'] == 0, 'results': results, 'calls': len(chunks),
+                'duration': duration, **counts}
+
+    def build_inventory_snapshot(self, granularity_level: str = 'Fine') -> InventorySnapshot:
+        """
+        拉取在售商品并建立库存快照（见 ebayapi.inventory_sync）。
+        按 SKU 同步需要返回 SKU 和多属性信息的 'Fine' 粒度；Coarse / Medium 不包含 SKU，快照中的 SKU 会为空。
+        """
+        listings = Listing.from_dicts(self.get_all_listings(days=120, granularity_level=granularity_level),
+                                      keep_raw=True)
+        now = datetime.now(timezone.utc)
+        snapshot = InventorySnapshot(listing for listing in listings if listing.is_active(now))
+        if snapshot and not snapshot.by_sku:
+            logger.warning("库存快照中没有任何 SKU（GranularityLevel=%s），无法按 SKU 同步", granularity_level)
+        logger.debug("库存快照已建立，共 %s 个在售商品（%s 个有 SKU，%s 个变体 SKU）",
+                     len(snapshot), len(snapshot.by_sku), len(snapshot.variations))
+        return snapshot
+
+    def sync_inventory(self, stock, snapshot: InventorySnapshot = None, snapshot_path: str = None,
+                       snapshot_max_age: int = 3600, dry_run: bool = False, max_workers: int = 4,
+                       granularity_level: str = 'Fine') -> dict:
+        """
+        把本地库存表同步到 eBay，只提交价格或可售数量发生变化的商品。
+
+        参数:
+            stock: {sku: (price, quantity)}，或 load_stock_table 可以读取的 CSV 路径 / DataFrame / 字典列表
+            snapshot: 用于比较的在售商品快照；为 None 时从 snapshot_path 读取，文件不存在或超过
+                      snapshot_max_age 秒时调用 build_inventory_snapshot 重新拉取
+            snapshot_path: 快照文件路径；同步后把修改成功的结果写回快照并保存
+            dry_run: 只计算差异，不提交修改
+            max_workers: 并发提交的线程数
+            granularity_level: 重新拉取快照时 GetSellerList 的粒度，需要包含 SKU（见 build_inventory_snapshot）
+
+        返回:
+            dict: {'success': bool, 'revisions': {item_id: (price, quantity)}, 'unchanged': int,
+                   'unknown_skus': [...], 'revised': int, 'failed': int, 'results': {...},
+                   'snapshot': InventorySnapshot, 'duration': float}
+        异常:
+            ValueError: 库存表中的 SKU 属于多属性商品（见 diff_inventory），此时不提交任何修改
+        """
+        started = time.perf_counter()
+        if not isinstance(stock, dict):
+            stock = load_stock_table(stock)
+
+        if snapshot is None and snapshot_path and os.path.exists(snapshot_path):
+            try:
+                snapshot = InventorySnapshot.load(snapshot_path)
+                if snapshot.age() > snapshot_max_age:
+                    logger.debug("库存快照已过期（%.0f 秒），重新拉取", snapshot.age())
+                    snapshot = None
+            except Exception as e:
+                logger.warning("读取库存快照失败 %s: %s", snapshot_path, e)
+                snapshot = None
+        if snapshot is None:
+            snapshot = self.build_inventory_snapshot(granularity_level)
+
+        revisions, unchanged, unknown_skus = diff_inventory(stock, snapshot)
+        if unknown_skus:
+            logger.warning("%s 个 SKU 没有对应的在售商品: %s", len(unknown_skus), ', '.join(unknown_skus[:20]))
+
+        result = {'success': True, 'revisions': revisions, 'unchanged': unchanged, 'unknown_skus': unknown_skus,
+                  'revised': 0, 'failed': 0, 'results': {}, 'snapshot': snapshot}
+        if revisions and not dry_run:
+            revised = self.revise_inventory_bulk(revisions, skip_unchanged=False, max_workers=max_workers)
+            for item_id, outcome in revised.get('results', {}).items():
+                if outcome['status'] == 'revised':
+                    snapshot.apply(item_id, *revisions[item_id])
+            result.update(success=revised.get('success', False), revised=revised.get('revised', 0),
+                          failed=revised.get('failed', 0), results=revised.get('results', {}))
+            if snapshot_path:
+                snapshot.save(snapshot_path)
+        elif snapshot_path and not dry_run:
+            snapshot.save(snapshot_path)
+
+        result['duration'] = time.perf_counter() - started
+        logger.info("库存同步完成: %s 个 SKU，%s 个需要修改（%s 成功, %s 失败），%s 个未变化，%s 个未匹配（%.1f 秒）",
+                    len(stock), len(revisions), result['revised'], result['failed'], unchanged,
+                    len(unknown_skus), result['duration'],
+                    extra={'operation': 'sync_inventory', 'count': len(stock), 'succeeded': result['revised'],
+                           'failed': result['failed'], 'duration': result['duration']})
+        return result
+
 # 在你的 EbayAPI 类中
     def _upload_pictures(self, picture_paths: list, api_connection) -> dict: # 增加 api_connection 参数
         """
@@ -471,17 +1677,17 @@ class EbayAPI:
         picture_urls = []
         failed_uploads = []
         
-        print(f"准备上传 {len(picture_paths)} 张图片...")
+        logger.debug("准备上传 %s 张图片...", len(picture_paths))
         
         for i, pic_path in enumerate(picture_paths, 1):
             if not os.path.exists(pic_path):
                 error_msg = f"图片文件不存在: {pic_path}"
-                print(f"❌ {error_msg}", file=sys.stderr)
+                logger.warning(error_msg)
                 failed_uploads.append(error_msg)
                 continue
             
             try:
-                print(f"  - 正在上传第 {i}/{len(picture_paths)} 张: {os.path.basename(pic_path)}")
+                logger.debug("- 正在上传第 %s/%s 张: %s", i, len(picture_paths), os.path.basename(pic_path))
                 
                 with open(pic_path, 'rb') as file:
                     files = {'file': (os.path.basename(pic_path), file)}
@@ -492,26 +1698,27 @@ class EbayAPI:
                     }
                     
                     # 使用传入的专用连接对象
-                    response = api_connection.execute('UploadSiteHostedPictures', upload_request, files=files)
+                    response = self._trading_execute(api_connection, 'UploadSiteHostedPictures',
+                                                     upload_request, files=files)
                 
                 if response.reply.Ack in ['Success', 'Warning']:
                     url = getattr(response.reply, 'SiteHostedPictureDetails', {}).FullURL
                     if url:
                         picture_urls.append(url)
-                        print(f"    ✅ 上传成功")
+                        logger.debug("上传成功")
                     else:
                         error_msg = f"图片上传响应中缺少URL: {pic_path}"
-                        print(f"    ❌ {error_msg}", file=sys.stderr)
+                        logger.warning(error_msg)
                         failed_uploads.append(error_msg)
                 else:
                     error_msg = response.reply.Errors[0].LongMessage if hasattr(response.reply, 'Errors') else '图片上传未知错误'
                     full_error = f"图片上传失败: {error_msg} ({pic_path})"
-                    print(f"    ❌ {full_error}", file=sys.stderr)
+                    logger.warning(full_error)
                     failed_uploads.append(full_error)
                     
             except Exception as e:
                 error_msg = f"上传图片时发生异常: {str(e)} ({pic_path})"
-                print(f"    ❌ {error_msg}", file=sys.stderr)
+                logger.warning(error_msg)
                 failed_uploads.append(error_msg)
 
         return {'urls': picture_urls, 'failures': failed_uploads}
@@ -531,10 +1738,7 @@ class EbayAPI:
         failed_uploads = []
         if picture_paths:
             try:
-                picture_api = Trading(
-                    token=self.access_token, config_file=None, appid=self.APP_ID,
-                    devid=self.DEV_ID, certid=self.CERT_ID, siteid='0', environment='production'
-                )
+                picture_api = self._new_trading_connection()
                 upload_result = self._upload_pictures(picture_paths, api_connection=picture_api)
                 picture_urls = upload_result['urls']
                 failed_uploads = upload_result['failures']
@@ -544,7 +1748,7 @@ class EbayAPI:
             if not picture_urls:
                 return {'success': False, 'error': f"所有图片均上传失败。详情: {'; '.join(failed_uploads)}"}
             
-            print(f"图片上传完成: {len(picture_urls)} 成功, {len(failed_uploads)} 失败。")
+            logger.info("图片上传完成: %s 成功, %s 失败。", len(picture_urls), len(failed_uploads))
             
             import copy
             item_dict_with_pics = copy.deepcopy(item_dict)
@@ -554,11 +1758,8 @@ class EbayAPI:
             failed_uploads = []
 
         try:
-            print("\n正在为 AddItem 创建专用的API连接...")
-            item_api = Trading(
-                token=self.access_token, config_file=None, appid=self.APP_ID,
-                devid=self.DEV_ID, certid=self.CERT_ID, siteid='0', environment='production'
-            )
+            logger.debug("正在为 AddItem 创建专用的API连接...")
+            item_api = self._new_trading_connection()
             
             request_data = {'Item': item_dict_with_pics}
             
@@ -578,7 +1779,7 @@ class EbayAPI:
             #     print(f"    [DEBUG] 生成XML时出错: {e}")
             # print("--- [DEBUG] XML 请求结束 ---\n")
 
-            response = item_api.execute('AddItem', request_data)
+            response = self._trading_execute(item_api, 'AddItem', request_data)
             response_dict = self.to_dict_recursive(response.reply)
 
             if response.reply.Ack in ['Success', 'Warning']:
@@ -591,12 +1792,10 @@ class EbayAPI:
                 return {'success': False, 'error': error_msg, 'response': response_dict}
 
         except ConnectionError as e:
-            error_msg = f"API 连接或请求出错: {e.response.text if e.response else e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("API 连接或请求出错: %s", e.response.text if e.response else e)
             return {'success': False, 'error': str(e)}
         except Exception as e:
-            error_msg = f"上传新刊登时发生未知错误: {e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("上传新刊登时发生未知错误: %s", e)
             return {'success': False, 'error': str(e)}
 
     def upload_shipping_tracking_info(self, item_id: str = None, transaction_id: str = None,
@@ -630,7 +1829,7 @@ class EbayAPI:
             - 常用承运商: UPS, FedEx, USPS, DHL, 顺丰速运, 中通快递, 圆通速递, 申通快递, 韵达快递等
         """
         if not self.api_trading:
-            print("Trading API 客户端未初始化。", file=sys.stderr)
+            logger.error("Trading API 客户端未初始化。")
             return {'success': False, 'error': 'Trading API client not initialized'}
         
         # 验证必需参数 - 必须提供其中一种标识符组合
@@ -692,23 +1891,224 @@ class EbayAPI:
                 if shipment_data:  # 只有在有数据时才添加Shipment容器
                     request_data['Shipment'] = shipment_data
             
-            print(f"正在通过CompleteSale上传信息: {identifier_info}")
-            if tracking_number and shipping_carrier:
-                print(f"跟踪号: {tracking_number}, 承运商: {shipping_carrier}")
-            if is_paid is not None:
-                print(f"付款状态: {'已付款' if is_paid else '未付款'}")
-            if is_shipped is not None:
-                print(f"发货状态: {'已发货' if is_shipped else '未发货'}")
+            logger.debug("正在通过CompleteSale上传信息: %s, 跟踪号: %s, 承运商: %s, 付款状态: %s, 发货状态: %s",
+                         identifier_info, tracking_number, shipping_carrier, is_paid, is_shipped)
             
             # 调用eBay CompleteSale API
-            response = self.api_trading.execute('CompleteSale', request_data)
+            response = self._trading_execute(self.api_trading, 'CompleteSale', request_data)
 
             return response
         except Exception as e:
-            error_msg = f"CompleteSale调用时发生未知错误: {e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("CompleteSale调用时发生未知错误: %s", e)
             return {'success': False, 'error': str(e)}
 
+    def create_shipping_fulfillment(self, order_id: str, tracking_number: str, shipping_carrier: str,
+                                    line_items: list = None, shipped_time: datetime = None,
+                                    max_retries: int = 2) -> dict:
+        """
+        通过 Fulfillment API（createShippingFulfillment）为订单上传运单号。
+
+        参数:
+            order_id: 订单ID
+            tracking_number: 运单跟踪号
+            shipping_carrier: 承运商代码（如 USPS、UPS、FEDEX）
+            line_items: 本次发货的行项目，元素为 lineItemId 字符串或 {'lineItemId': ..., 'quantity': ...}；
+                        为 None 时查询订单并包含全部行项目
+            shipped_time: 发货时间，默认为当前时间；转换为 UTC 后提交（无时区的 datetime 按本地时间处理）
+            max_retries: 连接失败、限流或服务端临时错误（RETRYABLE_STATUS_CODES）的最大重试次数。
+                         请求已发出但结果未知（读超时、5xx）时，先查询订单已有的发货记录，
+                         运单号已存在则视为成功，不再重复提交
+
+        返回:
+            dict: {'success': bool, 'order_id': str, 'tracking_number': str,
+                   'fulfillment_id': str, 'status_code': int, 'error': str}
+        """
+        result = {'success': False, 'order_id': order_id, 'tracking_number': tracking_number,
+                  'fulfillment_id': None, 'status_code': None, 'error': None}
+        if not self.api_rest:
+            result['error'] = 'REST API client not initialized'
+            return result
+        if not order_id or not tracking_number or not shipping_carrier:
+            result['error'] = 'order_id, tracking_number 和 shipping_carrier 都是必需的'
+            return result
+
+        shipped_date = (shipped_time or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        attempt = 0
+        while True:
+            posted = False
+            try:
+                if line_items is None:
+                    order = self._rest_request('GET', f'/sell/fulfillment/v1/order/{order_id}').json()
+                    line_items = [{'lineItemId': item['lineItemId'], 'quantity': item.get('quantity', 1)}
+                                  for item in order.get('lineItems', [])]
+                body = {
+                    'lineItems': [item if isinstance(item, dict) else {'lineItemId': str(item)}
+                                  for item in line_items],
+                    'shippedDate': shipped_date.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                    'shippingCarrierCode': shipping_carrier,
+                    'trackingNumber': tracking_number,
+                }
+                posted = True
+                try:
+                    response = self._rest_request(
+                        'POST', f'/sell/fulfillment/v1/order/{order_id}/shipping_fulfillment', body=body)
+                finally:
+                    self._invalidate_for_write('createShippingFulfillment')
+                location = response.headers.get('Location', '')
+                result.update(success=True, status_code=response.status_code,
+                              fulfillment_id=location.rstrip('/').rsplit('/', 1)[-1] if location else None)
+                return result
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                result['status_code'] = status
+                result['error'] = e.response.text if e.response is not None and e.response.text else str(e)
+                if status not in self.RETRYABLE_STATUS_CODES:
+                    return result
+                # 5xx 时 eBay 可能已经创建了发货记录；429 表示请求未被处理
+                ambiguous = posted and status != 429
+                if not ambiguous and attempt >= max_retries:
+                    return result
+            except requests.RequestException as e:
+                result['status_code'] = None
+                result['error'] = str(e)
+                if not posted:
+                    # 查询订单行项目失败，GET 可以直接重试
+                    if attempt >= max_retries:
+                        return result
+                    ambiguous = False
+                elif self._is_connect_error(e):
+                    # 连接没有建立，请求未发出
+                    if attempt >= max_retries:
+                        return result
+                    ambiguous = False
+                else:
+                    # 读超时、连接中断等：请求可能已被 eBay 处理
+                    ambiguous = True
+            if ambiguous:
+                try:
+                    fulfillment_id = self._find_shipping_fulfillment(order_id, tracking_number)
+                except requests.RequestException as check_error:
+                    result['error'] = f"{result['error']}（无法确认发货记录是否已创建: {check_error}）"
+                    return result
+                if fulfillment_id is not None:
+                    logger.debug("订单 %s 的运单号 %s 已存在（%s），不再重复提交", order_id, tracking_number,
+                                 fulfillment_id)
+                    result.update(success=True, fulfillment_id=fulfillment_id, error=None)
+                    return result
+                if attempt >= max_retries:
+                    return result
+            attempt += 1
+            logger.debug("createShippingFulfillment 订单 %s 第 %s 次重试: %s", order_id, attempt, result['error'])
+            time.sleep(2 ** (attempt - 1))
+
+    @staticmethod
+    def _is_connect_error(error: Exception) -> bool:
+        """请求是否在建立连接时失败（请求没有发出，重新提交不会产生重复记录）。"""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if not isinstance(error, requests.ConnectionError):
+            return False
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, 'reason', reason)
+        return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+
+    def _find_shipping_fulfillment(self, order_id: str, tracking_number: str):
+        """查询订单已有的发货记录（getShippingFulfillments），返回运单号相同的记录 ID，没有时返回 None。"""
+        response = self._rest_request('GET', f'/sell/fulfillment/v1/order/{order_id}/shipping_fulfillment')
+        for fulfillment in response.json().get('fulfillments') or []:
+            if str(fulfillment.get('shipmentTrackingNumber')) == str(tracking_number):
+                return fulfillment.get('fulfillmentId')
+        return None
+
+    def bulk_create_shipping_fulfillments(self, shipments: list, ledger: FulfillmentLedger = None,
+                                          max_workers: int = 8, max_retries: int = 2) -> dict:
+        """
+        批量上传运单号（createShippingFulfillment），多线程并发提交。
+        以 (订单号, 运单号) 去重：同一批次中的重复行只提交一次，全部提交完成后复制第一次出现的行的结果
+        （skipped=True）；ledger 中已有的组合直接跳过，因此重复运行同一份仓库发货文件不会重复提交。
+
+        参数:
+            shipments: 发货列表，每个元素为 dict：
+                {'order_id', 'tracking_number', 'shipping_carrier', 'line_items'（可选）, 'shipped_time'（可选）}
+            ledger: FulfillmentLedger，成功提交的组合写入其中；为 None 时只在本批次内去重
+            max_workers: 并发提交的线程数
+            max_retries: 每个订单遇到可重试错误时的最大重试次数
+
+        返回:
+            dict: {'success': bool, 'results': [...], 'total': int, 'submitted': int, 'succeeded': int,
+                   'failed': int, 'skipped': int, 'duration': float, 'throughput': float（每秒成功提交的订单数）,
+                   'average_latency': float}
+        """
+        started = time.perf_counter()
+        results = [None] * len(shipments)
+        to_submit = []
+        # 批次内的重复行 -> 第一次出现的位置
+        primaries = {}
+        duplicates = []
+        for position, shipment in enumerate(shipments):
+            key = (str(shipment.get('order_id')), str(shipment.get('tracking_number')))
+            if key in primaries:
+                duplicates.append((position, primaries[key]))
+                continue
+            if ledger is not None and ledger.contains(*key):
+                previous = ledger.get(*key)
+                results[position] = {'success': True, 'skipped': True, 'order_id': key[0], 'tracking_number': key[1],
+                                     'fulfillment_id': (previous or {}).get('fulfillment_id'),
+                                     'status_code': None, 'error': None}
+                continue
+            primaries[key] = position
+            to_submit.append(position)
+
+        latencies = []
+
+        def submit(position):
+            shipment = shipments[position]
+            call_started = time.perf_counter()
+            result = self.create_shipping_fulfillment(
+                shipment.get('order_id'), shipment.get('tracking_number'), shipment.get('shipping_carrier'),
+                line_items=shipment.get('line_items'), shipped_time=shipment.get('shipped_time'),
+                max_retries=max_retries)
+            latencies.append(time.perf_counter() - call_started)
+            if result['success'] and ledger is not None:
+                ledger.record(result['order_id'], result['tracking_number'], result['fulfillment_id'],
+                              shipment.get('shipping_carrier'))
+            result['skipped'] = False
+            return result
+
+        if to_submit:
+            logger.debug("开始提交 %s 个发货记录（跳过 %s 个已提交的）...", len(to_submit),
+                         len(shipments) - len(to_submit))
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_submit)))) as executor:
+                for position, result in zip(to_submit, executor.map(submit, to_submit)):
+                    results[position] = result
+        for position, primary in duplicates:
+            results[position] = dict(results[primary], skipped=True)
+
+        skipped = sum(1 for r in results if r['skipped'])
+        succeeded = sum(1 for r in results if r['success'] and not r['skipped'])
+        failed = len(results) - skipped - succeeded
+        duration = time.perf_counter() - started
+        summary = {
+            'success': failed == 0,
+            'results': results,
+            'total': len(results),
+            'submitted': len(to_submit),
+            'succeeded': succeeded,
+            'failed': failed,
+            'skipped': skipped,
+            'duration': duration,
+            'throughput': succeeded / duration if duration > 0 else 0.0,
+            'average_latency': sum(latencies) / len(latencies) if latencies else 0.0,
+        }
+        logger.info("批量上传运单号完成: %s 成功, %s 失败, %s 跳过（%.1f 秒，%.1f 单/秒）",
+                    succeeded, failed, skipped, duration, summary['throughput'],
+                    extra={'operation': 'createShippingFulfillment', 'count': len(results),
+                           'succeeded': succeeded, 'failed': failed, 'duration': duration})
+        if failed and logger.isEnabledFor(logging.WARNING):
+            failures = [f"{r['order_id']}: {r['error']}" for r in results if not r['success']]
+            logger.warning("上传失败的订单: %s", '; '.join(failures[:20]))
+        return summary
+
     def send_message_to_buyer(self, item_id: str, recipient_id: str, subject: str, 
                              message_body: str, question_type: str = 'General',
                              email_copy_to_sender: bool = False, 
@@ -735,13 +2135,15 @@ class EbayAPI:
                 {
                     'success': bool,  # 是否成功
                     'response': dict,  # API响应内容
-                    'error': str  # 错误信息（如果有）
+                    'error': str,  # 错误信息（如果有）
+                    'retryable': bool  # 失败时是否可以重试（网络错误、限流等临时错误）
                 }
         
         注意:
             - 消息正文不支持HTML格式，如果使用HTML标签会导致错误或显示原始标签
             - 调用者必须是该商品的买家或卖家
-            - 此API有速率限制：每个用户ID在60秒内最多调用75次
+            - 此API有速率限制：每个用户ID在60秒内最多调用75次，超出时本方法会等待（见 RATE_LIMITS）
+            - 批量发送请使用 MessageQueue + send_queued_messages
             - 图片必须先上传到eBay图片服务(EPS)才能在消息中使用
             
         示例:
@@ -767,7 +2169,7 @@ class EbayAPI:
             )
         """
         if not self.api_trading:
-            print("Trading API 客户端未初始化。", file=sys.stderr)
+            logger.error("Trading API 客户端未初始化。")
             return {'success': False, 'error': 'Trading API client not initialized'}
         
         # 验证必需参数
@@ -826,23 +2228,20 @@ class EbayAPI:
                 'MemberMessage': member_message
             }
             
-            print(f"正在发送消息给买家...")
-            print(f"  商品ID: {item_id}")
-            print(f"  收件人: {recipient_id}")
-            print(f"  主题: {subject}")
-            print(f"  问题类型: {question_type}")
-            if media_urls:
-                print(f"  附带图片: {len(media_urls)} 张")
+            logger.debug("正在发送消息给买家: 商品ID=%s, 收件人=%s, 主题=%s, 问题类型=%s, 附带图片=%s 张",
+                         item_id, recipient_id, subject, question_type, len(media_urls or []))
             
             # 调用 eBay AddMemberMessageAAQToPartner API
-            response = self.api_trading.execute('AddMemberMessageAAQToPartner', request_data)
+            waited = self._throttle('AddMemberMessageAAQToPartner')
+            response = self._trading_execute(self._thread_trading_connection(), 'AddMemberMessageAAQToPartner',
+                                             request_data, rate_limit_wait=waited)
             
             # 将响应转换为字典
             response_dict = self.to_dict_recursive(response.reply)
             
             # 检查响应状态
             if response.reply.Ack in ['Success', 'Warning']:
-                print("✅ 消息发送成功")
+                logger.info("消息发送成功: 商品ID=%s, 收件人=%s", item_id, recipient_id)
                 result = {
                     'success': True,
                     'response': response_dict
@@ -857,7 +2256,7 @@ class EbayAPI:
                             'message': getattr(error, 'LongMessage', '')
                         })
                     result['warnings'] = warnings
-                    print(f"⚠️ 警告: {warnings}")
+                    logger.warning("警告: %s", warnings)
                 
                 return result
             else:
@@ -867,28 +2266,178 @@ class EbayAPI:
                     error = response.reply.Errors[0]
                     error_msg = getattr(error, 'LongMessage', getattr(error, 'ShortMessage', '未知错误'))
                 
-                print(f"❌ 消息发送失败: {error_msg}", file=sys.stderr)
+                logger.error("消息发送失败: %s", error_msg)
                 return {
                     'success': False,
                     'error': error_msg,
-                    'response': response_dict
+                    'response': response_dict,
+                    'retryable': False
                 }
                 
         except ConnectionError as e:
-            error_msg = f"API 连接或请求出错: {e.response.text if e.response else e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("API 连接或请求出错: %s", e.response.text if e.response else e)
+            return {'success': False, 'error': str(e), 'retryable': self._is_retryable_trading_error(e)}
+        except Exception as e:
+            logger.error("发送消息时发生未知错误: %s", e)
+            return {'success': False, 'error': str(e), 'retryable': self._is_retryable_error(e)}
+
+    def send_queued_messages(self, queue: MessageQueue, max_workers: int = 4, max_attempts: int = 3,
+                             limit: int = None) -> dict:
+        """
+        发送消息队列中所有待发送的消息。多个线程并发发送，共享 AddMemberMessageAAQToPartner 的限流额度
+        （每 60 秒 75 次），每条消息的结果立即写回队列；中断后再次调用会从剩余的 pending 消息继续。
+
+        参数:
+            queue: MessageQueue 实例
+            max_workers: 并发发送的线程数
+            max_attempts: 每条消息的最大尝试次数（跨多次运行累计）
+            limit: 本次最多发送的消息数
+
+        返回:
+            dict: {'success': bool, 'total': int, 'sent': int, 'failed': int,
+                   'pending': int, 'duration': float}
+        """
+        messages = queue.pending(limit)
+        if not messages:
+            return {'success': True, 'total': 0, 'sent': 0, 'failed': 0, 'pending': 0, 'duration': 0.0}
+
+        started = time.perf_counter()
+        logger.debug("开始发送队列中的 %s 条消息...", len(messages))
+
+        def send(message):
+            result = self.send_message_to_buyer(
+                item_id=message['item_id'],
+                recipient_id=message['recipient_id'],
+                subject=message['subject'],
+                message_body=message['body'],
+                question_type=message['question_type'],
+                email_copy_to_sender=message['email_copy_to_sender'],
+                media_urls=message['media_urls'],
+            )
+            if result.get('success'):
+                queue.mark_sent(message['id'])
+            else:
+                # eBay 明确拒绝（Ack Failure、参数错误）的消息不再重试；网络错误、限流等留待下次重试
+                queue.mark_failed(message['id'], result.get('error'), retryable=bool(result.get('retryable')),
+                                  max_attempts=max_attempts)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(executor.map(send, messages))
+
+        sent = sum(1 for r in results if r.get('success'))
+        failed = len(results) - sent
+        duration = time.perf_counter() - started
+        pending = queue.stats()['pending']
+        logger.info("消息发送完成: %s 成功, %s 失败, 队列中剩余 %s 条（%.1f 秒）", sent, failed, pending, duration,
+                    extra={'operation': 'AddMemberMessageAAQToPartner', 'count': len(results),
+                           'succeeded': sent, 'failed': failed, 'duration': duration})
+        return {'success': failed == 0, 'total': len(results), 'sent': sent, 'failed': failed,
+                'pending': pending, 'duration': duration}
+
+    # ==================== 推送通知 ====================
+
+    def set_notification_preferences(self, events=ORDER_EVENTS, delivery_url: str = None,
+                                     enable: bool = True) -> dict:
+        """
+        订阅（或取消订阅）Trading Platform Notifications，使用 SetNotificationPreferences API。
+
+        参数:
+            events: 事件名列表，默认为订单相关事件（见 notifications.ORDER_EVENTS）
+            delivery_url: 接收通知的公网 HTTPS 地址（应用级设置，同时启用应用的通知推送）；
+                          为 None 时只修改用户的事件订阅
+            enable: True 订阅，False 取消订阅
+
+        返回:
+            dict: {'success': bool, 'error': str}
+        """
+        if not self.api_trading:
+            logger.error("Trading API 客户端未初始化。")
+            return {'success': False, 'error': 'Trading API client not initialized'}
+
+        state = 'Enable' if enable else 'Disable'
+        request_data = {
+            'UserDeliveryPreferenceArray': {
+                'NotificationEnable': [{'EventType': event, 'EventEnable': state} for event in events]
+            }
+        }
+        if delivery_url:
+            request_data['ApplicationDeliveryPreferences'] = {
+                'ApplicationURL': delivery_url,
+                'ApplicationEnable': 'Enable',
+                'DeviceType': 'Platform',
+            }
+        try:
+            response = self._trading_execute(self.api_trading, 'SetNotificationPreferences', request_data)
+            if response.reply.Ack in ['Success', 'Warning']:
+                logger.info("通知订阅已%s: %s", '启用' if enable else '停用', ', '.join(events))
+                return {'success': True}
+            error_msg = response.reply.Errors[0].LongMessage if hasattr(response.reply, 'Errors') else '未知错误'
+            return {'success': False, 'error': error_msg}
+        except ConnectionError as e:
+            logger.error("SetNotificationPreferences 调用失败: %s", e.response.text if e.response else e)
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            logger.error("设置通知订阅时发生未知错误: %s", e)
+            return {'success': False, 'error': str(e)}
+
+    def get_notification_preferences(self, preference_level: str = 'User') -> dict:
+        """
+        查询通知订阅设置（GetNotificationPreferences）。
+
+        参数:
+            preference_level: 'User'（事件订阅）或 'Application'（推送地址等应用级设置）
+
+        返回:
+            dict: {'success': bool, 'preferences': dict, 'error': str}
+        """
+        if not self.api_trading:
+            logger.error("Trading API 客户端未初始化。")
+            return {'success': False, 'error': 'Trading API client not initialized'}
+        try:
+            response = self._trading_execute(self.api_trading, 'GetNotificationPreferences',
+                                             {'PreferenceLevel': preference_level})
+            return {'success': True, 'preferences': self.to_dict_recursive(response.reply)}
+        except ConnectionError as e:
+            logger.error("GetNotificationPreferences 调用失败: %s", e.response.text if e.response else e)
             return {'success': False, 'error': str(e)}
         except Exception as e:
-            error_msg = f"发送消息时发生未知错误: {e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("查询通知订阅时发生未知错误: %s", e)
             return {'success': False, 'error': str(e)}
 
+    def _notification_public_key(self, key_id: str) -> str:
+        """内部方法：按 key_id 查询 Notification API 的签名公钥（缓存在实例上）。"""
+        keys = self.__dict__.setdefault('_notification_keys', {})
+        if key_id not in keys:
+            response = self._first_response(self.api_rest.commerce_notification_get_public_key(public_key_id=key_id))
+            keys[key_id] = response.get('key')
+        return keys[key_id]
+
+    def create_notification_receiver(self, store: OrderStore = None, verification_token: str = None,
+                                     endpoint_url: str = None) -> NotificationReceiver:
+        """
+        创建使用本账户凭据验证签名的通知处理器（见 ebayapi.notifications），
+        配合 NotificationServer 运行即可把订单变化实时写入 store。
+
+        参数:
+            store: 本地订单库 OrderStore
+            verification_token / endpoint_url: Notification API 的端点验证令牌和公网地址（只用 Platform
+                                               Notifications 时可省略）
+        """
+        return NotificationReceiver(
+            store=store, dev_id=self.DEV_ID, app_id=self.APP_ID, cert_id=self.CERT_ID,
+            verification_token=verification_token, endpoint_url=endpoint_url,
+            public_key_lookup=self._notification_public_key if self.api_rest else None,
+        )
+
     # ==================== Marketing API (Promoted Listings) ====================
     
+    @_coalesced
     def get_all_campaigns(self, campaign_status: str = None, campaign_name: str = None, 
                          funding_strategy: str = None, limit: int = 100, offset: int = 0) -> dict:
         """
         获取推广活动列表。
+        按 offset/limit 直接请求服务端对应的一页，翻页时每页只需一次请求。
         
         参数:
             campaign_status: 状态筛选 (RUNNING/PAUSED/ENDED/DRAFT)
@@ -901,101 +2450,261 @@ class EbayAPI:
             dict: {'campaigns': [...], 'total': int, 'limit': int, 'offset': int, 'href': str}
         """
         if not self.api_rest:
-            print("REST API 客户端未初始化，无法查询推广活动。", file=sys.stderr)
+            logger.error("REST API 客户端未初始化，无法查询推广活动。")
             return {'campaigns': [], 'total': 0}
         
         try:
             # 构建查询参数
-            print(f"正在获取推广活动列表...")
+            logger.debug("正在获取推广活动列表...")
             if campaign_status:
-                print(f"  筛选条件 - 状态: {campaign_status}")
+                logger.debug("筛选条件 - 状态: %s", campaign_status)
             if campaign_name:
-                print(f"  筛选条件 - 名称: {campaign_name}")
+                logger.debug("筛选条件 - 名称: %s", campaign_name)
             if funding_strategy:
-                print(f"  筛选条件 - 资金策略: {funding_strategy}")
+                logger.debug("筛选条件 - 资金策略: %s", funding_strategy)
             
-            kwargs = {'limit': min(limit, 500)}
+            # ebay_rest 的分页生成器不接受 offset 参数，只能从第一页开始逐页拉取，
+            # 因此这里直接请求 getCampaigns 的指定页
+            params = {'limit': min(limit, 500), 'offset': offset}
             if campaign_status:
-                kwargs['campaign_status'] = campaign_status
+                params['campaign_status'] = campaign_status
             if campaign_name:
-                kwargs['campaign_name'] = campaign_name
+                params['campaign_name'] = campaign_name
             if funding_strategy:
-                kwargs['funding_strategy'] = funding_strategy
-            
-            response_gen = self.api_rest.sell_marketing_get_campaigns(**kwargs)
-            
-            # 收集所有结果（ebay_rest 生成器会将每个 campaign 拆分为单独的记录）
-            all_campaigns = []
-            total = 0
-            href = ''
-            
-            for page_response in response_gen:
-                # ebay_rest 生成器格式：{'record': {...}} 或 {'total': {...}}
-                if 'record' in page_response:
-                    # 单个 campaign 记录
-                    all_campaigns.append(page_response['record'])
-                elif 'campaigns' in page_response:
-                    # 标准 campaigns 数组格式
-                    all_campaigns.extend(page_response.get('campaigns', []))
-                
-                # 提取 total 字段（可能是 int 或包含 records_available 的 dict）
-                total_field = page_response.get('total', 0)
-                if total_field:
-                    if isinstance(total_field, dict):
-                        total = total_field.get('records_available', 0)
-                    else:
-                        total = total_field
-                    
-                href = page_response.get('href', '')
-                
-                # 如果已收集足够记录，停止
-                if len(all_campaigns) >= (offset + limit):
-                    break
-            
-            # 应用分页
-            start_idx = offset
-            end_idx = offset + limit
-            paginated_campaigns = all_campaigns[start_idx:end_idx]
+                params['funding_strategy'] = funding_strategy
+
+            hit, cached = self._cache_get('get_all_campaigns', params)
+            if hit:
+                return cached
             
-            # 将 snake_case 字段名转换为 camelCase（与 API 文档一致）
-            def snake_to_camel(snake_str):
-                components = snake_str.split('_')
-                return components[0] + ''.join(x.capitalize() for x in components[1:])
+            page = self._rest_request('GET', '/sell/marketing/v1/ad_campaign', params=params).json()
             
-            def normalize_keys(obj):
-                if isinstance(obj, dict):
-                    return {snake_to_camel(k): normalize_keys(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [normalize_keys(item) for item in obj]
-                else:
-                    return obj
+            # total 字段可能是 int 或包含 records_available 的 dict
+            total = page.get('total', 0) or 0
+            if isinstance(total, dict):
+                total = total.get('records_available') or total.get('recordsAvailable', 0)
             
-            normalized_campaigns = [normalize_keys(campaign) for campaign in paginated_campaigns]
+            # 统一字段名为 camelCase（与 API 文档一致）
+            normalized_campaigns = [_normalize_keys(campaign) for campaign in page.get('campaigns') or []]
             
             result = {
                 'campaigns': normalized_campaigns,
                 'total': total,
                 'limit': limit,
                 'offset': offset,
-                'href': href
+                'href': page.get('href', '')
             }
             
-            print(f"成功获取 {len(normalized_campaigns)} 个推广活动（共 {total} 个）")
+            logger.info("成功获取 %s 个推广活动（共 %s 个）", len(normalized_campaigns), total)
+            self._cache_set('get_all_campaigns', params, result)
             
             return result
             
+        except requests.RequestException as e:
+            logger.error("获取推广活动失败: %s", e)
+            return {'campaigns': [], 'total': 0, 'error': str(e)}
         except Error as e:
-            error_msg = f"获取推广活动失败: {e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("获取推广活动失败: %s", e)
             return {'campaigns': [], 'total': 0, 'error': str(e)}
         except Exception as e:
-            error_msg = f"获取推广活动时发生未知错误: {e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("获取推广活动时发生未知错误: %s", e)
             return {'campaigns': [], 'total': 0, 'error': str(e)}
 
-    def add_items_to_campaign(self, campaign_id: str, items: list, use_listing_id: bool = True) -> dict:
+    @staticmethod
+    def _chunked(seq: list, size: int) -> list:
+        """将列表按 size 切分为若干子列表。"""
+        return [seq[i:i + size] for i in range(0, len(seq), size)]
+
+    @staticmethod
+    def _first_response(response) -> dict:
+        """
+        ebay_rest 的单次调用可能返回生成器或字典，统一取出响应字典。
+        """
+        if hasattr(response, '__iter__') and not isinstance(response, (dict, str)):
+            return next(response, {}) or {}
+        if isinstance(response, dict):
+            return response
+        return {}
+
+    @staticmethod
+    def _bulk_status_code(resp: dict):
+        """读取批量响应条目的状态码（兼容 camelCase 与 snake_case）。"""
+        return resp.get('statusCode') or resp.get('status_code')
+
+    @staticmethod
+    def _bulk_item_key(entry: dict) -> str:
+        """
+        提取批量请求/响应条目的标识（listingId 或 inventoryReferenceId），
+        用于把响应与原始请求条目对应起来。
+        """
+        item_id = (entry.get('listingId') or entry.get('listing_id') or
+                   entry.get('inventoryReferenceId') or entry.get('inventory_reference_id'))
+        return str(item_id) if item_id else None
+
+    @staticmethod
+    def _error_status(error: Exception):
+        """
+        取出异常对应的 HTTP 状态码：ebay_rest 的 Error 编号为 99000 + 状态码，
+        requests 的 HTTPError 带有 response。无法确定时返回 None。
+        """
+        if isinstance(error, Error) and 99100 <= (error.number or 0) <= 99599:
+            return error.number - 99000
+        response = getattr(error, 'response', None)
+        return getattr(response, 'status_code', None)
+
+    @classmethod
+    def _is_retryable_error(cls, error: Exception) -> bool:
+        """整次请求失败时是否可以重试：有状态码时按 RETRYABLE_STATUS_CODES 判断，否则只重试网络层错误。"""
+        status = cls._error_status(error)
+        if status is not None:
+            return status in cls.RETRYABLE_STATUS_CODES
+        return isinstance(error, (requests.ConnectionError, requests.Timeout, urllib3.exceptions.HTTPError, OSError))
+
+    @classmethod
+    def _is_retryable_trading_error(cls, error: Exception) -> bool:
+        """
+        Trading 调用失败时是否可以重试。ebaysdk 在 HTTP 错误和 Ack Failure 时都抛出带 response 的 ConnectionError：
+        HTTP 错误按状态码判断；HTTP 200 的 Ack Failure 是 eBay 的明确拒绝，只有 TRADING_RETRYABLE_ERROR_CODES 可以重试。
+        """
+        if cls._error_status(error) != 200:
+            return cls._is_retryable_error(error)
+        errors = getattr(getattr(error.response, 'reply', None), 'Errors', None)
+        if errors is None:
+            return False
+        errors = errors if isinstance(errors, list) else [errors]
+        return any(str(getattr(e, 'ErrorCode', '')) in cls.TRADING_RETRYABLE_ERROR_CODES for e in errors)
+
+    def _run_marketing_bulk(self, send_chunk, bulk_requests: list, max_workers: int = 4,
+                            max_retries: int = 2, operation: str = 'marketing_bulk') -> list:
+        """
+        内部方法：分块并发提交 Marketing 批量请求，并只重新提交可重试的失败条目。
+
+        参数:
+            send_chunk: 接收请求子列表（不超过 MARKETING_BULK_LIMIT 条）并返回 API 响应的函数
+            bulk_requests: 完整的请求条目列表（camelCase 字段）
+            max_workers: 并发提交的线程数
+            max_retries: 可重试失败条目的最大重试轮数
+            operation: 埋点事件中使用的操作名
+
+        返回:
+            list: 合并后的逐条目响应列表，按原始请求顺序排列，每个条目保留最后一次提交的结果
+        """
+        start = time.perf_counter()
+        final_responses = {}
+        extra_responses = []
+        pending = bulk_requests
+        attempt = 0
+
+        while pending:
+            chunks = self._chunked(pending, self.MARKETING_BULK_LIMIT)
+            round_responses = []
+            # 整块提交因网络错误或可重试状态失败的条目（此时条目响应由本地生成，可能没有状态码）
+            chunk_retryable = set()
+
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+                futures = {executor.submit(send_chunk, chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        response = self._first_response(future.result())
+                        round_responses.extend(response.get('responses', []) or [])
+                    except Exception as e:
+                        # 整块请求失败：网络错误和 RETRYABLE_STATUS_CODES 留待重试，其他状态（如 400、404）不再重试
+                        status = self._error_status(e)
+                        retryable = self._is_retryable_error(e)
+                        logger.warning("批量请求块（%s 条）提交失败（%s）: %s", len(chunk), status, e)
+                        for request_item in chunk:
+                            failed = dict(request_item)
+                            failed['statusCode'] = status
+                            failed['errors'] = [{'message': str(e)}]
+                            round_responses.append(failed)
+                            if retryable:
+                                chunk_retryable.add(self._bulk_item_key(request_item))
+            # 本轮提交全部返回后再使缓存失效
+            self._invalidate_for_write(operation)
+
+            pending_by_key = {self._bulk_item_key(r): r for r in pending}
+            retry = []
+            for resp in round_responses:
+                key = self._bulk_item_key(resp)
+                if key is None:
+                    extra_responses.append(resp)
+                    continue
+                final_responses[key] = resp
+
+                # 只重试限流/服务端临时错误和整块的临时失败；缺少状态码的条目响应视为最终结果
+                status = self._bulk_status_code(resp)
+                retryable = key in chunk_retryable or status in self.RETRYABLE_STATUS_CODES
+                if retryable and attempt < max_retries and key in pending_by_key:
+                    retry.append(pending_by_key.pop(key))
+
+            pending = retry
+            attempt += 1
+            if pending:
+                logger.info("重新提交 %s 个可重试的失败条目（第 %s 次重试）...", len(pending), attempt)
+                time.sleep(2 ** (attempt - 1))
+
+        if self.instrumentation is not None:
+            succeeded = sum(1 for r in final_responses.values() if self._bulk_status_code(r) in [200, 201, 204])
+            self.instrumentation.emit(make_event(
+                'rest', operation, time.perf_counter() - start,
+                records=len(bulk_requests), retries=attempt - 1,
+                success=succeeded == len(bulk_requests)
+            ))
+
+        ordered = []
+        for request_item in bulk_requests:
+            key = self._bulk_item_key(request_item)
+            if key in final_responses:
+                ordered.append(final_responses.pop(key))
+        return ordered + list(final_responses.values()) + extra_responses
+
+    def _summarize_bulk_responses(self, responses: list, total_requested: int, action: str) -> dict:
+        """
+        内部方法：统计 Marketing 批量接口的逐条目响应，并打印失败详情。
+
+        返回:
+            dict: {'success': bool, 'responses': [...], 'total_requested': int,
+                   'total_succeeded': int, 'total_failed': int}
+        """
+        # API 返回的字段是 snake_case: status_code 或 statusCode
+        total_succeeded = sum(1 for r in responses if self._bulk_status_code(r) in [200, 201, 204])
+        total_failed = total_requested - total_succeeded
+
+        result = {
+            'success': total_failed == 0,
+            'responses': responses,
+            'total_requested': total_requested,
+            'total_succeeded': total_succeeded,
+            'total_failed': total_failed
+        }
+
+        logger.info("%s完成: %s 成功, %s 失败", action, total_succeeded, total_failed,
+                    extra={'operation': action, 'count': total_requested,
+                           'succeeded': total_succeeded, 'failed': total_failed})
+
+        # 记录失败的详情
+        if total_failed > 0 and logger.isEnabledFor(logging.WARNING):
+            failures = []
+            for resp in responses:
+                status = self._bulk_status_code(resp)
+                if status not in [200, 201, 204]:
+                    # 兼容两种API格式和命名风格
+                    item_id = self._bulk_item_key(resp) or 'Unknown'
+                    errors = resp.get('errors', [])
+                    if errors:
+                        failures.append(f"{item_id}: {errors[0].get('message', 'Unknown error')}")
+            if failures:
+                logger.warning("失败的商品详情: %s", '; '.join(failures))
+
+        return result
+
+    def add_items_to_campaign(self, campaign_id: str, items: list, use_listing_id: bool = True,
+                              max_workers: int = 4, max_retries: int = 2) -> dict:
         """
         为推广活动批量添加商品。
+        商品数量超过 MARKETING_BULK_LIMIT（500）时自动分块并发提交，
+        并只对可重试的失败条目（限流、服务端错误）重新提交。
         
         参数:
             campaign_id: 活动ID
@@ -1011,13 +2720,15 @@ class EbayAPI:
                   - ad_group_id: 广告组ID（CPC模式）
             use_listing_id: True=使用 bulkCreateAdsByListingId (Trading API)，
                            False=使用 bulkCreateAdsByInventoryReference (Inventory API)
+            max_workers: 并发提交的线程数，默认4
+            max_retries: 可重试失败条目的最大重试轮数，默认2
         
         返回:
             dict: {'success': bool, 'responses': [...], 'total_requested': int, 
                    'total_succeeded': int, 'total_failed': int}
         """
         if not self.api_rest:
-            print("REST API 客户端未初始化，无法添加商品到推广活动。", file=sys.stderr)
+            logger.error("REST API 客户端未初始化，无法添加商品到推广活动。")
             return {'success': False, 'error': 'REST API client not initialized'}
         
         if not items:
@@ -1025,7 +2736,7 @@ class EbayAPI:
         
         try:
             # 构建请求数据
-            requests = []
+            bulk_requests = []
             
             if use_listing_id:
                 # Trading API: 使用 listingId
@@ -1037,15 +2748,10 @@ class EbayAPI:
                         request_item['bidPercentage'] = str(item['bid_percentage'])
                     if 'ad_group_id' in item:
                         request_item['adGroupId'] = item['ad_group_id']
-                    requests.append(request_item)
-                
-                print(f"正在为活动 {campaign_id} 批量添加 {len(items)} 个商品 (Trading API)...")
+                    bulk_requests.append(request_item)
                 
-                response = self.api_rest.sell_marketing_bulk_create_ads_by_listing_id(
-                    campaign_id=campaign_id,
-                    content_type='application/json',
-                    body={'requests': requests}
-                )
+                logger.debug("正在为活动 %s 批量添加 %s 个商品 (Trading API)...", campaign_id, len(items))
+                bulk_method = self.api_rest.sell_marketing_bulk_create_ads_by_listing_id
             else:
                 # Inventory API: 使用 inventoryReferenceId
                 for item in items:
@@ -1057,68 +2763,128 @@ class EbayAPI:
                         request_item['bidPercentage'] = str(item['bid_percentage'])
                     if 'ad_group_id' in item:
                         request_item['adGroupId'] = item['ad_group_id']
-                    requests.append(request_item)
-                
-                print(f"正在为活动 {campaign_id} 批量添加 {len(items)} 个商品 (Inventory API)...")
+                    bulk_requests.append(request_item)
                 
-                response = self.api_rest.sell_marketing_bulk_create_ads_by_inventory_reference(
+                logger.debug("正在为活动 %s 批量添加 %s 个商品 (Inventory API)...", campaign_id, len(items))
+                bulk_method = self.api_rest.sell_marketing_bulk_create_ads_by_inventory_reference
+
+            def send_chunk(chunk):
+                return bulk_method(
                     campaign_id=campaign_id,
                     content_type='application/json',
-                    body={'requests': requests}
+                    body={'requests': chunk}
                 )
+
+            responses = self._run_marketing_bulk(send_chunk, bulk_requests, max_workers=max_workers,
+                                                 max_retries=max_retries, operation='bulk_create_ads')
             
-            # 检查是否是生成器还是直接返回的字典
-            if hasattr(response, '__iter__') and not isinstance(response, (dict, str)):
-                response = next(response, {})
-            elif isinstance(response, dict):
-                # 直接返回的字典
-                pass
-            else:
-                response = {}
-            
-            # 统计结果
-            responses = response.get('responses', [])
-            total_requested = len(items)
-            # API 返回的字段是 snake_case: status_code 或 statusCode
-            total_succeeded = sum(1 for r in responses 
-                                if r.get('statusCode') in [200, 201] or r.get('status_code') in [200, 201])
-            total_failed = total_requested - total_succeeded
-            
-            result = {
-                'success': total_failed == 0,
-                'responses': responses,
-                'total_requested': total_requested,
-                'total_succeeded': total_succeeded,
-                'total_failed': total_failed
-            }
-            
-            print(f"添加完成: {total_succeeded} 成功, {total_failed} 失败")
-            
-            # 打印失败的详情
-            if total_failed > 0:
-                print("\n失败的商品详情:")
-                for resp in responses:
-                    status = resp.get('statusCode') or resp.get('status_code')
-                    if status not in [200, 201]:
-                        # 兼容两种API格式和命名风格
-                        item_id = (resp.get('listingId') or resp.get('listing_id') or 
-                                 resp.get('inventoryReferenceId') or resp.get('inventory_reference_id') or 'Unknown')
-                        errors = resp.get('errors', [])
-                        if errors:
-                            error_msg = errors[0].get('message', 'Unknown error')
-                            print(f"  - {item_id}: {error_msg}")
-            
-            return result
+            return self._summarize_bulk_responses(responses, len(items), '添加')
             
         except Error as e:
-            error_msg = f"添加商品到推广活动失败: {e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("添加商品到推广活动失败: %s", e)
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            logger.error("添加商品到推广活动时发生未知错误: %s", e)
+            return {'success': False, 'error': str(e)}
+
+    def update_ad_bids(self, campaign_id: str, bids: dict, max_workers: int = 4,
+                       max_retries: int = 2) -> dict:
+        """
+        批量更新推广活动中广告的费率（仅适用于 CPS 模式），使用 bulkUpdateAdsBidByListingId。
+        超过 MARKETING_BULK_LIMIT（500）条时自动分块并发提交。
+
+        参数:
+            campaign_id: 活动ID
+            bids: {listing_id: bid_percentage} 字典，例如 {'123456789012': 5.5}
+            max_workers: 并发提交的线程数，默认4
+            max_retries: 可重试失败条目的最大重试轮数，默认2
+
+        返回:
+            dict: {'success': bool, 'responses': [...], 'total_requested': int,
+                   'total_succeeded': int, 'total_failed': int}
+        """
+        if not self.api_rest:
+            logger.error("REST API 客户端未初始化，无法更新广告费率。")
+            return {'success': False, 'error': 'REST API client not initialized'}
+
+        if not bids:
+            return {'success': False, 'error': '费率字典不能为空'}
+
+        try:
+            bulk_requests = [
+                {'listingId': str(listing_id), 'bidPercentage': str(bid_percentage)}
+                for listing_id, bid_percentage in bids.items()
+            ]
+
+            logger.debug("正在为活动 %s 批量更新 %s 个广告的费率...", campaign_id, len(bulk_requests))
+
+            def send_chunk(chunk):
+                return self.api_rest.sell_marketing_bulk_update_ads_bid_by_listing_id(
+                    campaign_id=campaign_id,
+                    content_type='application/json',
+                    body={'requests': chunk}
+                )
+
+            responses = self._run_marketing_bulk(send_chunk, bulk_requests, max_workers=max_workers,
+                                                 max_retries=max_retries, operation='bulk_update_ads_bid')
+            return self._summarize_bulk_responses(responses, len(bulk_requests), '费率更新')
+
+        except Error as e:
+            logger.error("批量更新广告费率失败: %s", e)
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            logger.error("批量更新广告费率时发生未知错误: %s", e)
+            return {'success': False, 'error': str(e)}
+
+    def remove_ads(self, campaign_id: str, listing_ids: list, max_workers: int = 4,
+                   max_retries: int = 2) -> dict:
+        """
+        从推广活动中批量删除广告（仅适用于 CPS 模式），使用 bulkDeleteAdsByListingId。
+        超过 MARKETING_BULK_LIMIT（500）条时自动分块并发提交。
+
+        参数:
+            campaign_id: 活动ID
+            listing_ids: 要删除广告的商品ID列表
+            max_workers: 并发提交的线程数，默认4
+            max_retries: 可重试失败条目的最大重试轮数，默认2
+
+        返回:
+            dict: {'success': bool, 'responses': [...], 'total_requested': int,
+                   'total_succeeded': int, 'total_failed': int}
+        """
+        if not self.api_rest:
+            logger.error("REST API 客户端未初始化，无法删除广告。")
+            return {'success': False, 'error': 'REST API client not initialized'}
+
+        if not listing_ids:
+            return {'success': False, 'error': '商品ID列表不能为空'}
+
+        try:
+            # 去重，避免同一商品在多个块中重复提交
+            bulk_requests = [{'listingId': listing_id}
+                             for listing_id in dict.fromkeys(str(i) for i in listing_ids)]
+
+            logger.debug("正在从活动 %s 批量删除 %s 个广告...", campaign_id, len(bulk_requests))
+
+            def send_chunk(chunk):
+                return self.api_rest.sell_marketing_bulk_delete_ads_by_listing_id(
+                    campaign_id=campaign_id,
+                    content_type='application/json',
+                    body={'requests': chunk}
+                )
+
+            responses = self._run_marketing_bulk(send_chunk, bulk_requests, max_workers=max_workers,
+                                                 max_retries=max_retries, operation='bulk_delete_ads')
+            return self._summarize_bulk_responses(responses, len(bulk_requests), '删除')
+
+        except Error as e:
+            logger.error("批量删除广告失败: %s", e)
             return {'success': False, 'error': str(e)}
         except Exception as e:
-            error_msg = f"添加商品到推广活动时发生未知错误: {e}"
-            print(error_msg, file=sys.stderr)
+            logger.error("批量删除广告时发生未知错误: %s", e)
             return {'success': False, 'error': str(e)}
 
+    @_coalesced
     def get_campaign_ads(self, campaign_id: str, limit: int = 500, debug: bool = False) -> dict:
         """
         获取推广活动中的所有广告（商品）。
@@ -1126,14 +2892,19 @@ class EbayAPI:
         参数:
             campaign_id: 活动ID
             limit: 每页数量，默认500
-            debug: 是否启用调试输出
+            debug: 是否输出逐条响应的调试日志（DEBUG 级别）
             
         返回:
             dict: {'ads': [...], 'total': int, 'inventory_ids': set, 'listing_ids': set}
         """
         if not self.api_rest:
-            print("REST API 客户端未初始化。", file=sys.stderr)
+            logger.error("REST API 客户端未初始化。")
             return {'ads': [], 'total': 0, 'inventory_ids': set(), 'listing_ids': set()}
+
+        cache_params = {'campaign_id': campaign_id}
+        hit, cached = self._cache_get('get_campaign_ads', cache_params)
+        if hit:
+            return cached
         
         try:
             response_gen = self.api_rest.sell_marketing_get_ads(
@@ -1146,18 +2917,18 @@ class EbayAPI:
             listing_ids = set()
             total = 0
             page_count = 0
+            started = time.perf_counter()
             
             for page_response in response_gen:
                 page_count += 1
                 
                 if debug:
-                    print(f"\n[DEBUG] getAds 第 {page_count} 页")
-                    print(f"[DEBUG] 响应键: {list(page_response.keys())}")
+                    logger.debug("getAds 第 %s 条响应, 键: %s", page_count, list(page_response.keys()))
                     for key, value in page_response.items():
                         value_str = str(value)
                         if len(value_str) > 100:
                             value_str = value_str[:100] + '...'
-                        print(f"[DEBUG]   - {key}: {type(value).__name__} = {value_str}")
+                        logger.debug("  - %s: %s = %s", key, type(value).__name__, value_str)
                 
                 # ebay_rest 生成器格式：{'record': {...}} 或 {'ads': [...]} 或 {'total': {...}}
                 if 'record' in page_response:
@@ -1176,7 +2947,7 @@ class EbayAPI:
                         listing_ids.add(str(listing_id))
                     
                     if debug:
-                        print(f"[DEBUG] 找到 ad: listing_id={listing_id}, inv_ref_id={inv_ref_id}")
+                        logger.debug("找到 ad: listing_id=%s, inv_ref_id=%s", listing_id, inv_ref_id)
                         
                 elif 'ads' in page_response:
                     # 标准 ads 数组格式
@@ -1194,7 +2965,7 @@ class EbayAPI:
                             listing_ids.add(str(listing_id))
                     
                     if debug:
-                        print(f"[DEBUG] 找到 {len(ads)} 个 ads")
+                        logger.debug("找到 %s 个 ads", len(ads))
                 
                 # 提取 total 字段
                 total_field = page_response.get('total', 0)
@@ -1205,32 +2976,470 @@ class EbayAPI:
                         total = total_field
                     
                     if debug:
-                        print(f"[DEBUG] total = {total}")
+                        logger.debug("total = %s", total)
             
-            if debug:
-                print(f"\n[DEBUG] 总结:")
-                print(f"[DEBUG]   - 处理了 {page_count} 页")
-                print(f"[DEBUG]   - 收集到 {len(all_ads)} 个 ads")
-                print(f"[DEBUG]   - inventory_ids: {len(inventory_ids)} 个")
-                print(f"[DEBUG]   - listing_ids: {len(listing_ids)} 个")
-                print(f"[DEBUG]   - API 报告 total: {total}")
+            duration = time.perf_counter() - started
+            logger.info("活动 %s: 收集到 %s 个 ads（inventory_ids %s 个, listing_ids %s 个, API 报告 total %s, %.2f 秒）",
+                        campaign_id, len(all_ads), len(inventory_ids), len(listing_ids), total, duration,
+                        extra={'operation': 'getAds', 'count': len(all_ads), 'duration': duration})
             
-            return {
+            result = {
                 'ads': all_ads,
                 'total': total if total > 0 else len(all_ads),
                 'inventory_ids': inventory_ids,
                 'listing_ids': listing_ids
             }
+            self._cache_set('get_campaign_ads', cache_params, result)
+            return result
             
         except Error as e:
-            print(f"获取推广活动商品失败: {e}", file=sys.stderr)
+            logger.error("获取推广活动商品失败: %s", e)
             return {'ads': [], 'total': 0, 'inventory_ids': set(), 'listing_ids': set(), 'error': str(e)}
         except Exception as e:
-            print(f"获取推广活动商品时发生未知错误: {e}", file=sys.stderr)
-            import traceback
-            traceback.print_exc()
+            logger.exception("获取推广活动商品时发生未知错误: %s", e)
             return {'ads': [], 'total': 0, 'inventory_ids': set(), 'listing_ids': set(), 'error': str(e)}
 
+    def reconcile(self, date_from: datetime, date_to: datetime, include_orders: bool = True) -> dict:
+        """
+        对账：流式拉取时间窗口内的全部 Finances 交易和 payout，并与 GetOrders 的订单按订单号合并，
+        得到每个订单的销售额、成交费、广告费、退款、运单费用和净收入。
+        所有记录逐页汇入本地明细，再按订单号分组汇总，不逐单调用 API。
+
+        参数:
+            date_from / date_to: 对账窗口（交易日期与 payout 日期）
+            include_orders: 是否同时拉取窗口内创建的订单以补充订单日期、买家和订单金额
+
+        返回:
+            dict: {'success': bool, 'table': ReconciliationTable, 'error': str}
+                  table.to_rows() / totals() / payout_summary() / to_csv() / to_dataframe()
+        """
+        if not self.api_rest:
+            logger.error("REST API 客户端未初始化，无法对账。")
+            return {'success': False, 'table': None, 'error': 'REST API client not initialized'}
+
+        date_from_zulu = date_from.strftime('%Y-%m-%dT%H:%M:%SZ')
+        date_to_zulu = date_to.strftime('%Y-%m-%dT%H:%M:%SZ')
+        table = ReconciliationTable()
+        started = time.perf_counter()
+
+        try:
+            transaction_count = 0
+            for tx_wrapper in self.api_rest.sell_finances_get_transactions(
+                    filter=f"transactionDate:[{date_from_zulu}..{date_to_zulu}]",
+                    x_ebay_c_marketplace_id=self.marketplace_id):
+                record = tx_wrapper.get('record')
+                if isinstance(record, dict):
+                    table.add_transaction(record)
+                    transaction_count += 1
+            logger.debug("对账: 已汇入 %s 条交易", transaction_count)
+
+            for payout_wrapper in self.api_rest.sell_finances_get_payouts(
+                    filter=f"payoutDate:[{date_from_zulu}..{date_to_zulu}]",
+                    x_ebay_c_marketplace_id=self.marketplace_id):
+                record = payout_wrapper.get('record')
+                if isinstance(record, dict):
+                    table.add_payout(record)
+            logger.debug("对账: 已汇入 %s 个 payout", len(table.payouts))
+
+            if include_orders and self.api_trading:
+                for order in self._iter_trading_records(
+                        'GetOrders', lambda page: self._orders_request(date_from, date_to, 'All', page),
+                        'OrderArray', 'Order', 'HasMoreOrders'):
+                    table.add_order(order)
+        except Exception as e:
+            logger.error("对账过程中发生错误: %s", e)
+            return {'success': False, 'table': table, 'error': str(e)}
+
+        duration = time.perf_counter() - started
+        logger.info("对账完成: %s 个订单，%s 条交易，%s 个 payout（%.2f 秒）。",
+                    len(table), transaction_count, len(table.payouts), duration,
+                    extra={'operation': 'reconcile', 'count': len(table), 'duration': duration})
+        return {'success': True, 'table': table, 'error': None}
+
+    def reconcile_month(self, year: int, month: int, include_orders: bool = True) -> dict:
+        """按自然月（UTC）对账，参数与返回值见 reconcile。"""
+        date_from = datetime(year, month, 1, tzinfo=timezone.utc)
+        next_month = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+        return self.reconcile(date_from, next_month - timedelta(seconds=1), include_orders=include_orders)
+
+    def create_ad_report_task(self, date_from: datetime, date_to: datetime, campaign_ids: list = None,
+                              report_type: str = 'LISTING_PERFORMANCE_REPORT',
+                              metric_keys: list = None, funding_model: str = 'COST_PER_SALE') -> dict:
+        """
+        创建 Promoted Listings 报告任务（createReportTask），按商品和日期维度生成报告。
+
+        参数:
+            date_from: 报告开始时间（datetime对象）
+            date_to: 报告结束时间（datetime对象）
+            campaign_ids: 活动ID列表，默认包含所有活动
+            report_type: 报告类型，默认 LISTING_PERFORMANCE_REPORT
+            metric_keys: 指标列表，默认 impressions/clicks/sale_quantity/sales/ad_fees
+            funding_model: 资金模式，默认 COST_PER_SALE
+
+        返回:
+            dict: {'success': bool, 'report_task_id': str, 'error': str}
+        """
+        if not self.api_rest:
+            logger.error("REST API 客户端未初始化，无法创建报告任务。")
+            return {'success': False, 'error': 'REST API client not initialized'}
+
+        body = {
+            'reportType': report_type,
+            'reportFormat': 'TSV_GZIP',
+            'marketplaceId': self.marketplace_id,
+            'fundingModels': [funding_model],
+            'dateFrom': date_from.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'dateTo': date_to.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'dimensions': [{'dimensionKey': 'listing_id'}, {'dimensionKey': 'day'}],
+            'metricKeys': metric_keys or ['impressions', 'clicks', 'sale_quantity', 'sales', 'ad_fees'],
+        }
+        if campaign_ids:
+            body['campaignIds'] = [str(campaign_id) for campaign_id in campaign_ids]
+
+        try:
+            logger.info("正在创建广告报告任务: %s ~ %s", body['dateFrom'], body['dateTo'])
+            response = self._rest_request('POST', '/sell/marketing/v1/ad_report_task', body=body)
+            # 报告任务ID位于 Location 响应头的末尾
+            location = response.headers.get('Location', '')
+            report_task_id = location.rstrip('/').rsplit('/', 1)[-1] if location else None
+            if not report_task_id:
+                return {'success': False, 'error': '响应中缺少报告任务ID (Location 头)'}
+            logger.info("报告任务已创建: %s", report_task_id)
+            return {'success': True, 'report_task_id': report_task_id}
+        except requests.RequestException as e:
+            logger.error("创建广告报告任务失败: %s", e)
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            logger.error("创建广告报告任务时发生未知错误: %s", e)
+            return {'success': False, 'error': str(e)}
+
+    def wait_for_ad_report_task(self, report_task_id: str, poll_interval: int = 30,
+                                timeout: int = 1800) -> dict:
+        """
+        轮询报告任务状态（getReportTask），直到成功、失败或超时。
+        注意：ad_report_task 接口每个用户每小时最多调用 200 次，poll_interval 不宜过小。
+
+        参数:
+            report_task_id: 报告任务ID
+            poll_interval: 轮询间隔（秒），默认30
+            timeout: 最长等待时间（秒），默认1800
+
+        返回:
+            dict: {'success': bool, 'task': dict, 'report_href': str, 'error': str}
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                task = self._rest_request('GET', f'/sell/marketing/v1/ad_report_task/{report_task_id}').json()
+                status = task.get('reportTaskStatus')
+                logger.debug("报告任务 %s 状态: %s", report_task_id, status)
+
+                if status == 'SUCCESS':
+                    return {'success': True, 'task': task, 'report_href': task.get('reportHref')}
+                if status == 'FAILED':
+                    return {'success': False, 'task': task,
+                            'error': task.get('reportTaskStatusMessage', '报告生成失败')}
+                if time.monotonic() + poll_interval > deadline:
+                    return {'success': False, 'task': task, 'error': f'等待报告任务超时（{timeout} 秒）'}
+                time.sleep(poll_interval)
+        except requests.RequestException as e:
+            logger.error("查询广告报告任务失败: %s", e)
+            return {'success': False, 'error': str(e)}
+
+    @staticmethod
+    def _open_maybe_gzip(raw):
+        """内部方法：按 gzip 魔数（1f 8b）判断流是否需要解压，返回可读的二进制流。"""
+        # 读到末尾时 urllib3 默认自动关闭底层连接，BufferedReader 之后的读取会报 "read of closed file"
+        raw.auto_close = False
+        stream = io.BufferedReader(raw)
+        if stream.peek(2)[:2] == b'\x1f\x8b':
+            return gzip.GzipFile(fileobj=stream)
+        return stream
+
+    def download_ad_report(self, report_href: str, table: AdReportTable = None) -> AdReportTable:
+        """
+        下载报告文件（TSV gzip），边下载边解压边解析到本地表中，不在内存中保留整个文件。
+
+        参数:
+            report_href: getReportTask 返回的 reportHref
+            table: 追加数据的目标表，默认新建
+
+        返回:
+            AdReportTable: 以 (listing_id, day) 为键的本地报告表
+        """
+        table = table if table is not None else AdReportTable()
+        response = self._rest_request('GET', report_href, stream=True,
+                                      headers={'Accept': 'application/octet-stream'})
+        try:
+            # 传输层的 Content-Encoding 由 urllib3 解码；文件本身是否为 gzip 按前两个字节判断
+            response.raw.decode_content = True
+            with self._open_maybe_gzip(response.raw) as stream:
+                count = table.load_tsv(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        finally:
+            response.close()
+        logger.info("报告下载完成，解析 %s 行，共 %s 个 (商品, 日期) 记录", count, len(table))
+        return table
+
+    def get_ad_performance_report(self, date_from: datetime, date_to: datetime,
+                                  campaign_ids: list = None, poll_interval: int = 30,
+                                  timeout: int = 1800) -> dict:
+        """
+        完整执行广告报告流程：创建任务 -> 轮询 -> 下载并解析为本地表。
+        之后的花费 / 销售额 / ROAS 查询均在本地表上完成，例如：
+            report = api.get_ad_performance_report(start, end)['report']
+            report.summary_by_listing()          # 每个商品的 spend/sales/roas
+            report.spend_for_listing('1234567')  # 单个商品的广告花费
+
+        参数:
+            date_from: 报告开始时间（datetime对象）
+            date_to: 报告结束时间（datetime对象）
+            campaign_ids: 活动ID列表，默认包含所有活动
+            poll_interval: 轮询间隔（秒）
+            timeout: 最长等待时间（秒）
+
+        返回:
+            dict: {'success': bool, 'report': AdReportTable, 'report_task_id': str, 'error': str}
+        """
+        created = self.create_ad_report_task(date_from, date_to, campaign_ids=campaign_ids)
+        if not created.get('success'):
+            return {'success': False, 'report': None, 'error': created.get('error')}
+
+        report_task_id = created['report_task_id']
+        task = self.wait_for_ad_report_task(report_task_id, poll_interval=poll_interval, timeout=timeout)
+        if not task.get('success'):
+            return {'success': False, 'report': None, 'report_task_id': report_task_id,
+                    'error': task.get('error')}
+
+        try:
+            report = self.download_ad_report(task['report_href'])
+            return {'success': True, 'report': report, 'report_task_id': report_task_id}
+        except Exception as e:
+            logger.error("下载或解析广告报告时发生错误: %s", e)
+            return {'success': False, 'report': None, 'report_task_id': report_task_id, 'error': str(e)}
+
+    # ==================== Sell Feed API (LMS 报告) ====================
+
+    def create_feed_task(self, feed_type: str, schema_version: str, filter_criteria: dict = None) -> dict:
+        """
+        创建 Feed API 下载任务（createTask），如 LMS_ACTIVE_INVENTORY_REPORT、LMS_ORDER_REPORT。
+
+        参数:
+            feed_type: 报告类型
+            schema_version: 报告的 schema 版本
+            filter_criteria: 过滤条件（如订单报告的 creationDateRange / orderStatus）
+
+        返回:
+            dict: {'success': bool, 'task_id': str, 'error': str}
+        """
+        if not self.api_rest:
+            logger.error("REST API 客户端未初始化，无法创建 Feed 任务。")
+            return {'success': False, 'error': 'REST API client not initialized'}
+
+        body = {'feedType': feed_type, 'schemaVersion': schema_version}
+        if filter_criteria:
+            body['filterCriteria'] = filter_criteria
+
+        try:
+            logger.info("正在创建 Feed 任务: %s", feed_type)
+            response = self._rest_request('POST', '/sell/feed/v1/task', body=body)
+            # 任务ID位于 Location 响应头的末尾
+            location = response.headers.get('Location', '')
+            task_id = location.rstrip('/').rsplit('/', 1)[-1] if location else None
+            if not task_id:
+                return {'success': False, 'error': '响应中缺少任务ID (Location 头)'}
+            logger.info("Feed 任务已创建: %s", task_id)
+            return {'success': True, 'task_id': task_id}
+        except requests.RequestException as e:
+            logger.error("创建 Feed 任务失败: %s", e)
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            logger.error("创建 Feed 任务时发生未知错误: %s", e)
+            return {'success': False, 'error': str(e)}
+
+    def wait_for_feed_task(self, task_id: str, poll_interval: int = 30, timeout: int = 3600) -> dict:
+        """
+        轮询 Feed 任务状态（getTask），直到完成、失败或超时。
+
+        返回:
+            dict: {'success': bool, 'task': dict, 'error': str}
+                  COMPLETED_WITH_ERROR 也视为成功（部分记录有错误），task 中保留原始状态
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                task = self._rest_request('GET', f'/sell/feed/v1/task/{task_id}').json()
+                status = task.get('status')
+                logger.debug("Feed 任务 %s 状态: %s", task_id, status)
+
+                if status in ('COMPLETED', 'COMPLETED_WITH_ERROR'):
+                    if status == 'COMPLETED_WITH_ERROR':
+                        logger.warning("Feed 任务 %s 完成但部分记录有错误", task_id)
+                    return {'success': True, 'task': task}
+                if status == 'FAILED':
+                    return {'success': False, 'task': task, 'error': 'Feed 任务执行失败'}
+                if time.monotonic() + poll_interval > deadline:
+                    return {'success': False, 'task': task, 'error': f'等待 Feed 任务超时（{timeout} 秒）'}
+                time.sleep(poll_interval)
+        except requests.RequestException as e:
+            logger.error("查询 Feed 任务失败: %s", e)
+            return {'success': False, 'error': str(e)}
+
+    def download_feed_file(self, task_id: str, path: str = None) -> str:
+        """
+        下载 Feed 任务的结果文件（getResultFile，通常为 zip 压缩的 XML），边下载边写入磁盘。
+
+        参数:
+            task_id: 任务ID
+            path: 保存路径，默认写入临时文件
+
+        返回:
+            str: 文件路径
+        """
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix=f'ebay_feed_{task_id}_', suffix='.zip')
+            os.close(fd)
+        response = self._rest_request('GET', f'/sell/feed/v1/task/{task_id}/download_result_file', stream=True,
+                                      headers={'Accept': 'application/octet-stream'})
+        try:
+            response.raw.decode_content = True
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, 1024 * 1024)
+        finally:
+            response.close()
+        logger.debug("Feed 结果文件已下载: %s（%s 字节）", path, os.path.getsize(path))
+        return path
+
+    @staticmethod
+    def _iter_feed_file(path: str, element: str, record_path: str, list_nodes=(), datetime_nodes=(),
+                        container: str = None):
+        """内部方法：流式解析结果文件（zip 内的每个 XML，或未压缩的 XML）中的记录。"""
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for name in archive.namelist():
+                    if name.endswith('/'):
+                        continue
+                    with archive.open(name) as member:
+                        yield from iter_xml_records(member, element, record_path, list_nodes, datetime_nodes,
+                                                    container)
+        else:
+            yield from iter_xml_records(path, element, record_path, list_nodes, datetime_nodes, container)
+
+    @staticmethod
+    def _inventory_report_listing(sku_details: dict) -> dict:
+        """
+        把活动库存报告的 SKUDetails 转换为 get_all_listings 元素的子集：
+        只有 ItemID、SKU、Quantity、SellingStatus（CurrentPrice、ListingStatus）和 Variations。
+        报告不提供 ListingDetails（EndTime、ViewItemURL 等）、Title、QuantitySold，这些键不存在，
+        因此不能用 EndTime 判断是否在售（records.Listing.is_active() 对这些商品总是返回 False）；
+        报告中的商品都是在售商品，ListingStatus 固定为 Active。
+        """
+        price = sku_details.get('Price')
+        listing = {
+            'ItemID': sku_details.get('ItemID'),
+            'SKU': sku_details.get('SKU'),
+            'Quantity': sku_details.get('Quantity'),
+            # 带 currencyID 属性的 Price 已解析为 {'value': ...}，与 GetSellerList 的 CurrentPrice 相同
+            'SellingStatus': {'CurrentPrice': price if isinstance(price, dict) else {'value': price},
+                              'ListingStatus': 'Active'},
+        }
+        if sku_details.get('Variations'):
+            listing['Variations'] = sku_details['Variations']
+        return listing
+
+    def _run_feed_report(self, feed_type: str, schema_version: str, filter_criteria: dict,
+                         poll_interval: int, timeout: int):
+        """内部方法：创建任务 -> 轮询 -> 下载，返回 (task_id, 文件路径, 错误信息)。"""
+        created = self.create_feed_task(feed_type, schema_version, filter_criteria)
+        if not created.get('success'):
+            return None, None, created.get('error')
+        task_id = created['task_id']
+        task = self.wait_for_feed_task(task_id, poll_interval=poll_interval, timeout=timeout)
+        if not task.get('success'):
+            return task_id, None, task.get('error')
+        try:
+            return task_id, self.download_feed_file(task_id), None
+        except Exception as e:
+            logger.error("下载 Feed 结果文件时发生错误: %s", e)
+            return task_id, None, str(e)
+
+    def export_active_inventory(self, poll_interval: int = 30, timeout: int = 3600,
+                                keep_file: bool = False) -> dict:
+        """
+        通过 LMS_ACTIVE_INVENTORY_REPORT 一次性导出全部在售商品，代替逐页调用 GetSellerList。
+        报告只包含 ItemID、SKU、数量、价格和多属性信息，返回的商品字典是 get_all_listings 元素的子集
+        （价格位于 SellingStatus.CurrentPrice.value），没有 ListingDetails / EndTime / Title，
+        不能代替需要这些字段的 get_active_listings 结果（见 _inventory_report_listing）。
+
+        参数:
+            poll_interval / timeout: 轮询间隔与最长等待时间（秒）
+            keep_file: 是否保留下载的结果文件（路径见返回值 file）
+
+        返回:
+            dict: {'success': bool, 'listings': [...], 'task_id': str, 'file': str, 'error': str}
+        """
+        task_id, path, error = self._run_feed_report('LMS_ACTIVE_INVENTORY_REPORT', '1.0', None,
+                                                     poll_interval, timeout)
+        if error:
+            return {'success': False, 'listings': [], 'task_id': task_id, 'error': error}
+        try:
+            listings = [self._inventory_report_listing(record) for record in self._iter_feed_file(
+                path, 'SKUDetails', 'activeinventoryreport.skudetails',
+                list_nodes=('activeinventoryreport.skudetails.variations.variation',))]
+        except Exception as e:
+            logger.error("解析活动库存报告时发生错误: %s", e)
+            return {'success': False, 'listings': [], 'task_id': task_id, 'file': path, 'error': str(e)}
+        finally:
+            if not keep_file and os.path.exists(path):
+                os.remove(path)
+        logger.info("活动库存报告解析完成，共 %s 个商品", len(listings),
+                    extra={'operation': 'LMS_ACTIVE_INVENTORY_REPORT', 'count': len(listings)})
+        return {'success': True, 'listings': listings, 'task_id': task_id,
+                'file': path if keep_file else None, 'error': None}
+
+    def export_orders(self, date_from: datetime, date_to: datetime, order_status: str = None,
+                      poll_interval: int = 30, timeout: int = 3600, keep_file: bool = False) -> dict:
+        """
+        通过 LMS_ORDER_REPORT 一次性导出时间范围内创建的订单，代替逐页调用 GetOrders。
+        报告中的订单与 GetOrders 格式相同，返回的订单字典结构与 get_orders_last_days 一致。
+
+        参数:
+            date_from / date_to: 订单创建时间范围
+            order_status: 订单状态过滤（ACTIVE / COMPLETED），默认不过滤
+            poll_interval / timeout: 轮询间隔与最长等待时间（秒）
+            keep_file: 是否保留下载的结果文件
+
+        返回:
+            dict: {'success': bool, 'orders': [...], 'task_id': str, 'file': str, 'error': str}
+        """
+        filter_criteria = {
+            'creationDateRange': {
+                'from': date_from.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'to': date_to.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            }
+        }
+        if order_status:
+            filter_criteria['orderStatus'] = order_status
+
+        task_id, path, error = self._run_feed_report('LMS_ORDER_REPORT', '1235', filter_criteria,
+                                                     poll_interval, timeout)
+        if error:
+            return {'success': False, 'orders': [], 'task_id': task_id, 'error': error}
+        list_nodes, datetime_nodes = (self._trading_parse_config(self.api_trading, 'GetOrders')
+                                      if self.api_trading else ((), ()))
+        try:
+            orders = list(self._iter_feed_file(path, 'Order', 'getordersresponse.orderarray.order',
+                                               list_nodes, datetime_nodes, container='OrderArray'))
+        except Exception as e:
+            logger.error("解析订单报告时发生错误: %s", e)
+            return {'success': False, 'orders': [], 'task_id': task_id, 'file': path, 'error': str(e)}
+        finally:
+            if not keep_file and os.path.exists(path):
+                os.remove(path)
+        logger.info("订单报告解析完成，共 %s 个订单", len(orders),
+                    extra={'operation': 'LMS_ORDER_REPORT', 'count': len(orders)})
+        return {'success': True, 'orders': orders, 'task_id': task_id,
+                'file': path if keep_file else None, 'error': None}
+
     @staticmethod
     def to_dict_recursive(obj) -> any:
         """
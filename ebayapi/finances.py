@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Finances API 交易记录的内存索引。
+
+一次拉取某个时间窗口内的全部交易后建立哈希索引：
+    - 交易自身的 order_id / payout_id / transaction_id
+    - references 中的每个 reference_type → reference_id（ORDER_ID、ITEM_ID 等）
+之后按订单号、付款（payout）号、交易号查询都是 O(1)，不再逐条遍历 references。
+"""
+import time
+from datetime import datetime, timezone
+
+# 交易记录自身字段与索引中的引用类型的对应关系
+RECORD_KEY_FIELDS = (
+    ('order_id', 'ORDER_ID'),
+    ('payout_id', 'PAYOUT_ID'),
+    ('transaction_id', 'TRANSACTION_ID'),
+)
+
+
+def _as_utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _transaction_date(record: dict):
+    """解析交易记录的 transaction_date（如 2026-10-01T12:00:00.000Z），无法解析时返回 None。"""
+    value = record.get('transaction_date')
+    if isinstance(value, datetime):
+        return _as_utc(value)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return _as_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+
+def is_advertising_fee(transaction: dict) -> bool:
+    """判断一条交易是否为 Promoted Listings 广告费。"""
+    if transaction.get('fee_type') == 'AD_FEE':
+        return True
+    memo = transaction.get('transaction_memo') or ''
+    return 'Promoted Listings' in memo
+
+
+class TransactionIndex:
+    """
+    交易记录索引。
+
+    参数:
+        records: 交易记录（ebay_rest 生成器中的 record 字典）
+        date_from / date_to: 拉取的时间窗口，用于判断索引能否复用
+        filter_query: 拉取时使用的服务端过滤条件（只有条件相同的查询才能复用索引）
+    """
+
+    def __init__(self, records=(), date_from: datetime = None, date_to: datetime = None,
+                 filter_query: str = None):
+        self.records = []
+        self.date_from = date_from
+        self.date_to = date_to
+        self.filter_query = filter_query
+        self.created_at = time.time()
+        self._index = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: dict):
+        """加入一条交易记录并建立索引。"""
+        self.records.append(record)
+        keys = set()
+        for field, reference_type in RECORD_KEY_FIELDS:
+            value = record.get(field)
+            if value:
+                keys.add((reference_type, str(value)))
+        references = record.get('references') or []
+        if isinstance(references, list):
+            for ref in references:
+                if isinstance(ref, dict) and ref.get('reference_type') and ref.get('reference_id'):
+                    keys.add((ref['reference_type'], str(ref['reference_id'])))
+        for reference_type, reference_id in keys:
+            self._index.setdefault(reference_type, {}).setdefault(reference_id, []).append(record)
+
+    def by_reference(self, reference_type: str, reference_id: str) -> list:
+        """按引用类型和值查询交易记录，按拉取顺序返回。"""
+        return list(self._index.get(reference_type, {}).get(str(reference_id), ()))
+
+    def by_order(self, order_id: str) -> list:
+        return self.by_reference('ORDER_ID', order_id)
+
+    def by_payout(self, payout_id: str) -> list:
+        return self.by_reference('PAYOUT_ID', payout_id)
+
+    def by_transaction_id(self, transaction_id: str) -> list:
+        return self.by_reference('TRANSACTION_ID', transaction_id)
+
+    def reference_ids(self, reference_type: str) -> list:
+        """返回索引中某类引用的全部取值，如 reference_ids('ORDER_ID')。"""
+        return list(self._index.get(reference_type, {}))
+
+    def covers(self, date_from: datetime, date_to: datetime, filter_query: str = None) -> bool:
+        """索引的时间窗口是否包含 [date_from, date_to]，且过滤条件相同。"""
+        if self.date_from is None or self.date_to is None or filter_query != self.filter_query:
+            return False
+        return _as_utc(self.date_from) <= _as_utc(date_from) and _as_utc(date_to) <= _as_utc(self.date_to)
+
+    def window(self, date_from: datetime, date_to: datetime) -> 'TransactionIndex':
+        """
+        返回只含 [date_from, date_to] 内交易的新索引（复用较宽窗口的索引时使用）。
+        窗口与本索引相同时直接返回自身；transaction_date 无法解析的交易保留。
+        """
+        if _as_utc(date_from) == _as_utc(self.date_from) and _as_utc(date_to) == _as_utc(self.date_to):
+            return self
+        start, end = _as_utc(date_from), _as_utc(date_to)
+        narrowed = TransactionIndex(date_from=date_from, date_to=date_to, filter_query=self.filter_query)
+        narrowed.created_at = self.created_at
+        for record in self.records:
+            when = _transaction_date(record)
+            if when is None or start <= when <= end:
+                narrowed.add(record)
+        return narrowed
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
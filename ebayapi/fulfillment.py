@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+发货记录（createShippingFulfillment）的本地台账。
+
+EbayAPI.bulk_create_shipping_fulfillments 每成功提交一个 (订单号, 运单号) 就写入本地 SQLite 数据库，
+重复运行同一份仓库发货文件时，已提交过的组合直接跳过，不会向 eBay 重复创建发货记录。
+"""
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fulfillments (
+    order_id TEXT NOT NULL,
+    tracking_number TEXT NOT NULL,
+    fulfillment_id TEXT,
+    shipping_carrier TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (order_id, tracking_number)
+)
+"""
+
+
+class FulfillmentLedger:
+    """
+    参数:
+        path: SQLite 数据库文件路径（':memory:' 表示不持久化，仅用于测试）
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fulfillments").fetchone()[0]
+
+    def contains(self, order_id: str, tracking_number: str) -> bool:
+        """该订单的该运单号是否已经提交过。"""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM fulfillments WHERE order_id = ? AND tracking_number = ?",
+                                     (str(order_id), str(tracking_number))).fetchone()
+        return row is not None
+
+    def get(self, order_id: str, tracking_number: str) -> dict:
+        """返回已提交的记录（含 fulfillment_id），没有时返回 None。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT order_id, tracking_number, fulfillment_id, shipping_carrier, created_at FROM fulfillments "
+                "WHERE order_id = ? AND tracking_number = ?", (str(order_id), str(tracking_number))).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('order_id', 'tracking_number', 'fulfillment_id', 'shipping_carrier', 'created_at'), row))
+
+    def record(self, order_id: str, tracking_number: str, fulfillment_id: str = None, shipping_carrier: str = None):
+        """记录一次成功的提交。"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fulfillments (order_id, tracking_number, fulfillment_id, shipping_carrier, "
+                "created_at) VALUES (?, ?, ?, ?, ?)",
+                (str(order_id), str(tracking_number), fulfillment_id, shipping_carrier, time.time())
+            )
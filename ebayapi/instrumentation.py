@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+调用耗时与流量埋点。
+
+EbayAPI 在每次 Trading 调用、REST 调用和 to_dict_recursive 转换后产生一个事件（dict），
+分发给通过 EbayAPI.add_instrumentation_hook 注册的钩子。未注册任何钩子时不产生事件。
+
+事件字段：
+    api              'trading' / 'rest' / 'convert'
+    operation        Trading 调用名（如 GetOrders）、REST 方法名或路径、转换来源
+    duration         墙钟耗时（秒）
+    bytes_sent       请求体字节数（未知时为 None）
+    bytes_received   响应体字节数（未知时为 None）
+    page             页码（非分页调用为 None）
+    records          本次调用返回/转换的记录数（未知时为 None）
+    retries          重试次数
+    rate_limit_wait  因限流等待的时间（秒）
+    success          是否成功
+    error            错误信息（成功时为 None）
+
+内置的 HistogramCollector 在内存中按 (api, operation) 统计耗时直方图与流量，
+并可导出 Prometheus 文本格式。
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 默认直方图桶上界（秒）
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def make_event(api: str, operation: str, duration: float, **fields) -> dict:
+    """构造一个带全部默认字段的事件。"""
+    event = {
+        'api': api,
+        'operation': operation,
+        'duration': duration,
+        'bytes_sent': None,
+        'bytes_received': None,
+        'page': None,
+        'records': None,
+        'retries': 0,
+        'rate_limit_wait': 0.0,
+        'success': True,
+        'error': None,
+    }
+    event.update(fields)
+    return event
+
+
+def _escape_label(value) -> str:
+    """Prometheus 标签值转义：反斜杠、双引号和换行。"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Instrumentation:
+    """事件分发器：把事件依次交给已注册的钩子，单个钩子出错不影响调用本身。"""
+
+    def __init__(self):
+        self.hooks = []
+
+    def add_hook(self, hook):
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    def emit(self, event: dict):
+        for hook in list(self.hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                logger.warning("埋点钩子执行出错: %s", e)
+
+
+class InstrumentedRestClient:
+    """
+    ebay_rest API 对象的埋点代理：记录每个方法调用的耗时。
+    返回生成器（分页）的方法在生成器耗尽时才产生事件，耗时包含全部翻页，records 为产出的条目数。
+    """
+
+    def __init__(self, api_rest, instrumentation: Instrumentation):
+        self._api_rest = api_rest
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        attr = getattr(self._api_rest, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def instrumented(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                self._instrumentation.emit(make_event('rest', name, time.perf_counter() - start,
+                                                     success=False, error=str(e)))
+                raise
+            if hasattr(result, '__iter__') and not isinstance(result, (dict, str, list)):
+                return self._wrap_generator(name, result, start)
+            self._instrumentation.emit(make_event('rest', name, time.perf_counter() - start, records=1))
+            return result
+
+        return instrumented
+
+    def _wrap_generator(self, name, generator, start):
+        count = 0
+        try:
+            for element in generator:
+                if isinstance(element, dict) and 'record' in element:
+                    count += 1
+                yield element
+        except Exception as e:
+            self._instrumentation.emit(make_event('rest', name, time.perf_counter() - start,
+                                                 records=count, success=False, error=str(e)))
+            raise
+        self._instrumentation.emit(make_event('rest', name, time.perf_counter() - start, records=count))
+
+
+class HistogramCollector:
+    """
+    内存中的埋点收集器，可直接作为钩子注册：
+        collector = HistogramCollector()
+        api.add_instrumentation_hook(collector)
+        ...
+        collector.summary()        # 每个 (api, operation) 的次数、耗时、流量
+        collector.to_prometheus()  # Prometheus 文本格式
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def __call__(self, event: dict):
+        key = (event.get('api'), event.get('operation'))
+        duration = event.get('duration') or 0.0
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'count': 0,
+                    'errors': 0,
+                    'duration_sum': 0.0,
+                    'duration_max': 0.0,
+                    'bucket_counts': [0] * len(self.buckets),
+                    'bytes_sent': 0,
+                    'bytes_received': 0,
+                    'records': 0,
+                    'retries': 0,
+                    'rate_limit_wait': 0.0,
+                }
+            series['count'] += 1
+            if not event.get('success', True):
+                series['errors'] += 1
+            series['duration_sum'] += duration
+            series['duration_max'] = max(series['duration_max'], duration)
+            for i, upper in enumerate(self.buckets):
+                if duration <= upper:
+                    series['bucket_counts'][i] += 1
+            series['bytes_sent'] += event.get('bytes_sent') or 0
+            series['bytes_received'] += event.get('bytes_received') or 0
+            series['records'] += event.get('records') or 0
+            series['retries'] += event.get('retries') or 0
+            series['rate_limit_wait'] += event.get('rate_limit_wait') or 0.0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def summary(self) -> dict:
+        """
+        返回:
+            dict: {(api, operation): {'count', 'errors', 'duration_sum', 'duration_avg', 'duration_max',
+                                      'bytes_sent', 'bytes_received', 'records', 'retries', 'rate_limit_wait'}}
+        """
+        with self._lock:
+            result = {}
+            for key, series in self._series.items():
+                item = {k: v for k, v in series.items() if k != 'bucket_counts'}
+                item['duration_avg'] = series['duration_sum'] / series['count'] if series['count'] else 0.0
+                result[key] = item
+            return result
+
+    def slowest(self, n: int = 5) -> list:
+        """按平均耗时降序返回最慢的 n 个 (api, operation)。"""
+        summary = self.summary()
+        return sorted(summary.items(), key=lambda kv: kv[1]['duration_avg'], reverse=True)[:n]
+
+    def to_prometheus(self, prefix: str = 'ebayapi') -> str:
+        """导出为 Prometheus 文本格式（exposition format 0.0.4）。"""
+        with self._lock:
+            series_items = sorted(self._series.items(), key=lambda kv: (str(kv[0][0]), str(kv[0][1])))
+            snapshot = [(key, dict(series, bucket_counts=list(series['bucket_counts'])))
+                        for key, series in series_items]
+
+        def labels(api, operation, extra=''):
+            return f'{{api="{_escape_label(api)}",operation="{_escape_label(operation)}"{extra}}}'
+
+        lines = [
+            f'# HELP {prefix}_call_duration_seconds Wall time of eBay API calls and conversions.',
+            f'# TYPE {prefix}_call_duration_seconds histogram',
+        ]
+        for (api, operation), series in snapshot:
+            for upper, count in zip(self.buckets, series['bucket_counts']):
+                bucket_labels = labels(api, operation, ',le="%s"' % upper)
+                lines.append(f'{prefix}_call_duration_seconds_bucket{bucket_labels} {count}')
+            inf_labels = labels(api, operation, ',le="+Inf"')
+            lines.append(f'{prefix}_call_duration_seconds_bucket{inf_labels} {series["count"]}')
+            lines.append(f'{prefix}_call_duration_seconds_sum{labels(api, operation)} {series["duration_sum"]}')
+            lines.append(f'{prefix}_call_duration_seconds_count{labels(api, operation)} {series["count"]}')
+
+        counters = (
+            ('call_errors_total', 'errors', 'Failed eBay API calls.'),
+            ('bytes_sent_total', 'bytes_sent', 'Request body bytes sent.'),
+            ('bytes_received_total', 'bytes_received', 'Response body bytes received.'),
+            ('records_total', 'records', 'Records returned or converted.'),
+            ('retries_total', 'retries', 'Retried requests.'),
+            ('rate_limit_wait_seconds_total', 'rate_limit_wait', 'Time spent waiting for rate limits.'),
+        )
+        for name, field, help_text in counters:
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            for (api, operation), series in snapshot:
+                lines.append(f'{prefix}_{name}{labels(api, operation)} {series[field]}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+本地库存与 eBay 在售商品的增量同步。
+
+InventorySnapshot 保存在售商品的紧凑快照（SKU → ItemID / 价格 / 可售数量），可以写入磁盘，
+每次同步成功后按修改结果原地更新，下次同步无需重新拉取商品列表。
+diff_inventory 把本地库存表与快照比较，只产生真正变化的修改，同步成本与变化数量成正比，而不是与商品总数成正比。
+多属性商品的库存需要按变体 SKU 修改，目前不支持：库存表中的 SKU 属于多属性商品时 diff_inventory 抛出 ValueError。
+
+    stock = load_stock_table('warehouse.csv')
+    result = api.sync_inventory(stock, snapshot_path='snapshot.pkl')
+"""
+import csv
+import os
+import pickle
+import tempfile
+import time
+
+from .records import Listing
+
+
+def _blank(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:  # pandas 的缺失值 NaN
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def _variation_skus(item: dict) -> list:
+    """GetSellerList 商品字典中各变体的 SKU（没有多属性信息时为空列表）。"""
+    variations = item.get('Variations')
+    if not isinstance(variations, dict):
+        return []
+    variation = variations.get('Variation')
+    if isinstance(variation, dict):
+        variation = [variation]
+    return [str(v['SKU']) for v in variation or [] if isinstance(v, dict) and v.get('SKU')]
+
+
+def load_stock_table(source, sku_column: str = 'sku', quantity_column: str = 'quantity',
+                     price_column: str = 'price') -> dict:
+    """
+    读取本地库存表。
+
+    参数:
+        source: CSV 文件路径、pandas DataFrame，或字典列表
+        sku_column / quantity_column / price_column: 列名；价格列可以不存在或留空，表示不同步价格
+
+    返回:
+        dict: {sku: (price, quantity)}，price / quantity 为 None 表示不修改该项
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+    elif hasattr(source, 'to_dict') and hasattr(source, 'columns'):
+        rows = source.to_dict('records')
+    else:
+        rows = source
+
+    stock = {}
+    for row in rows:
+        sku = row.get(sku_column)
+        if _blank(sku):
+            continue
+        quantity = row.get(quantity_column)
+        price = row.get(price_column)
+        stock[str(sku).strip()] = (None if _blank(price) else round(float(price), 2),
+                                   None if _blank(quantity) else int(float(quantity)))
+    return stock
+
+
+class InventorySnapshot:
+    """
+    在售商品快照，按 ItemID 和 SKU 索引。
+
+    参数:
+        listings: Listing 对象或 get_all_listings / get_active_listings 返回的商品字典（视为全部在售）；
+                  多属性商品的变体 SKU 取自商品字典（或 keep_raw=True 的 Listing）中的 Variations
+        variations: {变体 SKU: ItemID}，与 listings 中取得的变体 SKU 合并（用于 load）
+    """
+
+    def __init__(self, listings=(), created_at: float = None, variations: dict = None):
+        self.created_at = created_at if created_at is not None else time.time()
+        self.by_item = {}
+        self.by_sku = {}
+        self.variations = dict(variations or {})
+        for item in listings:
+            listing = item if isinstance(item, Listing) else Listing.from_dict(item)
+            if not listing.item_id:
+                continue
+            listing.item_id = str(listing.item_id)
+            raw = listing.raw if isinstance(item, Listing) else item
+            for sku in _variation_skus(raw or {}):
+                self.variations[sku] = listing.item_id
+            # 快照只保存紧凑字段
+            listing.raw = None
+            self.by_item[listing.item_id] = listing
+            if listing.sku:
+                self.by_sku[str(listing.sku)] = listing.item_id
+
+    def __len__(self):
+        return len(self.by_item)
+
+    def age(self) -> float:
+        """快照创建后经过的秒数。"""
+        return time.time() - self.created_at
+
+    def get_sku(self, sku: str) -> Listing:
+        item_id = self.by_sku.get(str(sku))
+        return self.by_item.get(item_id) if item_id else None
+
+    def apply(self, item_id: str, price=None, quantity=None):
+        """修改成功后更新快照中的价格和可售数量。"""
+        listing = self.by_item.get(str(item_id))
+        if listing is None:
+            return
+        if price is not None:
+            listing.price = float(price)
+        if quantity is not None:
+            # 快照保存的是总数量，可售数量 = Quantity - QuantitySold
+            listing.quantity = int(quantity) + (listing.quantity_sold or 0)
+
+    def save(self, path: str):
+        """写入磁盘（先写临时文件再替换）。"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((self.created_at, list(self.by_item.values()), self.variations), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'InventorySnapshot':
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        # 旧版本的快照文件没有变体信息
+        created_at, listings, variations = data if len(data) == 3 else (*data, {})
+        return cls(listings, created_at=created_at, variations=variations)
+
+
+def diff_inventory(stock: dict, snapshot: InventorySnapshot) -> tuple:
+    """
+    比较本地库存与快照，只返回价格或可售数量发生变化的商品。
+
+    返回:
+        tuple: (revisions, unchanged, unknown_skus)
+            revisions: {item_id: (price, quantity)}，未变化的一项为 None，可直接传给 revise_inventory_bulk
+            unchanged: 无需修改的 SKU 数
+            unknown_skus: 快照中没有对应在售商品的 SKU 列表
+    异常:
+        ValueError: 库存表中有 SKU 只对应多属性商品的变体，或对应的商品有变体（需要按变体 SKU 修改，不能修改整个商品）
+    """
+    variation_items = set(snapshot.variations.values())
+    variation_skus = sorted(str(sku) for sku in stock
+                            if (str(sku) in snapshot.variations and snapshot.get_sku(sku) is None)
+                            or snapshot.by_sku.get(str(sku)) in variation_items)
+    if variation_skus:
+        raise ValueError(f"{len(variation_skus)} 个 SKU 属于多属性商品，不支持按商品同步库存: "
+                         f"{', '.join(variation_skus[:20])}")
+
+    revisions = {}
+    unchanged = 0
+    unknown_skus = []
+    for sku, (price, quantity) in stock.items():
+        listing = snapshot.get_sku(sku)
+        if listing is None:
+            unknown_skus.append(sku)
+            continue
+        new_price = price if price is not None and (
+            listing.price is None or round(listing.price, 2) != round(price, 2)) else None
+        new_quantity = quantity if quantity is not None and listing.quantity_available != quantity else None
+        if new_price is None and new_quantity is None:
+            unchanged += 1
+        else:
+            revisions[listing.item_id] = (new_price, new_quantity)
+    return revisions, unchanged, unknown_skus
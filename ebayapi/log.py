@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+日志配置。
+
+包内各模块通过 logging.getLogger(__name__) 输出到 'ebayapi' 日志器：
+    - DEBUG: 逐页、逐条目的进度信息
+    - INFO: 每个操作一条汇总记录（数量、耗时等，附带在 record 的 extra 字段中）
+    - WARNING / ERROR: 可恢复的失败与调用错误
+
+默认不输出任何内容（NullHandler），由调用方决定是否以及如何输出：
+    from ebayapi import configure_logging
+    configure_logging()                   # INFO 级别输出到 stderr
+    configure_logging(quiet=True)         # 只输出警告和错误
+    configure_logging(structured=True)    # 每行一个 JSON 对象，便于日志系统采集
+"""
+import json
+import logging
+import sys
+
+LOGGER_NAME = 'ebayapi'
+
+# 汇总记录通过 extra 附带的结构化字段
+STRUCTURED_FIELDS = ('operation', 'count', 'duration', 'pages', 'succeeded', 'failed', 'retries')
+
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+class StructuredFormatter(logging.Formatter):
+    """把日志记录格式化为单行 JSON，包含 extra 中的结构化字段。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def configure_logging(level=logging.INFO, quiet: bool = False, structured: bool = False,
+                      stream=None) -> logging.Handler:
+    """
+    为 'ebayapi' 日志器添加一个输出处理器（重复调用会替换之前由本函数添加的处理器）。
+
+    参数:
+        level: 日志级别，默认 INFO
+        quiet: 安静模式，只输出 WARNING 及以上
+        structured: 是否输出 JSON 行格式
+        stream: 输出流，默认 sys.stderr
+
+    返回:
+        logging.Handler: 新添加的处理器
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if getattr(handler, '_ebayapi_handler', False):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler._ebayapi_handler = True
+    if structured:
+        handler.setFormatter(StructuredFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.WARNING if quiet else level)
+    return handler
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+买家消息的持久化发送队列。
+
+消息先写入本地 SQLite 数据库，再由 EbayAPI.send_queued_messages 在限流预算内并发发送：
+    - 同一 (item_id, recipient_id, subject) 只会入队一次，重复入队被忽略
+    - 发送成功后标记为 sent；进程中断后重新运行只会发送仍为 pending 的消息
+    - 网络错误等可重试的失败保留为 pending 并记录次数，超过上限或 API 明确拒绝时标记为 failed
+"""
+import json
+import sqlite3
+import threading
+import time
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id TEXT NOT NULL,
+    recipient_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    question_type TEXT NOT NULL DEFAULT 'General',
+    email_copy_to_sender INTEGER NOT NULL DEFAULT 0,
+    media_urls TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    UNIQUE (item_id, recipient_id, subject)
+)
+"""
+
+
+class MessageQueue:
+    """
+    参数:
+        path: SQLite 数据库文件路径（':memory:' 表示不持久化，仅用于测试）
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def enqueue(self, item_id: str, recipient_id: str, subject: str, message_body: str,
+                question_type: str = 'General', email_copy_to_sender: bool = False,
+                media_urls: list = None) -> bool:
+        """
+        加入一条待发送消息，参数与 EbayAPI.send_message_to_buyer 相同。
+
+        返回:
+            bool: True 表示已入队，False 表示相同 (item_id, recipient_id, subject) 的消息已存在
+        """
+        if not item_id or not recipient_id or not subject or not message_body:
+            raise ValueError('item_id, recipient_id, subject 和 message_body 都是必需的')
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO messages (item_id, recipient_id, subject, body, question_type, "
+                "email_copy_to_sender, media_urls, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(item_id), recipient_id, subject, message_body, question_type,
+                 int(bool(email_copy_to_sender)), json.dumps(media_urls) if media_urls else None, time.time())
+            )
+            return cursor.rowcount == 1
+
+    def pending(self, limit: int = None) -> list:
+        """按入队顺序返回待发送的消息（dict 列表）。"""
+        query = "SELECT * FROM messages WHERE status = ? ORDER BY id"
+        params = [PENDING]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        messages = []
+        for row in rows:
+            message = dict(row)
+            message['email_copy_to_sender'] = bool(message['email_copy_to_sender'])
+            message['media_urls'] = json.loads(message['media_urls']) if message['media_urls'] else None
+            messages.append(message)
+        return messages
+
+    def mark_sent(self, message_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE messages SET status = ?, attempts = attempts + 1, last_error = NULL, "
+                               "sent_at = ? WHERE id = ?", (SENT, time.time(), message_id))
+
+    def mark_failed(self, message_id: int, error: str, retryable: bool, max_attempts: int):
+        """记录一次失败；不可重试或已达到 max_attempts 次时标记为 failed，否则保持 pending。"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE messages SET attempts = attempts + 1, last_error = ?, "
+                "status = CASE WHEN ? OR attempts + 1 >= ? THEN ? ELSE ? END WHERE id = ?",
+                (error, int(not retryable), max_attempts, FAILED, PENDING, message_id)
+            )
+
+    def retry_failed(self) -> int:
+        """把所有 failed 消息重新置为 pending（尝试次数清零），返回条数。"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("UPDATE messages SET status = ?, attempts = 0 WHERE status = ?",
+                                        (PENDING, FAILED))
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        """返回各状态的消息数，如 {'pending': 3, 'sent': 120, 'failed': 1}。"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM messages GROUP BY status").fetchall()
+        counts = {PENDING: 0, SENT: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
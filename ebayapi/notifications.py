@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+"""
+eBay 推送通知接收器。
+
+用本地 HTTP 端点接收通知，代替定时轮询 get_orders_requiring_shipment：
+    - Trading Platform Notifications（SOAP XML，FixedPriceTransaction、ItemSold、AuctionCheckoutComplete 等）：
+      按 NotificationSignature 验证后，把其中的交易合并到本地订单库 OrderStore
+    - Notification API（JSON，如 MARKETPLACE_ACCOUNT_DELETION）：响应端点验证的 challenge_code，
+      按 X-EBAY-SIGNATURE 验证签名（需要 cryptography）后分发给注册的回调
+
+    store = OrderStore('orders.db')
+    receiver = api.create_notification_receiver(store)
+    receiver.on('FixedPriceTransaction', lambda event: ...)
+    NotificationServer(receiver, port=8000).serve_forever()
+
+与 getRefresh_token/capture_code.py 一样基于 http.server，公网 HTTPS 地址可由 ngrok 或反向代理转发到本地端口。
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from lxml import etree
+
+from .parsing import _local_name, element_to_dict
+
+logger = logging.getLogger(__name__)
+
+# 通知时间与本地时间允许的最大偏差，超出时视为重放
+MAX_CLOCK_SKEW = timedelta(minutes=10)
+
+# 通知请求体的最大字节数，超出时不读取请求体直接拒绝
+MAX_BODY_SIZE = 1024 * 1024
+
+# 默认订阅的 Trading 通知事件
+ORDER_EVENTS = ('FixedPriceTransaction', 'AuctionCheckoutComplete', 'ItemSold', 'ItemMarkedShipped',
+                'ItemMarkedPaid', 'BuyerCancelRequested')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    order_status TEXT,
+    data TEXT NOT NULL,
+    last_event TEXT,
+    event_time TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _parse_time(value: str) -> datetime:
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def notification_signature(timestamp: str, dev_id: str, app_id: str, cert_id: str) -> str:
+    """Platform Notifications 的签名：Base64(MD5(Timestamp + DevID + AppID + CertID))。"""
+    digest = hashlib.md5(f'{timestamp}{dev_id}{app_id}{cert_id}'.encode('utf-8')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def _notification_parser() -> etree.XMLParser:
+    """
+    解析未验证签名的请求体：不加载 DTD、不展开实体、不访问网络、不放宽节点大小限制。
+    lxml 的解析器不能在线程间并发使用，每次解析新建一个。
+    """
+    return etree.XMLParser(resolve_entities=False, load_dtd=False, no_network=True, huge_tree=False)
+
+
+def challenge_response(challenge_code: str, verification_token: str, endpoint_url: str) -> str:
+    """Notification API 端点验证：SHA-256(challengeCode + verificationToken + endpoint) 的十六进制摘要。"""
+    return hashlib.sha256(f'{challenge_code}{verification_token}{endpoint_url}'.encode('utf-8')).hexdigest()
+
+
+class OrderStore:
+    """
+    本地订单库（SQLite），订单以 GetOrders 订单字典的结构保存（时间字段为 ISO 字符串）。
+
+    参数:
+        path: SQLite 数据库文件路径（':memory:' 表示不持久化）
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def get(self, order_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def orders(self, order_status: str = None) -> list:
+        query = "SELECT data FROM orders"
+        params = ()
+        if order_status:
+            query += " WHERE order_status = ?"
+            params = (order_status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY updated_at", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def orders_requiring_shipment(self) -> list:
+        """已付款（Completed）且仍有未发货行项目的订单。"""
+        result = []
+        for order in self.orders('Completed'):
+            if order.get('ShippedTime'):
+                continue
+            transactions = _as_list((order.get('TransactionArray') or {}).get('Transaction'))
+            if not transactions or any(not t.get('ShippedTime') for t in transactions):
+                result.append(order)
+        return result
+
+    def apply_transaction(self, order_id: str, order_fields: dict, transaction: dict, event_name: str,
+                          event_time: str) -> dict:
+        """
+        把一个交易合并进订单：按 OrderLineItemID 替换或追加交易，订单级字段以较新的事件为准，
+        同一交易的旧事件（重发或乱序到达）不会覆盖较新的状态。
+
+        返回:
+            dict: 合并后的订单
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data, last_event, event_time FROM orders WHERE order_id = ?",
+                                     (order_id,)).fetchone()
+            order = json.loads(row[0]) if row else {'OrderID': order_id, 'TransactionArray': {'Transaction': []}}
+            # Timestamp 为同一格式的 ISO 字符串，可以直接按字符串比较先后
+            newer = row is None or not row[2] or (event_time or '') >= row[2]
+
+            transactions = _as_list((order.get('TransactionArray') or {}).get('Transaction'))
+            line_item_id = transaction.get('OrderLineItemID')
+            for index, existing in enumerate(transactions):
+                if existing.get('OrderLineItemID') == line_item_id:
+                    if newer:
+                        transactions[index] = transaction
+                    break
+            else:
+                transactions.append(transaction)
+            order['TransactionArray'] = {'Transaction': transactions}
+            if newer:
+                order.update({key: value for key, value in order_fields.items() if value is not None})
+            # 订单级 ShippedTime 由交易推导，新加入未发货的行项目时清除
+            if transactions and all(t.get('ShippedTime') for t in transactions):
+                order['ShippedTime'] = max(t['ShippedTime'] for t in transactions)
+            else:
+                order.pop('ShippedTime', None)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO orders (order_id, order_status, data, last_event, event_time, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (order_id, order.get('OrderStatus'), json.dumps(order, default=str, ensure_ascii=False),
+                 event_name if newer else row[1], event_time if newer else row[2], time.time())
+            )
+        return order
+
+
+class NotificationError(Exception):
+    """通知验证失败（签名不符、时间超出允许范围等）。"""
+
+
+class NotificationReceiver:
+    """
+    通知处理器，与 HTTP 服务器无关，便于在其他 Web 框架中复用。
+
+    参数:
+        store: OrderStore，为 None 时只分发回调
+        dev_id / app_id / cert_id: 应用凭据，用于验证 Platform Notifications 签名
+        verification_token / endpoint_url: Notification API 的端点验证令牌和公网地址
+        public_key_lookup: callable(key_id) -> PEM 公钥字符串，用于验证 Notification API 的签名
+    """
+
+    def __init__(self, store: OrderStore = None, dev_id: str = None, app_id: str = None, cert_id: str = None,
+                 verification_token: str = None, endpoint_url: str = None, public_key_lookup=None):
+        self.store = store
+        self.dev_id = dev_id
+        self.app_id = app_id
+        self.cert_id = cert_id
+        self.verification_token = verification_token
+        self.endpoint_url = endpoint_url
+        self.public_key_lookup = public_key_lookup
+        self._handlers = {}
+        self.received = 0
+        self.rejected = 0
+
+    def on(self, event_name: str, callback):
+        """注册回调：event_name 为 Trading 事件名或 Notification API 的 topic，'*' 表示全部事件。"""
+        self._handlers.setdefault(event_name, []).append(callback)
+
+    def _dispatch(self, event_name: str, event: dict):
+        for callback in self._handlers.get(event_name, []) + self._handlers.get('*', []):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error("通知回调处理 %s 时出错: %s", event_name, e)
+
+    # --- Trading Platform Notifications ---
+
+    def handle_platform_notification(self, body: bytes) -> dict:
+        """
+        处理一条 SOAP 格式的 Platform Notification。
+
+        返回:
+            dict: {'event': 事件名, 'timestamp': str, 'orders': [合并后的订单], 'payload': dict}
+        异常:
+            NotificationError: 签名或时间戳验证失败
+            ValueError / etree.XMLSyntaxError: 请求体不是合法的 XML，或带有 DOCTYPE 声明
+        """
+        # 签名验证之前请求体来自任意发送方，带 DOCTYPE 的请求体不交给解析器处理，避免实体展开；
+        # 其他编码中的 DOCTYPE 由解析器设置兜底，解析后再检查一次
+        if b'<!DOCTYPE' in body:
+            raise ValueError('通知中不允许 DOCTYPE 声明')
+        root = etree.fromstring(body, _notification_parser())
+        if root.getroottree().docinfo.doctype:
+            raise ValueError('通知中不允许 DOCTYPE 声明')
+        signature = None
+        payload_elem = None
+        for elem in root.iter():
+            if not isinstance(elem.tag, str):
+                continue
+            name = _local_name(elem.tag)
+            if name == 'NotificationSignature':
+                signature = (elem.text or '').strip()
+            elif name == 'Body':
+                payload_elem = next((child for child in elem if isinstance(child.tag, str)), None)
+        if payload_elem is None:
+            raise NotificationError('通知中没有 SOAP Body')
+
+        payload = element_to_dict(payload_elem, _local_name(payload_elem.tag).lower(), set(), set())
+        timestamp = payload.get('Timestamp')
+        self._verify_platform(signature, timestamp)
+
+        event_name = payload.get('NotificationEventName') or _local_name(payload_elem.tag)
+        if event_name.endswith('Response'):
+            event_name = event_name[:-len('Response')]
+        orders = self._apply_to_store(payload, event_name, timestamp) if self.store is not None else []
+        self.received += 1
+        logger.info("收到通知 %s（%s 个订单更新）", event_name, len(orders),
+                    extra={'operation': 'notification', 'count': len(orders)})
+        event = {'event': event_name, 'timestamp': timestamp, 'orders': orders, 'payload': payload}
+        self._dispatch(event_name, event)
+        return event
+
+    def _verify_platform(self, signature: str, timestamp: str):
+        if not (self.dev_id and self.app_id and self.cert_id):
+            raise NotificationError('未配置应用凭据，无法验证通知签名')
+        expected = notification_signature(timestamp or '', self.dev_id, self.app_id, self.cert_id)
+        if not signature or not hmac.compare_digest(signature, expected):
+            raise NotificationError('通知签名不符')
+        sent_at = _parse_time(timestamp)
+        if sent_at is None or abs(datetime.now(timezone.utc) - sent_at) > MAX_CLOCK_SKEW:
+            raise NotificationError(f'通知时间超出允许范围: {timestamp}')
+
+    def _apply_to_store(self, payload: dict, event_name: str, timestamp: str) -> list:
+        item = payload.get('Item') or {}
+        orders = []
+        for transaction in _as_list((payload.get('TransactionArray') or {}).get('Transaction')):
+            if not isinstance(transaction, dict):
+                continue
+            item_id = item.get('ItemID') or (transaction.get('Item') or {}).get('ItemID')
+            transaction_id = transaction.get('TransactionID')
+            containing = transaction.get('ContainingOrder') or {}
+            order_id = containing.get('OrderID') or f'{item_id}-{transaction_id}'
+            status = containing.get('OrderStatus')
+            if status is None:
+                complete = (transaction.get('Status') or {}).get('CompleteStatus')
+                status = 'Completed' if complete == 'Complete' else ('Active' if complete else None)
+
+            record = dict(transaction)
+            record.pop('ContainingOrder', None)
+            record['Item'] = {'ItemID': item_id, 'SKU': item.get('SKU'), 'Title': item.get('Title')}
+            record.setdefault('OrderLineItemID', f'{item_id}-{transaction_id}')
+            order_fields = {
+                'OrderStatus': status,
+                'BuyerUserID': (transaction.get('Buyer') or {}).get('UserID'),
+                'CreatedTime': containing.get('CreatedTime') or transaction.get('CreatedDate'),
+                'PaidTime': transaction.get('PaidTime'),
+                'Total': containing.get('Total'),
+                # 空的 <BuyerInfo/> 转换为 None
+                'ShippingAddress': (((transaction.get('Buyer') or {}).get('BuyerInfo')) or {}).get('ShippingAddress'),
+            }
+            orders.append(self.store.apply_transaction(order_id, order_fields, record, event_name, timestamp))
+        return orders
+
+    # --- Notification API ---
+
+    def challenge(self, challenge_code: str) -> dict:
+        """响应 Notification API 的端点验证请求（GET ?challenge_code=...）。"""
+        if not self.verification_token or not self.endpoint_url:
+            raise NotificationError('未配置 verification_token / endpoint_url')
+        return {'challengeResponse': challenge_response(challenge_code, self.verification_token, self.endpoint_url)}
+
+    def handle_api_notification(self, body: bytes, signature_header: str) -> dict:
+        """
+        处理一条 Notification API 的 JSON 通知，验证签名后按 metadata.topic 分发。
+
+        异常:
+            NotificationError: 签名验证失败
+        """
+        self._verify_api_signature(body, signature_header)
+        message = json.loads(body)
+        topic = (message.get('metadata') or {}).get('topic')
+        self.received += 1
+        logger.info("收到通知 %s", topic, extra={'operation': 'notification', 'count': 1})
+        event = {'event': topic, 'timestamp': (message.get('notification') or {}).get('publishDate'),
+                 'orders': [], 'payload': message}
+        self._dispatch(topic, event)
+        return event
+
+    def _verify_api_signature(self, body: bytes, signature_header: str):
+        if self.public_key_lookup is None:
+            raise NotificationError('未配置 public_key_lookup，无法验证通知签名')
+        try:
+            header = json.loads(base64.b64decode(signature_header))
+            public_key = self.public_key_lookup(header['kid'])
+        except Exception as e:
+            raise NotificationError(f'无法解析 X-EBAY-SIGNATURE: {e}')
+        try:
+            from cryptography.exceptions import InvalidSignature
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.primitives.asymmetric import ec
+            from cryptography.hazmat.primitives.serialization import load_pem_public_key
+        except ImportError:
+            raise NotificationError('验证 Notification API 签名需要安装 cryptography')
+        if '-----BEGIN' not in public_key:
+            public_key = f'-----BEGIN PUBLIC KEY-----\n{public_key}\n-----END PUBLIC KEY-----'
+        try:
+            load_pem_public_key(public_key.encode('ascii')).verify(
+                base64.b64decode(header['signature']), body, ec.ECDSA(hashes.SHA1()))
+        except InvalidSignature:
+            raise NotificationError('通知签名不符')
+
+
+class _NotificationHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理器：POST 为通知，GET 带 challenge_code 时为 Notification API 端点验证。"""
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.client_address[0], format % args)
+
+    def _send(self, status: int, body: bytes = b'', content_type: str = 'text/plain; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        receiver = self.server.receiver
+        query = parse_qs(urlparse(self.path).query)
+        if 'challenge_code' not in query:
+            self._send(200, '通知接收器正在运行'.encode('utf-8'))
+            return
+        try:
+            response = receiver.challenge(query['challenge_code'][0])
+        except NotificationError as e:
+            self._send(500, str(e).encode('utf-8'))
+            return
+        self._send(200, json.dumps(response).encode('utf-8'), 'application/json')
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send(400, 'Content-Length 无效'.encode('utf-8'))
+            return
+        if length > MAX_BODY_SIZE:
+            logger.warning("拒绝通知（%s）: 请求体过大（%s 字节）", self.client_address[0], length)
+            self.close_connection = True
+            self._send(413, f'请求体超过 {MAX_BODY_SIZE} 字节'.encode('utf-8'))
+            return
+        body = self.rfile.read(length) if length else b''
+        try:
+            signature = self.headers.get('X-EBAY-SIGNATURE')
+            if signature:
+                receiver.handle_api_notification(body, signature)
+            else:
+                receiver.handle_platform_notification(body)
+        except NotificationError as e:
+            receiver.rejected += 1
+            logger.warning("拒绝通知（%s）: %s", self.client_address[0], e)
+            self._send(412, str(e).encode('utf-8'))
+            return
+        except (etree.XMLSyntaxError, ValueError) as e:
+            receiver.rejected += 1
+            logger.warning("无法解析通知（%s）: %s", self.client_address[0], e)
+            self._send(400, b'')
+            return
+        except Exception as e:
+            logger.error("处理通知时出错: %s", e)
+            self._send(500, b'')
+            return
+        self._send(200)
+
+
+class NotificationServer:
+    """
+    在本地端口接收通知的 HTTP 服务器（多线程）。
+
+    参数:
+        receiver: NotificationReceiver
+        host / port: 监听地址，port 为 0 时自动分配
+    """
+
+    def __init__(self, receiver: NotificationReceiver, host: str = '', port: int = 8000):
+        self.httpd = ThreadingHTTPServer((host, port), _NotificationHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.receiver = receiver
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def serve_forever(self):
+        logger.info("通知接收器已在端口 %s 启动", self.port)
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def start(self):
+        """在后台线程中运行。"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
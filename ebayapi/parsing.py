@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Trading 响应的离线解析。
+
+这里的函数只接收原始 XML 字节和解析配置，返回纯 dict/list 结果，
+不依赖连接对象，因此可以在 ProcessPoolExecutor 的子进程中执行，
+把 XML 解析和字典转换这类 CPU 密集的工作分摊到多个核心。
+
+TradingResponseStream 用 lxml.etree.iterparse 一次性把 XML 直接转换为字典，
+每解析完一条记录（Item / Order）就产出并释放对应的元素，
+不再先构建 ebaysdk 的对象树、再由 to_dict_recursive 遍历一遍。
+产出的字典与 ebaysdk 解析后再 to_dict_recursive 的结果一致：
+    - 去掉命名空间，XML 属性被忽略，带属性的节点文本放在 'value' 键中
+    - 重复出现的节点合并为列表，list_nodes 中的路径即使只出现一次也是列表
+    - datetime_nodes 中的节点转换为 naive datetime（UTC）
+"""
+import datetime
+import io
+import time
+from collections import defaultdict
+
+from lxml import etree
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition('}')[2]
+
+
+def _parse_datetime(value: str):
+    # 与 ebaysdk ResponseDataObject 的转换规则一致：去掉毫秒和时区后按 UTC 解析
+    ts = "%s %s" % (value.partition('T')[0], value.partition('T')[2].partition('.')[0])
+    try:
+        return datetime.datetime.strptime(ts, '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return value
+
+
+def element_to_dict(elem, path: str, list_nodes, datetime_nodes):
+    """
+    把一个元素转换为字典（叶子节点为字符串或 None）。
+
+    参数:
+        elem: lxml 元素
+        path: 元素的小写点分路径（含根节点），如 getsellerlistresponse.itemarray.item
+        list_nodes: 需要强制为列表的小写路径集合
+        datetime_nodes: 需要转换为 datetime 的小写节点名集合
+    """
+    children = [child for child in elem if isinstance(child.tag, str)]
+    text = elem.text.strip() if elem.text else None
+
+    if not children:
+        if elem.attrib:
+            return {'value': text} if text else {}
+        return text
+
+    grouped = defaultdict(list)
+    for child in children:
+        tag = _local_name(child.tag)
+        grouped[tag].append(element_to_dict(child, f"{path}.{tag.lower()}", list_nodes, datetime_nodes))
+
+    result = {}
+    for tag, values in grouped.items():
+        value = values[0] if len(values) == 1 else values
+        if f"{path}.{tag.lower()}" in list_nodes and not isinstance(value, list):
+            value = [value]
+        elif isinstance(value, str) and tag.lower() in datetime_nodes:
+            value = _parse_datetime(value)
+        result[tag] = value
+    if text:
+        result['value'] = text
+    return result
+
+
+class TradingResponseStream:
+    """
+    Trading 响应的流式解析器。迭代时逐条产出记录字典；
+    根节点下的其他字段（Ack、Errors、HasMoreItems、PaginationResult 等）解析后保存在 fields 中，
+    Ack 位于记录之前，因此迭代开始后即可通过 ack / error 判断调用是否成功。
+
+    参数:
+        source: 原始响应 XML（bytes）或类文件对象
+        verb: 调用名，如 GetSellerList
+        container: 记录容器节点，如 ItemArray / OrderArray
+        element: 记录节点，如 Item / Order
+        list_nodes: 需要强制为列表的节点路径（取自连接对象的 base_list_nodes）
+        datetime_nodes: 需要转换为 datetime 的节点名（取自连接对象的 datetime_nodes）
+    """
+
+    def __init__(self, source, verb: str, container: str, element: str, list_nodes=(), datetime_nodes=()):
+        self.source = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        self.verb = verb
+        self.container = container
+        self.element = element
+        self.list_nodes = {node.lower() for node in list_nodes}
+        self.datetime_nodes = {node.lower() for node in datetime_nodes}
+        self.fields = {}
+        self.count = 0
+
+    @property
+    def ack(self) -> str:
+        return self.fields.get('Ack')
+
+    @property
+    def error(self) -> str:
+        """Ack 为 Failure 等失败状态时的错误信息，成功时为 None。"""
+        if self.ack in ('Success', 'Warning'):
+            return None
+        errors = self.fields.get('Errors')
+        if isinstance(errors, list):
+            errors = errors[0] if errors else None
+        message = ''
+        if isinstance(errors, dict):
+            message = errors.get('LongMessage') or errors.get('ShortMessage') or ''
+        return message or f'{self.verb} 调用失败 (Ack={self.ack})'
+
+    def __iter__(self):
+        root_path = f"{self.verb}response".lower()
+        record_path = f"{root_path}.{self.container}.{self.element}".lower()
+
+        for _, elem in etree.iterparse(self.source, events=('end',), remove_comments=True):
+            parent = elem.getparent()
+            if parent is None:
+                break
+            tag = _local_name(elem.tag)
+            grandparent = parent.getparent()
+
+            if (tag == self.element and grandparent is not None and grandparent.getparent() is None
+                    and _local_name(parent.tag) == self.container):
+                record = element_to_dict(elem, record_path, self.list_nodes, self.datetime_nodes)
+                # 释放已处理的元素，保持单页内存占用平稳
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+                self.count += 1
+                yield record
+
+            elif grandparent is None:
+                if tag != self.container:
+                    value = element_to_dict(elem, f"{root_path}.{tag.lower()}", self.list_nodes,
+                                            self.datetime_nodes)
+                    if isinstance(value, str) and tag.lower() in self.datetime_nodes:
+                        value = _parse_datetime(value)
+                    if tag in self.fields:
+                        existing = self.fields[tag]
+                        self.fields[tag] = (existing if isinstance(existing, list) else [existing]) + [value]
+                    else:
+                        self.fields[tag] = value
+                elem.clear()
+
+
+def iter_xml_records(source, element: str, record_path: str, list_nodes=(), datetime_nodes=(),
+                     container: str = None):
+    """
+    流式解析任意 XML 文件（如 Feed API 报告），逐条产出 element 节点转换成的字典并释放已处理的元素。
+    记录可以位于任意深度；转换规则与 TradingResponseStream 相同。
+
+    参数:
+        source: 文件路径或类文件对象
+        element: 记录节点名（不含命名空间），如 Order / SKUDetails
+        record_path: 记录节点对应的小写路径，用于匹配 list_nodes，如 getordersresponse.orderarray.order
+        list_nodes / datetime_nodes: 同 TradingResponseStream
+        container: 只接受父节点为该名称的记录（避免匹配到嵌套的同名节点）
+    """
+    list_nodes = {node.lower() for node in list_nodes}
+    datetime_nodes = {node.lower() for node in datetime_nodes}
+    for _, elem in etree.iterparse(source, events=('end',), tag='{*}' + element, remove_comments=True):
+        parent = elem.getparent()
+        if container is not None and (parent is None or _local_name(parent.tag) != container):
+            continue
+        record = element_to_dict(elem, record_path.lower(), list_nodes, datetime_nodes)
+        elem.clear()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+        yield record
+
+
+def parse_trading_page(content: bytes, verb: str, list_nodes: list, datetime_nodes: list,
+                       container: str, element: str) -> dict:
+    """
+    解析一页 Trading 响应，并把其中的记录转换为字典（与 ebaysdk 解析后再 to_dict_recursive 的结果一致）。
+
+    参数:
+        content: 原始响应 XML
+        verb: 调用名，如 GetSellerList
+        list_nodes: 需要强制为列表的节点路径（取自连接对象的 base_list_nodes）
+        datetime_nodes: 需要转换为 datetime 的节点名（取自连接对象的 datetime_nodes）
+        container: 记录容器节点，如 ItemArray / OrderArray
+        element: 记录节点，如 Item / Order
+
+    返回:
+        dict: {'ack': str, 'error': str 或 None, 'records': [...], 'duration': float}
+    """
+    start = time.perf_counter()
+    stream = TradingResponseStream(content, verb, container, element, list_nodes, datetime_nodes)
+    records = list(stream)
+    error = stream.error
+    if error:
+        records = []
+    return {'ack': stream.ack, 'error': error, 'records': records, 'duration': time.perf_counter() - start}
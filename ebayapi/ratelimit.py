@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+调用限流。
+
+RateLimiter 按滑动窗口限制调用次数（如 AddMemberMessageAAQToPartner 每 60 秒最多 75 次），
+线程安全，多个并发线程共享同一个预算。EbayAPI 按调用名为每个实例维护一个限流器，见 EbayAPI.RATE_LIMITS。
+"""
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """
+    滑动窗口限流器。
+
+    参数:
+        calls: 窗口内允许的最大调用次数
+        period: 窗口长度（秒）
+    """
+
+    def __init__(self, calls: int, period: float):
+        if calls <= 0 or period <= 0:
+            raise ValueError('calls 和 period 必须为正数')
+        self.calls = calls
+        self.period = period
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+
+    def _prune(self, now: float):
+        while self._timestamps and now - self._timestamps[0] >= self.period:
+            self._timestamps.popleft()
+
+    def acquire(self) -> float:
+        """
+        获取一次调用额度，额度用完时阻塞到窗口内最早的调用过期。
+
+        返回:
+            float: 本次等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._prune(now)
+                if len(self._timestamps) < self.calls:
+                    self._timestamps.append(now)
+                    self.total_wait += waited
+                    return waited
+                delay = self.period - (now - self._timestamps[0])
+            time.sleep(delay)
+            waited += delay
+
+    def remaining(self) -> int:
+        """当前窗口内剩余的调用次数。"""
+        with self._lock:
+            self._prune(time.monotonic())
+            return self.calls - len(self._timestamps)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+付款（payout）与费用对账。
+
+把一段时间内的 Finances 交易、payout 和 GetOrders 订单逐条汇入本地的交易明细，
+再用 pandas 按订单号分组汇总（groupby）并与订单合并（merge），得到每个订单的净收入构成：
+    sale             销售总额（SALE 交易的 total_fee_basis_amount）
+    fees             平台成交费（SALE 交易的 total_fee_amount，负数）
+    ad_fees          Promoted Listings 广告费（负数）
+    refunds          退款（REFUND 交易）
+    shipping_labels  eBay 运单费用（SHIPPING_LABEL 交易）
+    other            其他与订单相关的收支（争议、调整、其他扣费等）
+    net              以上合计，即该订单实际计入 payout 的金额
+金额按 booking_entry 取符号：CREDIT 为正，DEBIT 为负。
+
+没有订单号的交易（店铺订阅费等）计入 unmatched；
+payout_summary() 用交易合计核对每个 payout 的金额。
+"""
+import csv
+
+import pandas as pd
+
+from .finances import is_advertising_fee
+
+ROW_FIELDS = ('order_id', 'order_date', 'buyer', 'order_total', 'currency', 'sale', 'fees', 'ad_fees',
+              'refunds', 'shipping_labels', 'other', 'net', 'payout_ids', 'transaction_count')
+
+_AMOUNT_FIELDS = ('sale', 'fees', 'ad_fees', 'refunds', 'shipping_labels', 'other', 'net')
+
+# 交易明细的列：kind 为交易计入的列（sale / ad_fees / refunds / shipping_labels / other），
+# fee_basis 和 fee 只对 SALE 交易有意义
+_ENTRY_FIELDS = ('order_id', 'payout_id', 'currency', 'kind', 'amount', 'fee_basis', 'fee')
+_ORDER_FIELDS = ('order_id', 'order_date', 'buyer', 'order_total')
+
+
+def _amount_value(amount) -> float:
+    if isinstance(amount, dict):
+        amount = amount.get('value')
+    try:
+        return float(amount)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _signed_amount(transaction: dict) -> float:
+    value = abs(_amount_value(transaction.get('amount')))
+    return -value if transaction.get('booking_entry') == 'DEBIT' else value
+
+
+def _transaction_kind(transaction: dict) -> str:
+    transaction_type = transaction.get('transaction_type')
+    if transaction_type == 'SALE':
+        return 'sale'
+    if transaction_type == 'REFUND':
+        return 'refunds'
+    if transaction_type == 'SHIPPING_LABEL':
+        return 'shipping_labels'
+    if transaction_type == 'NON_SALE_CHARGE' and is_advertising_fee(transaction):
+        return 'ad_fees'
+    return 'other'
+
+
+def _transaction_order_id(transaction: dict):
+    if transaction.get('order_id'):
+        return transaction['order_id']
+    for ref in transaction.get('references') or []:
+        if isinstance(ref, dict) and ref.get('reference_type') == 'ORDER_ID':
+            return ref.get('reference_id')
+    return None
+
+
+class ReconciliationTable:
+    """
+    对账表：add_* 只把记录追加为扁平的明细行，按订单的汇总在 to_frame() 中用 DataFrame 一次算出（结果缓存到下次 add_*）。
+    另保存 payout 信息和无法关联订单的交易。
+    """
+
+    def __init__(self):
+        self.payouts = {}
+        self.unmatched = []
+        self._entries = []
+        self._orders = {}
+        self._frame = None
+
+    def __len__(self):
+        return len(self.to_frame())
+
+    def add_transaction(self, transaction: dict):
+        """汇入一条 Finances 交易记录。"""
+        order_id = _transaction_order_id(transaction)
+        if not order_id:
+            self.unmatched.append(transaction)
+        kind = _transaction_kind(transaction)
+        self._entries.append((
+            order_id or None,
+            transaction.get('payout_id') or None,
+            (transaction.get('amount') or {}).get('currency') or None,
+            kind,
+            _signed_amount(transaction),
+            _amount_value(transaction.get('total_fee_basis_amount')) if kind == 'sale' else 0.0,
+            abs(_amount_value(transaction.get('total_fee_amount'))) if kind == 'sale' else 0.0,
+        ))
+        self._frame = None
+
+    def add_order(self, order: dict):
+        """汇入 GetOrders 返回的订单字典，补充订单日期、买家和订单金额。"""
+        order_id = order.get('OrderID')
+        if not order_id:
+            return
+        total = _amount_value(order.get('Total')) if order.get('Total') is not None else None
+        self._orders[order_id] = (order_id, order.get('CreatedTime'), order.get('BuyerUserID'), total)
+        self._frame = None
+
+    def add_payout(self, payout: dict):
+        """汇入一条 getPayouts 记录。"""
+        payout_id = payout.get('payout_id')
+        if payout_id:
+            self.payouts[payout_id] = payout
+
+    def _entry_frame(self):
+        return pd.DataFrame.from_records(self._entries, columns=list(_ENTRY_FIELDS))
+
+    def to_frame(self):
+        """
+        按订单汇总交易明细并与订单合并（金额未取整）。
+
+        返回:
+            DataFrame: 每个订单一行，列见 ROW_FIELDS，按订单日期和订单号排序
+        """
+        if self._frame is not None:
+            return self._frame
+
+        entries = self._entry_frame()
+        entries = entries[entries['order_id'].notna()]
+        kind = entries['kind']
+        amount = entries['amount']
+        is_sale = kind.eq('sale')
+        # 总额缺失时由净额和费用反推；净额与 (总额 - 费用) 之间的差额（如代收税款）计入 other，保证各列之和等于 net
+        gross = entries['fee_basis'].where(entries['fee_basis'] != 0, amount + entries['fee'])
+        parts = pd.DataFrame({
+            'order_id': entries['order_id'],
+            'sale': gross.where(is_sale, 0.0),
+            'fees': (-entries['fee']).where(is_sale, 0.0),
+            'ad_fees': amount.where(kind.eq('ad_fees'), 0.0),
+            'refunds': amount.where(kind.eq('refunds'), 0.0),
+            'shipping_labels': amount.where(kind.eq('shipping_labels'), 0.0),
+            'other': (amount - (gross - entries['fee'])).where(is_sale, amount.where(kind.eq('other'), 0.0)),
+            'net': amount,
+        })
+        grouped = entries.groupby('order_id', sort=False)
+        per_order = parts.groupby('order_id', sort=False).sum()
+        per_order['currency'] = grouped['currency'].first()
+        per_order['transaction_count'] = grouped.size()
+        per_order['payout_ids'] = entries.dropna(subset=['payout_id']).groupby('order_id')['payout_id'] \
+            .agg(lambda ids: sorted(set(ids)))
+
+        orders = pd.DataFrame.from_records(list(self._orders.values()), columns=list(_ORDER_FIELDS))
+        frame = orders.astype(object).merge(per_order.reset_index().astype({'order_id': object}),
+                                            on='order_id', how='outer')
+        for field in _AMOUNT_FIELDS:
+            frame[field] = frame[field].fillna(0.0).astype(float)
+        frame['transaction_count'] = frame['transaction_count'].fillna(0).astype(int)
+        frame['payout_ids'] = frame['payout_ids'].map(lambda ids: ids if isinstance(ids, list) else [])
+
+        frame = frame.astype({'order_date': object, 'buyer': object, 'order_total': object, 'currency': object})
+        frame = frame.where(frame.notna(), None)
+        sort_key = frame['order_date'].map(lambda value: str(value or ''))
+        frame = frame.assign(_sort=sort_key).sort_values(['_sort', 'order_id']).drop(columns='_sort')
+        self._frame = frame.reset_index(drop=True)[list(ROW_FIELDS)]
+        return self._frame
+
+    def to_rows(self) -> list:
+        """
+        返回:
+            list: 每个订单一行（字段见 ROW_FIELDS），按订单日期和订单号排序，金额保留两位小数
+        """
+        return self.to_dataframe().to_dict('records')
+
+    def totals(self) -> dict:
+        """汇总所有订单的各项金额，另含无订单交易的合计（unmatched）。"""
+        frame = self.to_frame()
+        total = {field: round(float(frame[field].sum()), 2) for field in _AMOUNT_FIELDS}
+        total['orders'] = len(frame)
+        entries = self._entry_frame()
+        total['unmatched'] = round(float(entries.loc[entries['order_id'].isna(), 'amount'].sum()), 2)
+        return total
+
+    def payout_summary(self) -> dict:
+        """
+        核对每个 payout：payout 金额与其包含的交易合计之差。
+        只有拉取窗口覆盖了 payout 的全部交易时差额才有意义。
+
+        返回:
+            dict: {payout_id: {'payout_date', 'payout_status', 'amount', 'transactions_total', 'difference'}}
+        """
+        payout_totals = self._entry_frame().groupby('payout_id')['amount'].sum().to_dict()
+        summary = {}
+        for payout_id in set(self.payouts) | set(payout_totals):
+            payout = self.payouts.get(payout_id, {})
+            amount = _amount_value(payout.get('amount')) if payout else None
+            transactions_total = round(float(payout_totals.get(payout_id, 0.0)), 2)
+            summary[payout_id] = {
+                'payout_date': payout.get('payout_date'),
+                'payout_status': payout.get('payout_status'),
+                'amount': amount,
+                'transactions_total': transactions_total,
+                'difference': round(amount - transactions_total, 2) if amount is not None else None,
+            }
+        return summary
+
+    def to_csv(self, path: str):
+        """导出为 CSV 文件（payout_ids 以 ; 分隔）。"""
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=ROW_FIELDS)
+            writer.writeheader()
+            for row in self.to_rows():
+                row['payout_ids'] = ';'.join(row['payout_ids'])
+                writer.writerow(row)
+
+    def to_dataframe(self):
+        """返回 to_frame() 的副本，金额保留两位小数（列见 ROW_FIELDS）。"""
+        frame = self.to_frame().copy()
+        frame[list(_AMOUNT_FIELDS)] = frame[list(_AMOUNT_FIELDS)].round(2)
+        return frame
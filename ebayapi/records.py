@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+紧凑的记录类型。
+
+get_all_listings / get_orders_last_days / get_campaign_ads 返回的是完整的嵌套字典，
+长期保存大量记录（如用于比对的商品快照）时内存开销很大。
+这里的类使用 __slots__，只保存常用字段，数值字段转换为 int / float，
+重复出现的枚举值（状态、刊登类型等）做字符串驻留；原始字典默认不保留，需要时传 keep_raw=True。
+
+    from ebayapi.records import Listing
+    listings = Listing.from_dicts(api.get_all_listings())
+"""
+import sys
+from datetime import datetime, timezone
+
+
+def _get(data: dict, *path):
+    """按路径取嵌套字段，任一层缺失时返回 None。"""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _first(data: dict, *keys):
+    """返回第一个存在的键的值（兼容 snake_case 与 camelCase）。"""
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _amount(value):
+    """金额节点可能是字符串，也可能是 {'value': ...}。"""
+    if isinstance(value, dict):
+        value = value.get('value')
+    return _to_float(value)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record:
+    """
+    记录基类：按 __slots__ 提供 to_dict、相等比较和 repr。
+    记录是可变对象，按字段比较相等，因此不可哈希（__hash__ = None），需要作为键时使用 item_id 等字段。
+    """
+
+    __slots__ = ('raw',)
+    # 各子类的字段名（不含 raw），定义子类时计算一次
+    _field_names = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            fields.extend(name for name in klass.__dict__.get('__slots__', ()) if name != 'raw')
+        cls._field_names = tuple(fields)
+
+    @classmethod
+    def _fields(cls) -> tuple:
+        return cls._field_names
+
+    def to_dict(self) -> dict:
+        result = {}
+        for name in self._field_names:
+            value = getattr(self, name)
+            if isinstance(value, tuple) and value and isinstance(value[0], _Record):
+                value = [item.to_dict() for item in value]
+            result[name] = value
+        return result
+
+    @classmethod
+    def from_dicts(cls, dicts, keep_raw: bool = False) -> list:
+        return [cls.from_dict(d, keep_raw=keep_raw) for d in dicts]
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._field_names)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._field_names)
+        return f'{type(self).__name__}({fields})'
+
+
+class Listing(_Record):
+    """GetSellerList 返回的商品。时间字段为 naive datetime（UTC），与原始字典一致。"""
+
+    __slots__ = ('item_id', 'sku', 'title', 'price', 'quantity', 'quantity_sold', 'listing_type',
+                 'listing_status', 'category_id', 'start_time', 'end_time', 'watch_count', 'view_item_url')
+
+    def __init__(self, item_id=None, sku=None, title=None, price=None, quantity=None, quantity_sold=None,
+                 listing_type=None, listing_status=None, category_id=None, start_time=None, end_time=None,
+                 watch_count=None, view_item_url=None, raw=None):
+        self.item_id = item_id
+        self.sku = sku
+        self.title = title
+        self.price = price
+        self.quantity = quantity
+        self.quantity_sold = quantity_sold
+        self.listing_type = listing_type
+        self.listing_status = listing_status
+        self.category_id = category_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.watch_count = watch_count
+        self.view_item_url = view_item_url
+        self.raw = raw
+
+    @classmethod
+    def from_dict(cls, item: dict, keep_raw: bool = False) -> 'Listing':
+        return cls(
+            item_id=item.get('ItemID'),
+            sku=item.get('SKU'),
+            title=item.get('Title'),
+            price=_amount(_get(item, 'SellingStatus', 'CurrentPrice') or item.get('StartPrice')),
+            quantity=_to_int(item.get('Quantity')),
+            quantity_sold=_to_int(_get(item, 'SellingStatus', 'QuantitySold')),
+            listing_type=_intern(item.get('ListingType')),
+            listing_status=_intern(_get(item, 'SellingStatus', 'ListingStatus')),
+            category_id=_intern(_get(item, 'PrimaryCategory', 'CategoryID')),
+            start_time=_get(item, 'ListingDetails', 'StartTime'),
+            end_time=_get(item, 'ListingDetails', 'EndTime'),
+            watch_count=_to_int(item.get('WatchCount')),
+            view_item_url=_get(item, 'ListingDetails', 'ViewItemURL'),
+            raw=item if keep_raw else None,
+        )
+
+    @property
+    def quantity_available(self):
+        if self.quantity is None:
+            return None
+        return self.quantity - (self.quantity_sold or 0)
+
+    def is_active(self, now: datetime = None) -> bool:
+        """与 get_active_listings 的判断一致：结束时间晚于当前时间即为在售。"""
+        if not isinstance(self.end_time, datetime):
+            return False
+        now = now or datetime.now(timezone.utc)
+        return self.end_time.replace(tzinfo=timezone.utc) > now
+
+
+class Transaction(_Record):
+    """订单中的一个交易（行项目）。"""
+
+    __slots__ = ('transaction_id', 'order_line_item_id', 'item_id', 'sku', 'title', 'quantity',
+                 'price', 'created_date', 'shipped_time', 'tracking_numbers')
+
+    def __init__(self, transaction_id=None, order_line_item_id=None, item_id=None, sku=None, title=None,
+                 quantity=None, price=None, created_date=None, shipped_time=None, tracking_numbers=(), raw=None):
+        self.transaction_id = transaction_id
+        self.order_line_item_id = order_line_item_id
+        self.item_id = item_id
+        self.sku = sku
+        self.title = title
+        self.quantity = quantity
+        self.price = price
+        self.created_date = created_date
+        self.shipped_time = shipped_time
+        self.tracking_numbers = tracking_numbers
+        self.raw = raw
+
+    @classmethod
+    def from_dict(cls, transaction: dict, keep_raw: bool = False) -> 'Transaction':
+        item = transaction.get('Item') or {}
+        tracking = _as_list(_get(transaction, 'ShippingDetails', 'ShipmentTrackingDetails'))
+        return cls(
+            transaction_id=transaction.get('TransactionID'),
+            order_line_item_id=transaction.get('OrderLineItemID'),
+            item_id=item.get('ItemID'),
+            sku=item.get('SKU') or _get(transaction, 'Variation', 'SKU'),
+            title=item.get('Title'),
+            quantity=_to_int(transaction.get('QuantityPurchased')),
+            price=_amount(transaction.get('TransactionPrice')),
+            created_date=transaction.get('CreatedDate'),
+            shipped_time=transaction.get('ShippedTime'),
+            tracking_numbers=tuple(t.get('ShipmentTrackingNumber') for t in tracking
+                                   if isinstance(t, dict) and t.get('ShipmentTrackingNumber')),
+            raw=transaction if keep_raw else None,
+        )
+
+
+class Order(_Record):
+    """GetOrders 返回的订单，transactions 为 Transaction 元组。"""
+
+    __slots__ = ('order_id', 'order_status', 'buyer_user_id', 'total', 'created_time', 'paid_time',
+                 'shipped_time', 'transactions')
+
+    def __init__(self, order_id=None, order_status=None, buyer_user_id=None, total=None, created_time=None,
+                 paid_time=None, shipped_time=None, transactions=(), raw=None):
+        self.order_id = order_id
+        self.order_status = order_status
+        self.buyer_user_id = buyer_user_id
+        self.total = total
+        self.created_time = created_time
+        self.paid_time = paid_time
+        self.shipped_time = shipped_time
+        self.transactions = transactions
+        self.raw = raw
+
+    @classmethod
+    def from_dict(cls, order: dict, keep_raw: bool = False) -> 'Order':
+        transactions = _as_list(_get(order, 'TransactionArray', 'Transaction'))
+        return cls(
+            order_id=order.get('OrderID'),
+            order_status=_intern(order.get('OrderStatus')),
+            buyer_user_id=order.get('BuyerUserID'),
+            total=_amount(order.get('Total')),
+            created_time=order.get('CreatedTime'),
+            paid_time=order.get('PaidTime'),
+            shipped_time=order.get('ShippedTime'),
+            transactions=tuple(Transaction.from_dict(t, keep_raw=keep_raw) for t in transactions
+                               if isinstance(t, dict)),
+            raw=order if keep_raw else None,
+        )
+
+    @property
+    def item_ids(self) -> tuple:
+        return tuple(t.item_id for t in self.transactions)
+
+
+class Ad(_Record):
+    """Marketing getAds 返回的广告（兼容 snake_case 与 camelCase 字段）。"""
+
+    __slots__ = ('ad_id', 'listing_id', 'inventory_reference_id', 'inventory_reference_type',
+                 'bid_percentage', 'ad_status', 'ad_group_id')
+
+    def __init__(self, ad_id=None, listing_id=None, inventory_reference_id=None, inventory_reference_type=None,
+                 bid_percentage=None, ad_status=None, ad_group_id=None, raw=None):
+        self.ad_id = ad_id
+        self.listing_id = listing_id
+        self.inventory_reference_id = inventory_reference_id
+        self.inventory_reference_type = inventory_reference_type
+        self.bid_percentage = bid_percentage
+        self.ad_status = ad_status
+        self.ad_group_id = ad_group_id
+        self.raw = raw
+
+    @classmethod
+    def from_dict(cls, ad: dict, keep_raw: bool = False) -> 'Ad':
+        listing_id = _first(ad, 'listing_id', 'listingId')
+        inventory_reference_id = _first(ad, 'inventory_reference_id', 'inventoryReferenceId')
+        return cls(
+            ad_id=_first(ad, 'ad_id', 'adId'),
+            listing_id=str(listing_id) if listing_id is not None else None,
+            inventory_reference_id=str(inventory_reference_id) if inventory_reference_id is not None else None,
+            inventory_reference_type=_intern(_first(ad, 'inventory_reference_type', 'inventoryReferenceType')),
+            bid_percentage=_to_float(_first(ad, 'bid_percentage', 'bidPercentage')),
+            ad_status=_intern(_first(ad, 'ad_status', 'adStatus')),
+            ad_group_id=_first(ad, 'ad_group_id', 'adGroupId'),
+            raw=ad if keep_raw else None,
+        )
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+响应录制与回放。
+
+录制：把真实调用得到的 Trading XML 响应和 REST JSON 响应保存为夹具文件；
+回放：用本地桩服务器（Trading XML / 直接 HTTP 的 REST 请求）和回放客户端
+（ebay_rest 方法调用）按需返回这些夹具，可配置人为延迟，
+从而在没有凭据、不访问 eBay 的环境（例如 CI）中测试和压测 EbayAPI。
+
+夹具目录结构：
+    trading/<Verb>/page-<n>.xml         Trading API 响应（按调用名和页码）
+    trading/<Verb>/<window>/page-<n>.xml    带时间窗口（CreateTimeFrom 等）的请求，按窗口区分
+    rest/<method>/<key>.json            ebay_rest 方法调用结果
+    http/<METHOD>/<path>/<key>.json     _rest_request 直接发出的 HTTP 请求
+
+Trading 请求带时间窗口时（如 get_orders_last_days 切分的各时间段）只匹配同一窗口的夹具；
+窗口取自请求中的原始时间值，通常包含当前时间，回放录制的窗口夹具时需要把当前时间固定为录制时的值。
+只关心分页、不关心时间窗口的场景（如基准测试）可以传 allow_unwindowed=True，
+没有同一窗口的夹具时使用不带窗口的 page-<n>.xml。
+REST / HTTP 夹具按参数精确匹配；参数中含当前时间等不确定值时，可用 ANY_PARAMS 保存为
+该方法的通配夹具（文件名 any.json）。找不到对应夹具时抛出 FixtureMissing（桩服务器返回 404），
+不会用无关的录制代替。
+
+用法：
+    # 录制
+    api = EbayAPI(application, user, config_path)
+    start_recording(api, 'fixtures/')
+    api.get_all_listings()
+
+    # 回放
+    with ReplayEnvironment('fixtures/', latency=0.05) as api:
+        listings = api.get_all_listings()
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from .ebayapi import EbayAPI
+
+# 保存 REST / HTTP 夹具时表示“匹配任意参数”
+ANY_PARAMS = '*'
+
+
+class FixtureMissing(LookupError):
+    """回放时没有找到与请求对应的夹具。"""
+
+
+def _params_key(params) -> str:
+    """根据参数生成稳定的短哈希，作为夹具文件名。"""
+    canonical = json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:12]
+
+
+# Trading 请求中表示时间窗口的字段
+_WINDOW_FIELDS = ('CreateTimeFrom', 'CreateTimeTo', 'ModTimeFrom', 'ModTimeTo',
+                  'StartTimeFrom', 'StartTimeTo', 'EndTimeFrom', 'EndTimeTo')
+
+
+def _request_window(data) -> dict:
+    """从 Trading 请求（dict 或 XML 文本）中提取时间窗口字段，没有时返回 None。"""
+    window = {}
+    if isinstance(data, dict):
+        window = {name: str(data[name]) for name in _WINDOW_FIELDS if data.get(name) is not None}
+    elif isinstance(data, (bytes, str)):
+        text = data.decode('utf-8', 'replace') if isinstance(data, bytes) else data
+        for name in _WINDOW_FIELDS:
+            match = re.search(rf'<{name}>\s*([^<]*?)\s*</{name}>', text)
+            if match:
+                window[name] = match.group(1)
+    return window or None
+
+
+def _page_number(data) -> int:
+    """从 Trading 请求（dict 或 XML 文本）中提取页码，默认为1。"""
+    if isinstance(data, dict):
+        pagination = data.get('Pagination') or {}
+        return int(pagination.get('PageNumber', 1))
+    if isinstance(data, (bytes, str)):
+        text = data.decode('utf-8', 'replace') if isinstance(data, bytes) else data
+        match = re.search(r'<PageNumber>\s*(\d+)\s*</PageNumber>', text)
+        if match:
+            return int(match.group(1))
+    return 1
+
+
+class FixtureStore:
+    """
+    夹具文件的读写。
+
+    参数:
+        directory: 夹具目录
+        allow_unwindowed: 带时间窗口的 Trading 请求没有同一窗口的夹具时，是否使用不带窗口的夹具
+    """
+
+    def __init__(self, directory: str, allow_unwindowed: bool = False):
+        self.directory = directory
+        self.allow_unwindowed = allow_unwindowed
+        self._lock = threading.Lock()
+
+    def _write(self, path: str, content: bytes):
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+
+    @staticmethod
+    def _read(path: str):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _existing(path: str):
+        """返回精确匹配的夹具路径，没有时返回同目录下的通配夹具（any.json），都没有时返回 None。"""
+        if os.path.exists(path):
+            return path
+        wildcard = os.path.join(os.path.dirname(path), 'any.json')
+        return wildcard if os.path.exists(wildcard) else None
+
+    # --- Trading ---
+
+    def trading_path(self, verb: str, page: int = 1, window: dict = None) -> str:
+        if window:
+            return os.path.join(self.directory, 'trading', verb, _params_key(window), f'page-{page}.xml')
+        return os.path.join(self.directory, 'trading', verb, f'page-{page}.xml')
+
+    def save_trading(self, verb: str, page: int, xml, window: dict = None):
+        """window: 请求的时间窗口字段（见 _request_window），为 None 时保存为不区分窗口的夹具。"""
+        self._write(self.trading_path(verb, page, window), xml if isinstance(xml, bytes) else xml.encode('utf-8'))
+
+    def load_trading(self, verb: str, page: int = 1, window: dict = None) -> bytes:
+        """
+        返回同一时间窗口的夹具；allow_unwindowed 为 True 时可退回不区分窗口的夹具。
+        都没有时抛出 FixtureMissing。
+        """
+        paths = [self.trading_path(verb, page, window)]
+        if window and self.allow_unwindowed:
+            paths.append(self.trading_path(verb, page))
+        for path in paths:
+            if os.path.exists(path):
+                return self._read(path)
+        if window and not self.allow_unwindowed and os.path.exists(self.trading_path(verb, page)):
+            raise FixtureMissing(f"没有找到 {verb} 第 {page} 页在时间窗口 {window} 的录制数据"
+                                 f"（存在不带窗口的夹具，需要时传 allow_unwindowed=True）")
+        raise FixtureMissing(f"没有找到 {verb} 第 {page} 页的录制数据" + (f"（时间窗口 {window}）" if window else ''))
+
+    # --- ebay_rest 方法调用 ---
+
+    def rest_path(self, method: str, params) -> str:
+        name = 'any' if params == ANY_PARAMS else _params_key(params)
+        return os.path.join(self.directory, 'rest', method, f'{name}.json')
+
+    def save_rest(self, method: str, params, result, generator: bool):
+        record = {'params': params, 'generator': generator, 'result': result}
+        content = json.dumps(record, default=str, ensure_ascii=False, indent=1)
+        self._write(self.rest_path(method, params), content.encode('utf-8'))
+
+    def load_rest(self, method: str, params):
+        path = self._existing(self.rest_path(method, params))
+        if path is None:
+            return None
+        return json.loads(self._read(path))
+
+    # --- 直接 HTTP 请求 ---
+
+    def http_path(self, method: str, path: str, params) -> str:
+        slug = urlparse(path).path.strip('/').replace('/', os.sep) or '_root'
+        if params == ANY_PARAMS:
+            name = 'any'
+        else:
+            # 桩服务器从查询字符串解析出的参数都是字符串，录制时同样统一为字符串
+            name = _params_key({k: str(v) for k, v in (params or {}).items()})
+        return os.path.join(self.directory, 'http', method.upper(), slug, f'{name}.json')
+
+    def save_http(self, method: str, path: str, params, status: int, headers: dict, body):
+        record = {'status': status, 'headers': headers, 'body': body}
+        content = json.dumps(record, default=str, ensure_ascii=False, indent=1)
+        self._write(self.http_path(method, path, params), content.encode('utf-8'))
+
+    def load_http(self, method: str, path: str, params):
+        fixture = self._existing(self.http_path(method, path, params))
+        if fixture is None:
+            return None
+        return json.loads(self._read(fixture))
+
+
+class RecordingTrading:
+    """
+    Trading 连接的录制代理：正常执行调用，并把原始 XML 响应保存为夹具。
+    其余属性（包括赋值，如 verb）透传给被包装的连接对象。
+    """
+
+    def __init__(self, connection, store: FixtureStore):
+        object.__setattr__(self, '_connection', connection)
+        object.__setattr__(self, '_store', store)
+
+    def execute(self, verb, data=None, *args, **kwargs):
+        response = self._connection.execute(verb, data, *args, **kwargs)
+        self._store.save_trading(verb, _page_number(data), response.content, _request_window(data))
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection, name, value)
+
+
+class RecordingRestClient:
+    """
+    ebay_rest API 对象的录制代理：调用 sell_* / commerce_* 等方法时
+    把结果（生成器会被完整展开）保存为夹具，再原样返回给调用方。
+    """
+
+    def __init__(self, api_rest, store: FixtureStore):
+        self._api_rest = api_rest
+        self._store = store
+
+    def __getattr__(self, name):
+        attr = getattr(self._api_rest, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def recorded(*args, **kwargs):
+            params = {'args': list(args), 'kwargs': kwargs}
+            result = attr(*args, **kwargs)
+            if hasattr(result, '__iter__') and not isinstance(result, (dict, str, list)):
+                items = list(result)
+                self._store.save_rest(name, params, items, generator=True)
+                return iter(items)
+            self._store.save_rest(name, params, result, generator=False)
+            return result
+
+        return recorded
+
+
+class Recorder:
+    """EbayAPI.recorder 的实现：包装新建的 Trading 连接并保存直接 HTTP 请求的响应。"""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+
+    def wrap_trading(self, connection):
+        return RecordingTrading(connection, self.store)
+
+    def record_trading(self, verb: str, page: int, content: bytes, data=None):
+        self.store.save_trading(verb, page, content, _request_window(data))
+
+    def record_http(self, method: str, path: str, params, response):
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        headers = {k: v for k, v in response.headers.items() if k.lower() in ('location', 'content-type')}
+        self.store.save_http(method, path, params, response.status_code, headers, body)
+
+
+def start_recording(api: EbayAPI, directory: str) -> FixtureStore:
+    """
+    为已初始化的 EbayAPI 实例开启录制，之后的 Trading / REST 响应都会写入 directory。
+
+    返回:
+        FixtureStore: 夹具存储对象
+    """
+    store = FixtureStore(directory)
+    api.recorder = Recorder(store)
+    if api.api_trading is not None and not isinstance(api.api_trading, RecordingTrading):
+        api.api_trading = RecordingTrading(api.api_trading, store)
+    if api.api_rest is not None and not isinstance(api.api_rest, RecordingRestClient):
+        api.api_rest = RecordingRestClient(api.api_rest, store)
+    return store
+
+
+class _ReplayToken:
+    def get(self):
+        return 'replay-token'
+
+
+class ReplayRestClient:
+    """
+    ebay_rest API 对象的回放替身：按方法名和参数返回录制的结果（或该方法的通配夹具），
+    没有对应夹具时抛出 FixtureMissing。
+    """
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0):
+        self._store = store
+        self._latency = latency
+        self._user_token = _ReplayToken()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def replayed(*args, **kwargs):
+            if self._latency:
+                time.sleep(self._latency)
+            record = self._store.load_rest(name, {'args': list(args), 'kwargs': kwargs})
+            if record is None:
+                raise FixtureMissing(f"没有找到 {name} 的录制数据: {args} {kwargs}")
+            result = record['result']
+            return iter(result) if record.get('generator') else result
+
+        return replayed
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """桩服务器请求处理器：Trading 请求按调用名、时间窗口和页码返回 XML，其余请求返回录制的 JSON。"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            if key.lower() != 'content-type':
+                self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str):
+        server = self.server
+        body = self._read_body()
+        if server.latency:
+            time.sleep(server.latency)
+
+        verb = self.headers.get('X-EBAY-API-CALL-NAME')
+        if verb:
+            try:
+                xml = server.store.load_trading(verb, _page_number(body), _request_window(body))
+            except FixtureMissing as e:
+                self._send(404, str(e).encode('utf-8'), 'text/plain; charset=utf-8')
+                return
+            self._send(200, xml, 'text/xml')
+            return
+
+        parsed = urlparse(self.path)
+        params = dict(parse_qsl(parsed.query)) or None
+        record = server.store.load_http(method, parsed.path, params)
+        if record is None:
+            self._send(404, b'{}', 'application/json')
+            return
+        payload = record.get('body')
+        data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        self._send(record.get('status', 200), data.encode('utf-8'), 'application/json', record.get('headers'))
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class StubServer:
+    """在后台线程运行的本地桩服务器，按夹具响应 Trading 和 REST 请求。"""
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = store
+        self.httpd.latency = latency
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class ReplayEnvironment:
+    """
+    回放环境：启动桩服务器，并创建一个不读取配置、不访问 OAuth 的 EbayAPI 实例，
+    其 Trading 连接和直接 HTTP 请求指向桩服务器，ebay_rest 调用由 ReplayRestClient 应答。
+
+    参数:
+        directory: 夹具目录
+        latency: 每个请求的人为延迟（秒），用于模拟网络耗时
+        marketplace_id: 市场ID
+        allow_unwindowed: 见 FixtureStore
+    """
+
+    def __init__(self, directory: str, latency: float = 0.0, marketplace_id: str = 'EBAY_US',
+                 allow_unwindowed: bool = False):
+        self.store = FixtureStore(directory, allow_unwindowed=allow_unwindowed)
+        self.latency = latency
+        self.marketplace_id = marketplace_id
+        self.server = None
+        self.api = None
+
+    def start(self) -> EbayAPI:
+        self.server = StubServer(self.store, latency=self.latency).start()
+
+        api = EbayAPI.__new__(EbayAPI)
+        api.application = 'replay'
+        api.user = 'replay'
+        api.config_path = None
+        api.marketplace_id = self.marketplace_id
+        api.app_info = {}
+        api.user_info = {}
+        api.APP_ID = api.DEV_ID = api.CERT_ID = 'replay'
+        api.access_token = 'replay-token'
+        api.TRADING_DOMAIN = self.server.address
+        api.TRADING_HTTPS = False
+        api.REST_BASE_URL = f'http://{self.server.address}'
+        api.api_rest = ReplayRestClient(self.store, latency=self.latency)
+        api.api_trading = api._new_trading_connection()
+
+        self.api = api
+        return api
+
+    def stop(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+
+    def __enter__(self) -> EbayAPI:
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+并发相同请求的合并（single-flight）。
+
+多个线程同时发起同一个只读调用（如看板刷新和定时任务同时调用 get_active_listings）时，
+只有第一个线程真正执行分页拉取，其余线程等待并拿到它的结果（或同一异常的副本）。
+调用结束后条目即被移除，之后的调用重新执行；结果的复用期限由响应缓存（ebayapi.cache）负责。
+
+不传 copy 时等待的线程拿到的是同一个对象；传入 copy（如 copy.deepcopy）时每个等待的线程拿到各自的副本，
+副本由执行的线程在返回结果之前生成，因此调用方可以随意修改自己拿到的结果。
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters', 'copies')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.copies = None
+
+
+class SingleFlight:
+    """按键合并进行中的调用，线程安全。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn, copy=None) -> tuple:
+        """
+        执行 fn()；键相同的调用正在进行时不再执行，等待并返回它的结果。
+
+        参数:
+            key: 可哈希的调用键
+            fn: 无参数的 callable
+            copy: callable(result) -> 副本；提供时等待的线程各自拿到一个副本，执行的线程拿到原对象
+
+        返回:
+            tuple: (结果, 是否复用了其他线程的调用)；fn 抛出异常时每个等待的线程抛出它的副本
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise self._copy_error(call.error) or call.error
+            if call.copies is not None:
+                return call.copies.pop(), True
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # 条目移除后不会再有新的等待者，此时 waiters 即需要的副本数
+            if call.error is None and copy is not None and call.waiters:
+                try:
+                    call.copies = [copy(call.result) for _ in range(call.waiters)]
+                except BaseException as e:
+                    call.error = e
+            call.done.set()
+        return call.result, False
+
+    @staticmethod
+    def _copy_error(error: BaseException):
+        """
+        返回给等待线程抛出的异常副本：同一个异常对象在多个线程中抛出时，__traceback__ 等属性会被并发修改。
+        副本带有原异常的 args、属性和 __cause__（回溯只包含等待线程自己的调用栈）；无法复制时返回 None，只能抛出原对象。
+        """
+        cls = type(error)
+        try:
+            # 不调用 __init__：很多异常类（如 ebay_rest.Error）的构造参数与 args 不一致
+            duplicate = cls.__new__(cls, *error.args)
+            duplicate.args = error.args
+            if hasattr(error, '__dict__'):
+                duplicate.__dict__.update(error.__dict__)
+            for klass in cls.__mro__:
+                slots = klass.__dict__.get('__slots__', ())
+                for name in (slots,) if isinstance(slots, str) else slots:
+                    if name not in ('__dict__', '__weakref__') and hasattr(error, name):
+                        setattr(duplicate, name, getattr(error, name))
+            duplicate.__cause__ = error.__cause__
+        except Exception:
+            return None
+        return duplicate
+
+    def in_flight(self) -> int:
+        """当前进行中的调用数。"""
+        with self._lock:
+            return len(self._calls)
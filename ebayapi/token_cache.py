@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+跨进程共享的用户访问令牌缓存。
+
+令牌按 (application, user, scope) 保存在一个 JSON 文件中，读写都在文件锁内进行：
+同时启动的多个进程中只有第一个会向 OAuth 端点刷新令牌，其余进程等待锁释放后直接读到新令牌；
+令牌在有效期内时，EbayAPI 初始化不再发起任何 OAuth 请求。
+
+    cache = TokenCache('~/.ebayapi/tokens.json')
+    api = EbayAPI(application, user, config_path, token_cache=cache)
+
+缓存文件包含访问令牌，创建时权限设为仅当前用户可读写。
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 令牌剩余有效期少于该值时视为过期（与 ebay_rest 的判断一致）
+EXPIRY_MARGIN = timedelta(minutes=5)
+
+
+def _as_utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def cache_key(application: str, user: str, scopes) -> str:
+    """缓存键：应用、用户和排序后的 scope 列表的摘要。"""
+    scope_digest = hashlib.sha1(' '.join(sorted(scopes or ())).encode('utf-8')).hexdigest()[:16]
+    return f'{application}|{user}|{scope_digest}'
+
+
+class TokenCache:
+    """
+    参数:
+        path: 缓存文件路径（锁文件为同目录下的 <path>.lock）
+        lock_timeout: 等待文件锁的最长秒数，超时抛出 TimeoutError
+    """
+
+    def __init__(self, path: str, lock_timeout: float = 60.0):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.lock_timeout = lock_timeout
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    @contextlib.contextmanager
+    def lock(self):
+        """跨进程的排他锁（fcntl.flock / Windows 上为 msvcrt.locking）。"""
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        deadline = time.monotonic() + self.lock_timeout
+        try:
+            while True:
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f'等待令牌缓存锁超时: {self.path}.lock')
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data: dict):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _valid(entry: dict):
+        if not entry or not entry.get('access_token'):
+            return None
+        try:
+            expiry = _as_utc(datetime.fromisoformat(entry['expiry']))
+        except (KeyError, TypeError, ValueError):
+            return None
+        if expiry - EXPIRY_MARGIN <= datetime.now(timezone.utc):
+            return None
+        return entry['access_token'], expiry
+
+    def get(self, application: str, user: str, scopes) -> tuple:
+        """
+        返回:
+            tuple: (access_token, expiry)；没有缓存或即将过期时返回 None
+        """
+        with self.lock():
+            return self._valid(self._read().get(cache_key(application, user, scopes)))
+
+    def set(self, application: str, user: str, scopes, access_token: str, expiry: datetime):
+        with self.lock():
+            self._store(cache_key(application, user, scopes), access_token, expiry)
+
+    def _store(self, key: str, access_token: str, expiry: datetime):
+        data = self._read()
+        now = datetime.now(timezone.utc)
+        # 顺便清理已过期的条目
+        data = {k: v for k, v in data.items() if self._valid(v) is not None}
+        data[key] = {'access_token': access_token, 'expiry': _as_utc(expiry).isoformat(), 'updated_at': now.isoformat()}
+        self._write(data)
+
+    def get_or_refresh(self, application: str, user: str, scopes, refresh) -> tuple:
+        """
+        在锁内读取令牌，缺失或即将过期时调用 refresh() 获取新令牌并写回。
+
+        参数:
+            refresh: callable() -> (access_token, expiry)
+
+        返回:
+            tuple: (access_token, expiry, from_cache)
+        """
+        key = cache_key(application, user, scopes)
+        with self.lock():
+            cached = self._valid(self._read().get(key))
+            if cached is not None:
+                return cached[0], cached[1], True
+            access_token, expiry = refresh()
+            self._store(key, access_token, expiry)
+            return access_token, _as_utc(expiry), False
+
+    def invalidate(self, application: str = None, user: str = None):
+        """删除缓存的令牌：指定应用（和用户）时只删除对应条目，不带参数时清空。"""
+        if application is None:
+            prefix = ''
+        else:
+            prefix = f'{application}|{user}|' if user is not None else f'{application}|'
+        with self.lock():
+            data = self._read()
+            self._write({k: v for k, v in data.items() if prefix and not k.startswith(prefix)})
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+测试共用的回放夹具：按录制格式生成 Trading XML 页面和 ebay_rest 生成器结果，
+供基准测试、解析一致性测试和切分时间段等行为测试使用。
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.replay import ANY_PARAMS, FixtureStore
+
+LISTING_PAGES = 4
+LISTINGS_PER_PAGE = 30
+ORDER_PAGES = 3
+ORDERS_PER_PAGE = 50
+FINANCE_RECORDS = 3000
+CAMPAIGN_ADS = 2000
+
+ORDER_DATE = datetime(2026, 10, 1, 12, 0, 0, tzinfo=timezone.utc)
+# 切分时间段的测试把当前时间固定为该值，各时间段的夹具按对应窗口保存
+SLICE_NOW = datetime(2026, 10, 19, 0, 0, 0, tzinfo=timezone.utc)
+SLICE_DAYS = 7
+ORDER_SLICES = 4
+
+_NS = 'xmlns="urn:ebay:apis:eBLBaseComponents"'
+
+
+def seller_list_page(page: int) -> str:
+    end_time = (datetime.now(timezone.utc) + timedelta(days=20)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    items = []
+    for i in range(LISTINGS_PER_PAGE):
+        item_id = 380000000000 + page * 1000 + i
+        items.append(f"""
+    <Item>
+      <ItemID>{item_id}</ItemID>
+      <Title>Sony Cyber-Shot DSC-RX100 III Camera #{item_id}</Title>
+      <SKU>SKU-{item_id}</SKU>
+      <Quantity>1</Quantity>
+      <ListingType>FixedPriceItem</ListingType>
+      <ListingDetails>
+        <StartTime>2026-09-01T02:18:35.000Z</StartTime>
+        <EndTime>{end_time}</EndTime>
+        <ViewItemURL>https://www.ebay.com/itm/{item_id}</ViewItemURL>
+      </ListingDetails>
+      <PrimaryCategory><CategoryID>31388</CategoryID><CategoryName>Cameras &amp; Photo:Digital Cameras</CategoryName></PrimaryCategory>
+      <SellingStatus>
+        <BidCount>0</BidCount>
+        <CurrentPrice currencyID="USD">{400 + i}.0</CurrentPrice>
+        <QuantitySold>0</QuantitySold>
+        <ListingStatus>Active</ListingStatus>
+      </SellingStatus>
+      <WatchCount>{i}</WatchCount>
+    </Item>""")
+    has_more = 'true' if page < LISTING_PAGES else 'false'
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<GetSellerListResponse {_NS}>
+  <Timestamp>2026-10-19T00:00:00.000Z</Timestamp>
+  <Ack>Success</Ack>
+  <Version>1193</Version>
+  <PaginationResult>
+    <TotalNumberOfPages>{LISTING_PAGES}</TotalNumberOfPages>
+    <TotalNumberOfEntries>{LISTING_PAGES * LISTINGS_PER_PAGE}</TotalNumberOfEntries>
+  </PaginationResult>
+  <HasMoreItems>{has_more}</HasMoreItems>
+  <ItemArray>{''.join(items)}
+  </ItemArray>
+  <ItemsPerPage>{LISTINGS_PER_PAGE}</ItemsPerPage>
+  <PageNumber>{page}</PageNumber>
+  <ReturnedItemCountActual>{LISTINGS_PER_PAGE}</ReturnedItemCountActual>
+</GetSellerListResponse>"""
+
+
+def orders_page(page: int, slice_index: int = 0) -> str:
+    """slice_index 大于 1 时，第 1 页的第一个订单是上一时间段的最后一个订单（时间段边界上的订单）。"""
+    orders = []
+    for i in range(ORDERS_PER_PAGE):
+        order_id = f'20-{slice_index * 100 + page:05d}-{i:05d}'
+        if slice_index > 1 and page == 1 and i == 0:
+            order_id = f'20-{(slice_index - 1) * 100 + ORDER_PAGES:05d}-{ORDERS_PER_PAGE - 1:05d}'
+        orders.append(f"""
+    <Order>
+      <OrderID>{order_id}</OrderID>
+      <OrderStatus>Completed</OrderStatus>
+      <CreatedTime>2026-10-01T12:00:00.000Z</CreatedTime>
+      <PaidTime>2026-10-01T12:05:00.000Z</PaidTime>
+      <Total currencyID="USD">{300 + i}.00</Total>
+      <BuyerUserID>buyer_{i}</BuyerUserID>
+      <TransactionArray>
+        <Transaction>
+          <Item><ItemID>{380000000000 + i}</ItemID><Title>Camera {i}</Title></Item>
+          <TransactionID>{2500000000000 + i}</TransactionID>
+          <CreatedDate>2026-10-01T12:00:00.000Z</CreatedDate>
+          <QuantityPurchased>1</QuantityPurchased>
+          <TransactionPrice currencyID="USD">{300 + i}.00</TransactionPrice>
+          <OrderLineItemID>{380000000000 + i}-{2500000000000 + i}</OrderLineItemID>
+        </Transaction>
+      </TransactionArray>
+    </Order>""")
+    has_more = 'true' if page < ORDER_PAGES else 'false'
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<GetOrdersResponse {_NS}>
+  <Timestamp>2026-10-19T00:00:00.000Z</Timestamp>
+  <Ack>Success</Ack>
+  <Version>1193</Version>
+  <PaginationResult>
+    <TotalNumberOfPages>{ORDER_PAGES}</TotalNumberOfPages>
+    <TotalNumberOfEntries>{ORDER_PAGES * ORDERS_PER_PAGE}</TotalNumberOfEntries>
+  </PaginationResult>
+  <HasMoreOrders>{has_more}</HasMoreOrders>
+  <OrderArray>{''.join(orders)}
+  </OrderArray>
+  <OrdersPerPage>{ORDERS_PER_PAGE}</OrdersPerPage>
+  <PageNumber>{page}</PageNumber>
+  <ReturnedOrderCountActual>{ORDERS_PER_PAGE}</ReturnedOrderCountActual>
+</GetOrdersResponse>"""
+
+
+def finance_transactions() -> list:
+    records = []
+    for i in range(FINANCE_RECORDS):
+        order_id = f'20-00001-{i % 500:05d}'
+        record = {
+            'transaction_id': f'TX{i:08d}',
+            'transaction_type': 'SALE' if i % 3 else 'NON_SALE_CHARGE',
+            'transaction_status': 'PAYOUT',
+            'transaction_date': '2026-10-01T12:00:00.000Z',
+            'amount': {'value': f'{10 + i % 90}.00', 'currency': 'USD'},
+            'booking_entry': 'CREDIT' if i % 3 else 'DEBIT',
+            'transaction_memo': 'Promoted Listings - General fee' if i % 3 == 0 else None,
+            'references': [{'reference_id': order_id, 'reference_type': 'ORDER_ID'}],
+        }
+        if i % 3:
+            record['order_id'] = order_id
+        records.append({'record': record})
+    records.append({'total': FINANCE_RECORDS})
+    return records
+
+
+def fulfillment_orders() -> list:
+    orders = []
+    for i in range(ORDER_PAGES * ORDERS_PER_PAGE):
+        status = 'NOT_STARTED' if i % 4 else 'IN_PROGRESS'
+        orders.append({'record': {
+            'order_id': f'20-00009-{i:05d}',
+            'creation_date': '2026-10-01T12:00:00.000Z',
+            'last_modified_date': '2026-10-02T08:00:00.000Z',
+            'order_fulfillment_status': status,
+            'order_payment_status': 'PAID',
+            'cancel_status': {'cancel_state': 'NONE_REQUESTED'},
+            'buyer': {'username': f'buyer_{i}'},
+            'pricing_summary': {'total': {'value': f'{300 + i}.00', 'currency': 'USD'}},
+            'payment_summary': {'payments': [{'payment_date': '2026-10-01T12:05:00.000Z'}]},
+            'line_items': [
+                {'line_item_id': str(2500000000000 + i), 'legacy_item_id': str(380000000000 + i),
+                 'title': f'Camera {i}', 'quantity': 1, 'line_item_cost': {'value': f'{300 + i}.00'},
+                 'line_item_fulfillment_status': status},
+            ],
+        }})
+    orders.append({'total': ORDER_PAGES * ORDERS_PER_PAGE})
+    return orders
+
+
+def campaign_ads() -> list:
+    ads = [{'record': {'ad_id': f'AD{i}', 'listing_id': str(380000000000 + i),
+                       'bid_percentage': '5.0', 'ad_status': 'ACTIVE'}}
+           for i in range(CAMPAIGN_ADS)]
+    ads.append({'total': {'records_available': CAMPAIGN_ADS}})
+    return ads
+
+
+class FrozenDatetime(datetime):
+    """把 datetime.now() 固定为 SLICE_NOW，使切分时间段的请求窗口与录制的窗口一致。"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return SLICE_NOW.astimezone(tz) if tz is not None else SLICE_NOW.replace(tzinfo=None)
+
+
+def build_fixture_dir(directory: str) -> str:
+    """
+    在 directory 中保存全部夹具：不带窗口的商品/订单页面、按 SLICE_NOW 切分的各时间段订单页面，
+    以及财务、广告和 Fulfillment 订单的通配 REST 夹具。
+    """
+    store = FixtureStore(directory)
+    for page in range(1, LISTING_PAGES + 1):
+        store.save_trading('GetSellerList', page, seller_list_page(page))
+    for page in range(1, ORDER_PAGES + 1):
+        store.save_trading('GetOrders', page, orders_page(page))
+    slices = EbayAPI._time_slices(SLICE_NOW - timedelta(days=SLICE_DAYS * ORDER_SLICES), SLICE_NOW, SLICE_DAYS)
+    for slice_index, (create_time_from, create_time_to) in enumerate(slices, 1):
+        request = EbayAPI._orders_request(create_time_from, create_time_to, 'All', 1)
+        window = {'CreateTimeFrom': request['CreateTimeFrom'], 'CreateTimeTo': request['CreateTimeTo']}
+        for page in range(1, ORDER_PAGES + 1):
+            store.save_trading('GetOrders', page, orders_page(page, slice_index), window)
+    store.save_rest('sell_finances_get_transactions', ANY_PARAMS, finance_transactions(), generator=True)
+    store.save_rest('sell_marketing_get_ads', ANY_PARAMS, campaign_ads(), generator=True)
+    store.save_rest('sell_fulfillment_get_orders', ANY_PARAMS, fulfillment_orders(), generator=True)
+    return directory
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+广告报告的下载解压与 TSV 汇总（AdReportTable），不访问 eBay。
+"""
+
+import gzip
+import io
+import os
+import sys
+
+import pytest
+from urllib3 import HTTPResponse
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ad_report import AdReportTable
+from ebayapi.ebayapi import EbayAPI
+
+REPORT = (
+    'Promoted Listings report\n'
+    'Generated 2026-10-02\n'
+    '\n'
+    'Listing ID\tDate\tImpressions\tClicks\tSold quantity\tSales (USD)\tAd fees (USD)\n'
+    '111\t2026-10-01\t1,000\t10\t2\t$1,234.50\t$123.45\n'
+    '111\t2026-10-01\t500\t5\t1\t$100.00\t$10.00\n'
+    '111\t2026-10-02\t200\t2\t0\t\t-\n'
+    '222\t2026-10-02\t300\t3\t1\t$50.00\t$5.00\n'
+    '\t2026-10-02\t1\t1\t1\t1\t1\n'
+)
+
+
+class _FakeResponse:
+    def __init__(self, body: bytes, content_encoding: str = None):
+        headers = {'content-encoding': content_encoding} if content_encoding else {}
+        self.raw = HTTPResponse(body=io.BytesIO(body), headers=headers, preload_content=False)
+
+    def close(self):
+        self.raw.release_conn()
+
+
+@pytest.mark.parametrize('file_gzip, transport_gzip', [(True, False), (False, True), (True, True), (False, False)])
+def test_download_ad_report_encodings(file_gzip, transport_gzip):
+    body = REPORT.encode('utf-8')
+    if file_gzip:
+        body = gzip.compress(body)
+    if transport_gzip:
+        body = gzip.compress(body)
+    api = EbayAPI.__new__(EbayAPI)
+    api._rest_request = lambda *args, **kwargs: _FakeResponse(body, 'gzip' if transport_gzip else None)
+    table = api.download_ad_report('https://example.invalid/report')
+    assert len(table) == 3
+
+
+def test_report_aggregation():
+    table = AdReportTable()
+    assert table.load_tsv(io.StringIO(REPORT)) == 4
+    assert table.rows[('111', '2026-10-01')] == {'impressions': 1500.0, 'clicks': 15.0, 'sale_quantity': 3.0,
+                                                 'sales': 1334.5, 'spend': 133.45}
+    summary = table.summary_by_listing()
+    assert summary['111']['spend'] == pytest.approx(133.45)
+    assert summary['111']['roas'] == pytest.approx(1334.5 / 133.45)
+    assert summary['222']['roas'] == pytest.approx(10.0)
+    assert table.spend_for_listing('111', date_from='2026-10-02') == 0.0
+    totals = table.totals(date_to='2026-10-01')
+    assert totals['sales'] == pytest.approx(1334.5) and totals['impressions'] == 1500.0
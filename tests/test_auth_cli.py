@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+ebayapi-auth 的本地回调服务器：授权失败时回显的错误信息需要转义。
+"""
+
+import http.server
+import os
+import sys
+import threading
+from urllib.parse import urlencode
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.auth_cli import _CallbackHandler
+
+
+def test_error_description_is_escaped():
+    with http.server.HTTPServer(('127.0.0.1', 0), _CallbackHandler) as httpd:
+        httpd.expected_state = 'state'
+        httpd.auth_code = None
+        httpd.auth_error = None
+        thread = threading.Thread(target=httpd.handle_request)
+        thread.start()
+        query = urlencode({'error': 'access_denied', 'error_description': '<script>alert(1)</script>'})
+        response = requests.get(f'http://127.0.0.1:{httpd.server_port}/?{query}', timeout=5)
+        thread.join()
+
+    assert httpd.auth_error == '<script>alert(1)</script>'
+    assert '<script>' not in response.text
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in response.text
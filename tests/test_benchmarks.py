@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+离线性能基准测试（pytest-benchmark）
+
+使用 ebayapi.replay 的回放环境：Trading XML 由本地桩服务器返回，ebay_rest 调用由回放客户端应答，
+无需 ebay_rest.json 凭据，也不会访问 eBay。夹具由 replay_fixtures 在测试模块开始时按录制格式生成；
+基准测试只关心分页和解析，订单请求的时间窗口随当前时间变化，因此允许退回不带窗口的夹具。
+
+运行：
+    python -m pytest tests/test_benchmarks.py --benchmark-only
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.replay import ReplayEnvironment
+from replay_fixtures import (CAMPAIGN_ADS, FrozenDatetime, LISTING_PAGES, LISTINGS_PER_PAGE, ORDER_DATE, ORDER_PAGES,
+                             ORDER_SLICES, ORDERS_PER_PAGE, SLICE_DAYS, build_fixture_dir, seller_list_page)
+
+
+@pytest.fixture(scope='module')
+def api(tmp_path_factory):
+    directory = build_fixture_dir(str(tmp_path_factory.mktemp('replay')))
+    with ReplayEnvironment(directory, allow_unwindowed=True) as replay_api:
+        yield replay_api
+
+
+def test_get_all_listings(benchmark, api):
+    listings = benchmark(api.get_all_listings, days=120, granularity_level='Coarse')
+    assert len(listings) == LISTING_PAGES * LISTINGS_PER_PAGE
+
+
+def test_get_all_listings_process_pool(benchmark, api):
+    listings = benchmark(api.get_all_listings, days=120, granularity_level='Coarse', process_workers=2)
+    assert len(listings) == LISTING_PAGES * LISTINGS_PER_PAGE
+
+
+def test_iter_listings(benchmark, api):
+    listings = benchmark(lambda: list(api.iter_listings(days=120, granularity_level='Coarse')))
+    assert len(listings) == LISTING_PAGES * LISTINGS_PER_PAGE
+
+
+def test_get_orders_last_days(benchmark, api):
+    orders = benchmark(api.get_orders_last_days, days=7)
+    assert len(orders) == ORDER_PAGES * ORDERS_PER_PAGE
+
+
+def test_get_orders_sliced(benchmark, api, monkeypatch):
+    monkeypatch.setattr('ebayapi.ebayapi.datetime', FrozenDatetime)
+    orders = benchmark(api.get_orders_last_days, days=SLICE_DAYS * ORDER_SLICES, slice_days=SLICE_DAYS,
+                       max_workers=4)
+    assert len(orders) == ORDER_SLICES * ORDER_PAGES * ORDERS_PER_PAGE - (ORDER_SLICES - 1)
+
+
+def test_orders_requiring_shipment_fulfillment(benchmark, api):
+    orders = benchmark(api.get_orders_requiring_shipment, days=30, use_fulfillment_api=True)
+    assert len(orders) == ORDER_PAGES * ORDERS_PER_PAGE
+    assert orders[0]['OrderStatus'] == 'Completed' and orders[0]['CreatedTime'] == ORDER_DATE.replace(tzinfo=None)
+
+
+def test_to_dict_recursive(benchmark, api):
+    response = api.api_trading.execute('GetSellerList', {'Pagination': {'EntriesPerPage': 30, 'PageNumber': 1}})
+    items = response.reply.ItemArray.Item
+    converted = benchmark(lambda: [EbayAPI.to_dict_recursive(item) for item in items])
+    assert len(converted) == LISTINGS_PER_PAGE
+
+
+def test_stream_parse_page(benchmark, api):
+    from ebayapi.parsing import TradingResponseStream
+    content = seller_list_page(1).encode('utf-8')
+    list_nodes, datetime_nodes = EbayAPI._trading_parse_config(api.api_trading, 'GetSellerList')
+    records = benchmark(lambda: list(TradingResponseStream(content, 'GetSellerList', 'ItemArray', 'Item',
+                                                           list_nodes, datetime_nodes)))
+    assert len(records) == LISTINGS_PER_PAGE
+
+
+def test_finances_filtering(benchmark, api):
+    transactions = benchmark(api.get_transactions_for_order, '20-00001-00007', ORDER_DATE)
+    assert transactions
+    assert all(tx.get('order_id', '20-00001-00007') == '20-00001-00007' for tx in transactions)
+
+
+def test_campaign_ads_collection(benchmark, api):
+    result = benchmark(api.get_campaign_ads, 'CAMPAIGN-1')
+    assert len(result['listing_ids']) == CAMPAIGN_ADS
+
+
+def test_inventory_diff(benchmark):
+    from ebayapi.inventory_sync import InventorySnapshot, diff_inventory
+    from ebayapi.records import Listing
+    snapshot = InventorySnapshot(Listing(item_id=str(100000 + i), sku=f'SKU-{i}', price=9.99, quantity=10,
+                                         quantity_sold=2) for i in range(20000))
+    stock = {f'SKU-{i}': (9.99, 7 if i % 100 == 0 else 8) for i in range(20000)}
+    revisions, unchanged, unknown = benchmark(diff_inventory, stock, snapshot)
+    assert len(revisions) == 200 and unchanged == 19800 and not unknown
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+响应缓存（ebayapi.cache.ResponseCache）的 TTL、LRU、失效与磁盘格式，以及写操作后的缓存失效。
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ebayapi.cache as cache_module
+from ebayapi.cache import ResponseCache
+from ebayapi.ebayapi import EbayAPI
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    return now
+
+
+def test_ttl_expiry(clock):
+    cache = ResponseCache(ttls={'get_all_listings': 60})
+    cache.set('get_all_listings', {'days': 120}, [1, 2])
+    clock[0] += 59
+    assert cache.get('get_all_listings', {'days': 120}) == (True, [1, 2])
+    clock[0] += 2
+    assert cache.get('get_all_listings', {'days': 120}) == (False, None)
+    cache.set('get_all_listings', {'days': 120}, [1], ttl=0)
+    assert cache.get('get_all_listings', {'days': 120}) == (False, None)
+
+
+def test_lru_eviction(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.set('op', {'n': 1}, 1)
+    cache.set('op', {'n': 2}, 2)
+    assert cache.get('op', {'n': 1})[0]      # n=1 变为最近使用
+    cache.set('op', {'n': 3}, 3)
+    assert cache.get('op', {'n': 2}) == (False, None)
+    assert cache.get('op', {'n': 1}) == (True, 1) and cache.get('op', {'n': 3}) == (True, 3)
+
+
+def test_invalidate_by_operation(tmp_path, clock):
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.set('get_all_listings', {}, ['listing'])
+    cache.set('get_campaign_ads', {}, ['ad'])
+    cache.invalidate('get_all_listings')
+    assert cache.get('get_all_listings', {}) == (False, None)
+    assert cache.get('get_campaign_ads', {}) == (True, ['ad'])
+    # 另一个进程（新实例）也看不到已失效的磁盘条目
+    other = ResponseCache(directory=str(tmp_path))
+    assert other.get('get_all_listings', {}) == (False, None)
+    cache.invalidate()
+    assert other.get('get_campaign_ads', {}) == (False, None)
+
+
+def test_hits_return_copies(clock):
+    cache = ResponseCache()
+    value = [{'ItemID': '1', 'Quantity': '3'}]
+    cache.set('get_all_listings', {}, value)
+    value[0]['Quantity'] = '0'
+    hit = cache.get('get_all_listings', {})[1]
+    hit.append({'ItemID': '2'})
+    assert cache.get('get_all_listings', {})[1] == [{'ItemID': '1', 'Quantity': '3'}]
+
+
+def test_disk_round_trip_is_json(tmp_path, clock):
+    value = {'ads': [{'listingId': '1'}], 'listing_ids': {'1', '2'},
+             'created': datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc), 'naive': datetime(2026, 10, 1)}
+    ResponseCache(directory=str(tmp_path)).set('get_campaign_ads', {'campaign_id': 'C'}, value)
+    files = [os.path.join(root, name) for root, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 1 and files[0].endswith('.json')
+    with open(files[0], 'r', encoding='utf-8') as f:
+        f.readline()
+        assert f.read().startswith('{')
+    assert oct(os.stat(tmp_path).st_mode & 0o777) == oct(0o700) or os.name == 'nt'
+    assert ResponseCache(directory=str(tmp_path)).get('get_campaign_ads', {'campaign_id': 'C'}) == (True, value)
+
+
+class _Reply:
+    Ack = 'Success'
+
+
+class _Response:
+    reply = _Reply()
+
+
+def test_invalidation_after_write(clock):
+    api = EbayAPI.__new__(EbayAPI)
+    api.marketplace_id = 'EBAY_US'
+    api.api_trading = None
+    api.enable_cache()
+    api._cache_set('get_all_listings', {}, ['before'])
+    seen_during_write = []
+
+    class Connection:
+        def execute(self, verb, data=None, **kwargs):
+            # 写入期间的并发读取仍命中旧缓存；写入返回后才失效，不会把旧数据重新缓存
+            seen_during_write.append(api._cache_get('get_all_listings', {})[0])
+            return _Response()
+
+    api._trading_execute(Connection(), 'AddItem', {})
+    assert seen_during_write == [True]
+    assert api._cache_get('get_all_listings', {}) == (False, None)
+
+    class Failing:
+        def execute(self, verb, data=None, **kwargs):
+            raise RuntimeError('timeout')
+
+    api._cache_set('get_all_listings', {}, ['before'])
+    with pytest.raises(RuntimeError):
+        api._trading_execute(Failing(), 'AddItem', {})
+    assert api._cache_get('get_all_listings', {}) == (False, None)
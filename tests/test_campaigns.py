@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+get_all_campaigns 的单页请求：只发一次 GET，透传 offset/limit，兼容两种 total 格式，字段统一为 camelCase。
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+
+
+class _Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def _api(payload):
+    api = EbayAPI.__new__(EbayAPI)
+    api.api_rest = object()
+    api.calls = []
+
+    def rest_request(method, path, params=None, **kwargs):
+        api.calls.append((method, path, params))
+        return _Response(payload)
+
+    api._rest_request = rest_request
+    return api
+
+
+CAMPAIGN = {
+    'campaign_id': '10001',
+    'campaign_name': 'Autumn sale',
+    'campaign_status': 'RUNNING',
+    'funding_strategy': {'funding_model': 'COST_PER_SALE', 'bid_percentage': '5.0'},
+    'campaign_criterion': {'selection_rules': [{'listing_condition_ids': ['1000']}]},
+    'marketplaceId': 'EBAY_US',
+}
+
+
+@pytest.mark.parametrize('total', [3, {'records_available': 3}, {'recordsAvailable': 3}])
+def test_single_get_with_caller_paging(total):
+    api = _api({'campaigns': [CAMPAIGN], 'total': total, 'href': 'https://api.ebay.com/...&offset=40'})
+    result = api.get_all_campaigns(campaign_status='RUNNING', limit=20, offset=40)
+
+    assert api.calls == [('GET', '/sell/marketing/v1/ad_campaign',
+                          {'limit': 20, 'offset': 40, 'campaign_status': 'RUNNING'})]
+    assert result['total'] == 3
+    assert result['limit'] == 20 and result['offset'] == 40
+    assert result['href'].endswith('offset=40')
+
+
+def test_keys_normalized_to_camel_case():
+    api = _api({'campaigns': [CAMPAIGN], 'total': 1})
+    campaign = api.get_all_campaigns()['campaigns'][0]
+
+    assert campaign == {
+        'campaignId': '10001',
+        'campaignName': 'Autumn sale',
+        'campaignStatus': 'RUNNING',
+        'fundingStrategy': {'fundingModel': 'COST_PER_SALE', 'bidPercentage': '5.0'},
+        'campaignCriterion': {'selectionRules': [{'listingConditionIds': ['1000']}]},
+        'marketplaceId': 'EBAY_US',
+    }
+    assert api.calls[0][2] == {'limit': 100, 'offset': 0}
+
+
+def test_limit_capped_and_empty_page():
+    api = _api({'total': 0})
+    result = api.get_all_campaigns(limit=1000)
+    assert api.calls[0][2]['limit'] == 500
+    assert result['campaigns'] == [] and result['total'] == 0
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Feed API 结果文件的流式解析测试：zip 压缩与未压缩的活动库存报告、订单报告。
+"""
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+
+INVENTORY_REPORT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<ActiveInventoryReport xmlns="urn:ebay:apis:eBLBaseComponents">
+  <Timestamp>2026-10-19T08:00:00.000Z</Timestamp>
+  <Ack>Success</Ack>
+  <SKUDetails>
+    <SKU>MUG-01</SKU>
+    <Price currencyID="USD">12.50</Price>
+    <Quantity>7</Quantity>
+    <ItemID>110001</ItemID>
+  </SKUDetails>
+  <SKUDetails>
+    <Price currencyID="USD">19.99</Price>
+    <Quantity>3</Quantity>
+    <ItemID>110002</ItemID>
+    <Variations>
+      <Variation>
+        <SKU>TEE-RED-M</SKU>
+        <Price currencyID="USD">19.99</Price>
+        <Quantity>3</Quantity>
+      </Variation>
+    </Variations>
+  </SKUDetails>
+</ActiveInventoryReport>
+"""
+
+ORDER_REPORT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<GetOrdersResponse xmlns="urn:ebay:apis:eBLBaseComponents">
+  <OrderArray>
+    <Order>
+      <OrderID>01-0001</OrderID>
+      <OrderStatus>Completed</OrderStatus>
+      <CreatedTime>2026-10-01T10:00:00.000Z</CreatedTime>
+      <TransactionArray>
+        <Transaction><TransactionID>1</TransactionID><Item><ItemID>110001</ItemID></Item></Transaction>
+      </TransactionArray>
+    </Order>
+    <Order>
+      <OrderID>01-0002</OrderID>
+      <OrderStatus>Completed</OrderStatus>
+      <CreatedTime>2026-10-02T10:00:00.000Z</CreatedTime>
+      <TransactionArray>
+        <Transaction><TransactionID>2</TransactionID><Item><ItemID>110001</ItemID></Item></Transaction>
+        <Transaction><TransactionID>3</TransactionID><Item><ItemID>110002</ItemID></Item></Transaction>
+      </TransactionArray>
+    </Order>
+  </OrderArray>
+</GetOrdersResponse>
+"""
+
+
+def _zip(tmp_path, name, content):
+    path = str(tmp_path / f'{name}.zip')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f'{name}.xml', content)
+    return path
+
+
+def _api(path):
+    api = EbayAPI.__new__(EbayAPI)
+    api.api_trading = None
+    api._run_feed_report = lambda feed_type, schema_version, filter_criteria, poll_interval, timeout: \
+        ('task-1', path, None)
+    return api
+
+
+def test_active_inventory_report_from_zip(tmp_path):
+    path = _zip(tmp_path, 'inventory', INVENTORY_REPORT)
+    result = _api(path).export_active_inventory()
+    assert result['success'] and result['file'] is None and not os.path.exists(path)
+    first, second = result['listings']
+    assert first == {'ItemID': '110001', 'SKU': 'MUG-01', 'Quantity': '7',
+                     'SellingStatus': {'CurrentPrice': {'value': '12.50'},
+                                       'ListingStatus': 'Active'}}
+    # 报告不提供 ListingDetails / EndTime
+    assert 'ListingDetails' not in first
+    assert second['SKU'] is None
+    assert second['Variations'] == {'Variation': [
+        {'SKU': 'TEE-RED-M', 'Price': {'value': '19.99'}, 'Quantity': '3'}]}
+
+
+def test_uncompressed_report_and_keep_file(tmp_path):
+    path = str(tmp_path / 'inventory.xml')
+    with open(path, 'wb') as f:
+        f.write(INVENTORY_REPORT)
+    result = _api(path).export_active_inventory(keep_file=True)
+    assert [listing['ItemID'] for listing in result['listings']] == ['110001', '110002']
+    assert result['file'] == path and os.path.exists(path)
+
+
+def test_order_report_records(tmp_path):
+    path = _zip(tmp_path, 'orders', ORDER_REPORT)
+    orders = list(EbayAPI._iter_feed_file(
+        path, 'Order', 'getordersresponse.orderarray.order',
+        list_nodes=('getordersresponse.orderarray.order.transactionarray.transaction',),
+        datetime_nodes=('createdtime',), container='OrderArray'))
+    assert [order['OrderID'] for order in orders] == ['01-0001', '01-0002']
+    assert [len(order['TransactionArray']['Transaction']) for order in orders] == [1, 2]
+    assert orders[0]['CreatedTime'].year == 2026
+
+
+def test_malformed_report_is_reported(tmp_path):
+    path = _zip(tmp_path, 'broken', INVENTORY_REPORT[:200])
+    result = _api(path).export_active_inventory()
+    assert not result['success'] and result['listings'] == [] and result['error']
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Finances 交易索引（ebayapi.finances）与 get_transaction_index 的窗口复用。
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.finances import is_advertising_fee
+
+UTC = timezone.utc
+
+
+class _FakeRest:
+    def __init__(self, records):
+        self.records = records
+        self.filters = []
+
+    def sell_finances_get_transactions(self, filter=None, **kwargs):
+        self.filters.append(filter)
+        return iter([{'record': record} for record in self.records])
+
+
+def _api(records):
+    api = EbayAPI.__new__(EbayAPI)
+    api.marketplace_id = 'EBAY_US'
+    api.coalesce_requests = False
+    api.api_rest = _FakeRest(records)
+    return api
+
+
+def _tx(transaction_id, day, **fields):
+    return dict(transaction_id=transaction_id, transaction_date=f'2026-10-{day:02d}T12:00:00.000Z', **fields)
+
+
+def test_narrower_window_reuses_index_without_outside_transactions():
+    api = _api([_tx('T1', 1, order_id='O1'), _tx('T5', 5, order_id='O5'), _tx('T9', 9, order_id='O9')])
+    wide = api.get_transaction_index(datetime(2026, 10, 1, tzinfo=UTC), datetime(2026, 10, 10, tzinfo=UTC))
+    assert len(wide) == 3
+
+    narrow = api.get_transaction_index(datetime(2026, 10, 4), datetime(2026, 10, 6))
+    assert len(api.api_rest.filters) == 1
+    assert [r['transaction_id'] for r in narrow] == ['T5']
+    assert narrow.by_order('O1') == [] and narrow.by_order('O5')[0]['transaction_id'] == 'T5'
+    # 同一窗口直接返回原索引
+    assert api.get_transaction_index(datetime(2026, 10, 1), datetime(2026, 10, 10)) is wide
+
+
+def test_finance_filter_strings():
+    assert EbayAPI._finance_filter({}) == ''
+    assert EbayAPI._finance_filter({'transaction_type': 'NON_SALE_CHARGE'}) == 'transactionType:{NON_SALE_CHARGE}'
+    # 列表值排序、参数名排序，None 忽略
+    assert EbayAPI._finance_filter({'transaction_type': ['SALE', 'REFUND'], 'transaction_status': 'PAYOUT',
+                                    'order_id': None}) == \
+        'transactionStatus:{PAYOUT},transactionType:{REFUND|SALE}'
+    assert EbayAPI._finance_filter({'transaction_type': ['REFUND', 'SALE']}) == \
+        EbayAPI._finance_filter({'transaction_type': ['SALE', 'REFUND']})
+    with pytest.raises(ValueError):
+        EbayAPI._finance_filter({'fee_type': 'AD_FEE'})
+
+
+def test_server_side_filter_query():
+    api = _api([])
+    api.get_transaction_index(datetime(2026, 10, 1, tzinfo=UTC), datetime(2026, 10, 31, 23, 59, 59, tzinfo=UTC),
+                              transaction_type=['SALE', 'REFUND'], payout_id='6123456789')
+    assert api.api_rest.filters == [
+        'transactionDate:[2026-10-01T00:00:00Z..2026-10-31T23:59:59Z],'
+        'payoutId:{6123456789},transactionType:{REFUND|SALE}'
+    ]
+    # 过滤条件不同的查询不复用索引
+    api.get_transaction_index(datetime(2026, 10, 2, tzinfo=UTC), datetime(2026, 10, 3, tzinfo=UTC),
+                              transaction_type='SALE')
+    assert len(api.api_rest.filters) == 2
+
+
+def test_is_advertising_fee():
+    assert is_advertising_fee({'fee_type': 'AD_FEE'})
+    assert is_advertising_fee({'fee_type': 'OTHER', 'transaction_memo': 'Promoted Listings - General fee'})
+    assert not is_advertising_fee({'fee_type': 'FINAL_VALUE_FEE', 'transaction_memo': 'Final value fee'})
+    assert not is_advertising_fee({'transaction_memo': None})
+
+
+def test_get_advertising_fees_classification():
+    api = _api([
+        _tx('F1', 2, fee_type='AD_FEE', amount={'value': '1.50', 'currency': 'USD'}, order_id='O1'),
+        _tx('F2', 3, transaction_memo='Promoted Listings fee', amount={'value': '0.75', 'currency': 'USD'},
+            references=[{'reference_type': 'ORDER_ID', 'reference_id': 'O1'}]),
+        _tx('F3', 4, fee_type='AD_FEE', amount={'value': '2'},
+            references=[{'reference_type': 'ORDER_ID', 'reference_id': 'O2'}]),
+        _tx('F4', 4, fee_type='SHIPPING_LABEL', amount={'value': '9.99'}, order_id='O1'),
+    ])
+    fees = api.get_advertising_fees(datetime(2026, 10, 1, tzinfo=UTC), datetime(2026, 10, 31, tzinfo=UTC))
+    assert api.api_rest.filters[0].endswith(',transactionType:{NON_SALE_CHARGE}')
+    assert [tx['transaction_id'] for tx in fees['fees']] == ['F1', 'F2', 'F3']
+    assert fees['by_order'] == {'O1': 2.25, 'O2': 2.0}
+    assert fees['total'] == 4.25 and fees['currency'] == 'USD'
+
+
+def test_concurrent_fetches_keep_every_index():
+    class _SlowRest(_FakeRest):
+        def sell_finances_get_transactions(self, filter=None, **kwargs):
+            time.sleep(0.05)
+            return super().sell_finances_get_transactions(filter=filter, **kwargs)
+
+    api = _api([])
+    api.api_rest = _SlowRest([_tx(f'T{day}', day, order_id=f'O{day}') for day in range(1, 29)])
+    windows = [(datetime(2026, 10, day, tzinfo=UTC), datetime(2026, 10, day + 1, tzinfo=UTC))
+               for day in range(1, 1 + EbayAPI.TRANSACTION_INDEX_LIMIT)]
+    barrier = threading.Barrier(len(windows))
+
+    def fetch(window):
+        barrier.wait()
+        return api.get_transaction_index(*window)
+
+    threads = [threading.Thread(target=fetch, args=(window,)) for window in windows]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(api.api_rest.filters) == len(windows)
+    # 并发追加的索引都被保留，之后的查询全部命中
+    for window in windows:
+        api.get_transaction_index(*window)
+    assert len(api.api_rest.filters) == len(windows)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+同一个订单分别通过 GetOrders 和 Fulfillment API 获取时，转换后的字段与发货判断一致。
+"""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebaysdk.response import Response
+from ebaysdk.trading import Connection as Trading
+
+from ebayapi.ebayapi import EbayAPI
+
+GET_ORDERS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<GetOrdersResponse xmlns="urn:ebay:apis:eBLBaseComponents">
+  <Ack>Success</Ack>
+  <OrderArray>
+    <Order>
+      <OrderID>20-11111-22222</OrderID>
+      <OrderStatus>Completed</OrderStatus>
+      <CreatedTime>2026-10-01T12:00:00.000Z</CreatedTime>
+      <PaidTime>2026-10-01T12:05:00.000Z</PaidTime>
+      <Total currencyID="USD">45.50</Total>
+      <BuyerUserID>buyer_1</BuyerUserID>
+      <ShippingAddress>
+        <Name>Ann Buyer</Name>
+        <Street1>1 Main St</Street1>
+        <CityName>Springfield</CityName>
+        <StateOrProvince>IL</StateOrProvince>
+        <PostalCode>62701</PostalCode>
+        <Country>US</Country>
+        <Phone>555-0100</Phone>
+      </ShippingAddress>
+      <ShippingServiceSelected><ShippingService>USPSPriority</ShippingService></ShippingServiceSelected>
+      <TransactionArray>
+        <Transaction>
+          <Item><ItemID>380000000001</ItemID><SKU>MUG-01</SKU><Title>Mug</Title></Item>
+          <TransactionID>2500000000001</TransactionID>
+          <CreatedDate>2026-10-01T12:00:00.000Z</CreatedDate>
+          <QuantityPurchased>2</QuantityPurchased>
+          <TransactionPrice currencyID="USD">15.25</TransactionPrice>
+          <OrderLineItemID>380000000001-2500000000001</OrderLineItemID>
+          <ShippedTime>2026-10-02T08:00:00.000Z</ShippedTime>
+        </Transaction>
+        <Transaction>
+          <Item><ItemID>380000000002</ItemID><SKU>CAP-01</SKU><Title>Cap</Title></Item>
+          <TransactionID>2500000000002</TransactionID>
+          <CreatedDate>2026-10-01T12:00:00.000Z</CreatedDate>
+          <QuantityPurchased>1</QuantityPurchased>
+          <TransactionPrice currencyID="USD">15.00</TransactionPrice>
+          <OrderLineItemID>380000000002-2500000000002</OrderLineItemID>
+        </Transaction>
+      </TransactionArray>
+    </Order>
+  </OrderArray>
+</GetOrdersResponse>
+"""
+
+REST_ORDER = {
+    'order_id': '20-11111-22222',
+    'creation_date': '2026-10-01T12:00:00.000Z',
+    'last_modified_date': '2026-10-02T08:00:00.000Z',
+    'order_fulfillment_status': 'IN_PROGRESS',
+    'order_payment_status': 'PAID',
+    'cancel_status': {'cancel_state': 'NONE_REQUESTED'},
+    'buyer': {'username': 'buyer_1'},
+    'pricing_summary': {'total': {'value': '45.50', 'currency': 'USD'}},
+    'payment_summary': {'payments': [{'payment_date': '2026-10-01T12:05:00.000Z'}]},
+    'fulfillment_start_instructions': [{'shipping_step': {
+        'shipping_service_code': 'USPSPriority',
+        'ship_to': {'full_name': 'Ann Buyer', 'primary_phone': {'phone_number': '555-0100'},
+                    'contact_address': {'address_line1': '1 Main St', 'city': 'Springfield',
+                                        'state_or_province': 'IL', 'postal_code': '62701', 'country_code': 'US'}},
+    }}],
+    'line_items': [
+        {'line_item_id': '2500000000001', 'legacy_item_id': '380000000001', 'sku': 'MUG-01', 'title': 'Mug',
+         'quantity': 2, 'line_item_cost': {'value': '15.25', 'currency': 'USD'},
+         'line_item_fulfillment_status': 'FULFILLED'},
+        {'line_item_id': '2500000000002', 'legacy_item_id': '380000000002', 'sku': 'CAP-01', 'title': 'Cap',
+         'quantity': 1, 'line_item_cost': {'value': '15.00', 'currency': 'USD'},
+         'line_item_fulfillment_status': 'NOT_STARTED'},
+    ],
+}
+
+
+class _RawResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+def _trading_order():
+    connection = Trading(config_file=None, appid='x', devid='x', certid='x', token='x')
+    list_nodes, datetime_nodes = EbayAPI._trading_parse_config(connection, 'GetOrders')
+    reply = Response(_RawResponse(GET_ORDERS), verb='GetOrders', list_nodes=list_nodes,
+                     datetime_nodes=datetime_nodes).reply
+    return EbayAPI.to_dict_recursive(reply.OrderArray.Order[0])
+
+
+def _assert_subset(converted, expected, path=''):
+    """Fulfillment 转换结果中的每个非空字段都应与 GetOrders 的同名字段相同。"""
+    for key, value in converted.items():
+        if value is None:
+            continue
+        assert key in expected, f'{path}{key} 不在 GetOrders 结果中'
+        if isinstance(value, dict):
+            _assert_subset(value, expected[key], f'{path}{key}.')
+        elif isinstance(value, list):
+            assert len(value) == len(expected[key])
+            for i, (a, b) in enumerate(zip(value, expected[key])):
+                _assert_subset(a, b, f'{path}{key}[{i}].')
+        else:
+            assert value == expected[key], f'{path}{key}: {value!r} != {expected[key]!r}'
+
+
+def test_fulfillment_order_matches_get_orders():
+    trading = _trading_order()
+    converted = EbayAPI._fulfillment_order_to_trading(REST_ORDER)
+    # 订单级的发货状态只有 REST 提供
+    assert converted.pop('OrderFulfillmentStatus') == 'IN_PROGRESS'
+    _assert_subset(converted, trading)
+    # GetOrders 独有的字段（如运单号）不会出现在 REST 结果中
+    assert 'ShippingDetails' not in converted
+
+
+def test_orders_requiring_shipment_same_on_both_paths():
+    api = EbayAPI.__new__(EbayAPI)
+    api.api_trading = object()
+    api.api_rest = object()
+    api.coalesce_requests = False
+    trading = _trading_order()
+    api.get_orders_last_days = lambda days, order_status=None: [trading]
+    api.get_fulfillment_orders = lambda days, fulfillment_status=None: \
+        [EbayAPI._fulfillment_order_to_trading(REST_ORDER)]
+
+    via_trading = api.get_orders_requiring_shipment(days=7)
+    via_rest = api.get_orders_requiring_shipment(days=7, use_fulfillment_api=True)
+    assert [o['OrderID'] for o in via_trading] == [o['OrderID'] for o in via_rest] == ['20-11111-22222']
+    assert via_trading[0] is trading
+
+
+def test_rest_datetime_formats():
+    expected = datetime(2026, 10, 1, 12, 0)
+    assert EbayAPI._rest_datetime('2026-10-01T12:00:00.000Z') == expected
+    assert EbayAPI._rest_datetime('2026-10-01T12:00:00Z') == expected
+    assert EbayAPI._rest_datetime('2026-10-01T14:00:00.000+02:00') == expected
+    assert EbayAPI._rest_datetime('not a date') == 'not a date'
+    assert EbayAPI._rest_datetime(None) is None
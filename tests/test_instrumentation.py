@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+埋点（ebayapi.instrumentation）：直方图分桶、Prometheus 标签转义，以及 REST 分页生成器的事件。
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.instrumentation import HistogramCollector, Instrumentation, InstrumentedRestClient, make_event
+
+
+def test_bucket_counts_are_cumulative():
+    collector = HistogramCollector(buckets=(0.1, 1.0, 0.5))
+    for duration in (0.05, 0.1, 0.3, 0.7, 2.0):
+        collector(make_event('trading', 'GetOrders', duration))
+    collector(make_event('trading', 'GetOrders', 0.2, success=False, error='boom', records=3))
+
+    assert collector.buckets == (0.1, 0.5, 1.0)
+    series = collector._series[('trading', 'GetOrders')]
+    # 上界包含等于该值的耗时；超出所有桶的只计入 count（+Inf）
+    assert series['bucket_counts'] == [2, 4, 5]
+    summary = collector.summary()[('trading', 'GetOrders')]
+    assert summary['count'] == 6 and summary['errors'] == 1 and summary['records'] == 3
+    assert summary['duration_max'] == 2.0
+    assert summary['duration_avg'] == pytest.approx(3.35 / 6)
+
+    text = collector.to_prometheus()
+    assert 'ebayapi_call_duration_seconds_bucket{api="trading",operation="GetOrders",le="0.5"} 4' in text
+    assert 'ebayapi_call_duration_seconds_bucket{api="trading",operation="GetOrders",le="+Inf"} 6' in text
+    assert 'ebayapi_call_duration_seconds_count{api="trading",operation="GetOrders"} 6' in text
+    assert 'ebayapi_call_errors_total{api="trading",operation="GetOrders"} 1' in text
+
+
+def test_prometheus_label_escaping():
+    collector = HistogramCollector(buckets=(1.0,))
+    collector(make_event('rest', 'GET /path\\with "quotes"\nand newline', 0.5))
+    text = collector.to_prometheus(prefix='test')
+
+    escaped = 'operation="GET /path\\\\with \\"quotes\\"\\nand newline"'
+    assert f'test_records_total{{api="rest",{escaped}}} 0' in text
+    # 每个样本占一行，标签值中的换行不会拆开样本
+    for line in text.splitlines():
+        assert line.startswith('#') or line.startswith('test_')
+
+
+class _FakeRest:
+    def sell_finances_get_transactions(self, fail_after=None):
+        for i in range(3):
+            if fail_after is not None and i == fail_after:
+                raise RuntimeError('page 2 failed')
+            yield {'record': {'transaction_id': f'T{i}'}}
+        yield {'total': 3}
+
+    def sell_marketing_get_campaign(self, campaign_id):
+        return {'campaign_id': campaign_id}
+
+
+def _client():
+    events = []
+    instrumentation = Instrumentation()
+    instrumentation.add_hook(events.append)
+    return InstrumentedRestClient(_FakeRest(), instrumentation), events
+
+
+def test_generator_event_after_exhaustion():
+    client, events = _client()
+    records = client.sell_finances_get_transactions()
+    assert events == []   # 生成器耗尽前不产生事件
+    assert len(list(records)) == 4
+
+    assert len(events) == 1
+    event = events[0]
+    assert event['api'] == 'rest' and event['operation'] == 'sell_finances_get_transactions'
+    assert event['records'] == 3 and event['success'] and event['error'] is None
+
+    client.sell_marketing_get_campaign('C1')
+    assert events[1]['records'] == 1 and events[1]['operation'] == 'sell_marketing_get_campaign'
+
+
+def test_generator_error_partway_emits_error_event():
+    client, events = _client()
+    received = []
+    with pytest.raises(RuntimeError):
+        for element in client.sell_finances_get_transactions(fail_after=2):
+            received.append(element)
+
+    assert len(received) == 2
+    assert len(events) == 1
+    assert events[0]['success'] is False and events[0]['error'] == 'page 2 failed'
+    assert events[0]['records'] == 2
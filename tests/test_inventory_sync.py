@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+库存同步测试：快照的 SKU / 变体索引、差异计算、GranularityLevel 的传递和多属性商品的处理。
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.inventory_sync import InventorySnapshot, diff_inventory
+
+END_TIME = datetime.utcnow() + timedelta(days=10)
+
+
+def _item(item_id, sku=None, price='10.00', quantity='5', sold='0', variations=None):
+    item = {'ItemID': item_id, 'Quantity': quantity,
+            'SellingStatus': {'CurrentPrice': {'value': price}, 'QuantitySold': sold},
+            'ListingDetails': {'EndTime': END_TIME}}
+    if sku:
+        item['SKU'] = sku
+    if variations:
+        item['Variations'] = {'Variation': [{'SKU': v, 'Quantity': '1'} for v in variations]}
+    return item
+
+
+ITEMS = [
+    _item('1', 'MUG', price='12.50', quantity='8', sold='3'),
+    _item('2', 'CAP'),
+    _item('3', 'TEE', quantity='6', variations=['TEE-S', 'TEE-M']),
+]
+
+
+def test_diff_only_changed_items():
+    snapshot = InventorySnapshot(ITEMS[:2])
+    revisions, unchanged, unknown = diff_inventory(
+        {'MUG': (12.5, 4), 'CAP': (11.0, None), 'HAT': (None, 1)}, snapshot)
+    assert revisions == {'1': (None, 4), '2': (11.0, None)}
+    assert unknown == ['HAT'] and unchanged == 0
+    assert diff_inventory({'MUG': (12.5, 5)}, snapshot)[:2] == ({}, 1)
+
+
+def test_variation_skus_are_rejected(tmp_path):
+    snapshot = InventorySnapshot(ITEMS)
+    assert snapshot.variations == {'TEE-S': '3', 'TEE-M': '3'}
+    with pytest.raises(ValueError, match='TEE-M'):
+        diff_inventory({'MUG': (None, 1), 'TEE-M': (None, 2)}, snapshot)
+    # 多属性商品的父 SKU 同样不能按商品修改数量
+    with pytest.raises(ValueError, match='TEE'):
+        diff_inventory({'TEE': (None, 2)}, snapshot)
+
+    # 变体信息随快照保存
+    path = str(tmp_path / 'snapshot.pkl')
+    snapshot.save(path)
+    loaded = InventorySnapshot.load(path)
+    assert loaded.variations == snapshot.variations and loaded.get_sku('MUG').quantity_available == 5
+    with pytest.raises(ValueError):
+        diff_inventory({'TEE-S': (None, 1)}, loaded)
+
+
+def test_sync_inventory_threads_granularity_level():
+    api = EbayAPI.__new__(EbayAPI)
+    calls = []
+
+    def get_all_listings(days=120, granularity_level='Coarse'):
+        calls.append(granularity_level)
+        return ITEMS
+
+    api.get_all_listings = get_all_listings
+    result = api.sync_inventory({'MUG': (12.5, 2)}, dry_run=True)
+    assert calls == ['Fine'] and result['revisions'] == {'1': (None, 2)}
+    api.sync_inventory({'CAP': (None, 5)}, dry_run=True, granularity_level='Medium')
+    assert calls == ['Fine', 'Medium']
+    with pytest.raises(ValueError):
+        api.sync_inventory({'TEE-S': (None, 1)}, dry_run=True)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+日志配置（ebayapi.log）：安静模式、重复配置替换处理器，以及 JSON 行格式中的结构化字段。
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.log import LOGGER_NAME, configure_logging
+
+
+@pytest.fixture
+def package_logger():
+    logger = logging.getLogger(LOGGER_NAME)
+    handlers, level = list(logger.handlers), logger.level
+    yield logger
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+
+
+def test_quiet_suppresses_info(package_logger):
+    stream = io.StringIO()
+    configure_logging(quiet=True, stream=stream)
+    child = logging.getLogger('ebayapi.ebayapi')
+    child.info("获取订单完成")
+    child.warning("部分商品修改失败")
+
+    output = stream.getvalue()
+    assert '获取订单完成' not in output
+    assert '部分商品修改失败' in output
+
+
+def test_reconfigure_replaces_handler(package_logger):
+    first, second = io.StringIO(), io.StringIO()
+    configure_logging(stream=first)
+    handler = configure_logging(stream=second)
+
+    own = [h for h in package_logger.handlers if getattr(h, '_ebayapi_handler', False)]
+    assert own == [handler]
+    # 包导入时添加的 NullHandler 保留
+    assert any(isinstance(h, logging.NullHandler) for h in package_logger.handlers)
+    logging.getLogger('ebayapi.ebayapi').info("只输出一次")
+    assert first.getvalue() == ''
+    assert second.getvalue().count("只输出一次") == 1
+
+
+def test_structured_writes_one_json_object_per_line(package_logger):
+    stream = io.StringIO()
+    configure_logging(structured=True, stream=stream)
+    child = logging.getLogger('ebayapi.ebayapi')
+    child.info("获取 %s 个订单", 150, extra={'operation': 'GetOrders', 'count': 150, 'pages': 2, 'duration': 1.25})
+    child.debug("不输出")
+    child.error("调用失败\n第二行", extra={'operation': 'ReviseInventoryStatus', 'failed': 3})
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    first, second = (json.loads(line) for line in lines)
+    assert first['message'] == '获取 150 个订单' and first['level'] == 'INFO'
+    assert first['logger'] == 'ebayapi.ebayapi'
+    assert {k: first[k] for k in ('operation', 'count', 'pages', 'duration')} == \
+        {'operation': 'GetOrders', 'count': 150, 'pages': 2, 'duration': 1.25}
+    assert 'failed' not in first
+    assert second['message'] == '调用失败\n第二行' and second['failed'] == 3
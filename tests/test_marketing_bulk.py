@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Marketing 批量接口的分块与重试（_run_marketing_bulk），以及 update_ad_bids / remove_ads 发送的请求体和统计，
+使用假的 send_chunk 和 ebay_rest 替身，不访问 eBay。
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+import requests
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ebayapi.ebayapi as ebayapi_module
+from ebay_rest import Error
+from ebayapi.ebayapi import EbayAPI
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(ebayapi_module.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(EbayAPI, 'MARKETING_BULK_LIMIT', 3)
+    return EbayAPI.__new__(EbayAPI)
+
+
+def _requests(count):
+    return [{'listingId': str(1000 + i), 'bidPercentage': '5.0'} for i in range(count)]
+
+
+def test_chunking_and_item_retry(api):
+    calls = []
+    attempts = {}
+
+    def send_chunk(chunk):
+        calls.append([r['listingId'] for r in chunk])
+        responses = []
+        for r in chunk:
+            attempts[r['listingId']] = attempts.get(r['listingId'], 0) + 1
+            # 1001 第一次限流，1004 总是 400
+            if r['listingId'] == '1001' and attempts['1001'] == 1:
+                status = 429
+            elif r['listingId'] == '1004':
+                status = 400
+            else:
+                status = 201
+            responses.append({'listingId': r['listingId'], 'statusCode': status})
+        return {'responses': responses}
+
+    responses = api._run_marketing_bulk(send_chunk, _requests(7), max_workers=2, max_retries=2)
+    assert sorted(len(c) for c in calls[:3]) == [1, 3, 3]
+    assert calls[3:] == [['1001']]
+    assert [r['listingId'] for r in responses] == [str(1000 + i) for i in range(7)]
+    statuses = {r['listingId']: r['statusCode'] for r in responses}
+    assert statuses['1001'] == 201 and statuses['1004'] == 400
+    assert attempts['1004'] == 1
+
+
+def test_whole_chunk_client_error_not_retried(api):
+    calls = []
+
+    def send_chunk(chunk):
+        calls.append(len(chunk))
+        raise Error(number=99404, reason='Not Found')
+
+    responses = api._run_marketing_bulk(send_chunk, _requests(4), max_retries=2)
+    assert sorted(calls) == [1, 3]
+    assert all(r['statusCode'] == 404 for r in responses)
+
+
+def test_whole_chunk_transient_error_retried(api):
+    calls = []
+
+    def send_chunk(chunk):
+        calls.append(len(chunk))
+        if len(calls) == 1:
+            raise Error(number=99503, reason='Service Unavailable')
+        return {'responses': [{'listingId': r['listingId'], 'statusCode': 201} for r in chunk]}
+
+    responses = api._run_marketing_bulk(send_chunk, _requests(3), max_retries=2)
+    assert calls == [3, 3]
+    assert all(r['statusCode'] == 201 for r in responses)
+
+
+def test_missing_status_is_final(api):
+    calls = []
+
+    def send_chunk(chunk):
+        calls.append([r['listingId'] for r in chunk])
+        # 1000 的响应没有状态码，不属于可重试的临时错误
+        return {'responses': [{'listingId': r['listingId']} if r['listingId'] == '1000'
+                              else {'listingId': r['listingId'], 'statusCode': 201} for r in chunk]}
+
+    responses = api._run_marketing_bulk(send_chunk, _requests(2), max_retries=2)
+    assert calls == [['1000', '1001']]
+    assert responses[0] == {'listingId': '1000'}
+
+
+def test_whole_chunk_network_error_retried(api):
+    calls = []
+
+    def send_chunk(chunk):
+        calls.append(len(chunk))
+        if len(calls) == 1:
+            raise requests.ConnectionError('connection reset')
+        return {'responses': [{'listingId': r['listingId'], 'statusCode': 201} for r in chunk]}
+
+    responses = api._run_marketing_bulk(send_chunk, _requests(2), max_retries=2)
+    assert calls == [2, 2]
+    assert all(r['statusCode'] == 201 for r in responses)
+
+
+class _FakeBulkRest:
+    """记录批量接口请求的 ebay_rest 替身：failing 中的商品返回 400，其余成功。"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _respond(self, name, campaign_id, content_type, body):
+        with self._lock:
+            self.calls.append((name, campaign_id, content_type, body))
+        return {'responses': [
+            dict(r, statusCode=400, errors=[{'message': 'Invalid listing'}]) if r['listingId'] in self.failing
+            else dict(r, statusCode=200)
+            for r in body['requests']]}
+
+    def sell_marketing_bulk_update_ads_bid_by_listing_id(self, campaign_id, content_type, body):
+        return self._respond('update_bid', campaign_id, content_type, body)
+
+    def sell_marketing_bulk_delete_ads_by_listing_id(self, campaign_id, content_type, body):
+        return self._respond('delete', campaign_id, content_type, body)
+
+
+@pytest.fixture
+def rest_api(monkeypatch):
+    monkeypatch.setattr(ebayapi_module.time, 'sleep', lambda seconds: None)
+    api = EbayAPI.__new__(EbayAPI)
+    api.api_rest = _FakeBulkRest()
+    return api
+
+
+def test_update_ad_bids_request_body_and_chunks(rest_api):
+    rest_api.api_rest.failing = {'1007'}
+    bids = {1000 + i: 5.5 if i % 2 else 7 for i in range(1001)}
+    result = rest_api.update_ad_bids('C1', bids)
+
+    calls = rest_api.api_rest.calls
+    assert {name for name, *_ in calls} == {'update_bid'}
+    assert all(campaign == 'C1' and content_type == 'application/json' for _, campaign, content_type, _ in calls)
+    assert sorted(len(body['requests']) for *_, body in calls) == [1, 500, 500]
+    sent = {r['listingId']: r for *_, body in calls for r in body['requests']}
+    assert sent['1000'] == {'listingId': '1000', 'bidPercentage': '7'}
+    assert sent['1001'] == {'listingId': '1001', 'bidPercentage': '5.5'}
+    assert len(sent) == 1001
+
+    assert result['total_requested'] == 1001
+    assert result['total_succeeded'] == 1000 and result['total_failed'] == 1 and not result['success']
+    # 400 不重试
+    assert len(calls) == 3
+
+
+def test_remove_ads_deduplicates_listing_ids(rest_api):
+    listing_ids = [str(2000 + i) for i in range(600)] + ['2000', 2001, '2599']
+    result = rest_api.remove_ads('C2', listing_ids)
+
+    calls = rest_api.api_rest.calls
+    assert {name for name, *_ in calls} == {'delete'}
+    assert sorted(len(body['requests']) for *_, body in calls) == [100, 500]
+    sent = [r for *_, body in calls for r in body['requests']]
+    assert all(set(r) == {'listingId'} for r in sent)
+    assert sorted(r['listingId'] for r in sent) == [str(2000 + i) for i in range(600)]
+    assert result == dict(result, success=True, total_requested=600, total_succeeded=600, total_failed=0)
+    assert [r['listingId'] for r in result['responses']] == [str(2000 + i) for i in range(600)]
+
+
+def test_remove_ads_counts_failures(rest_api):
+    rest_api.api_rest.failing = {'3001', '3003'}
+    result = rest_api.remove_ads('C3', ['3000', '3001', '3002', '3003'])
+    assert result['total_requested'] == 4
+    assert result['total_succeeded'] == 2 and result['total_failed'] == 2 and not result['success']
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+消息队列测试：重复入队、重启后续发、可重试与不可重试失败的区分，以及限流等待时间的埋点。
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import requests
+from ebaysdk.exception import ConnectionError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.message_queue import MessageQueue
+
+
+def _ack_failure(code):
+    """ebaysdk 在 Ack 为 Failure 时抛出的异常：HTTP 200，响应中带错误码。"""
+    error = SimpleNamespace(ErrorCode=code, LongMessage=f'error {code}')
+    response = SimpleNamespace(status_code=200, text='<Ack>Failure</Ack>', reply=SimpleNamespace(Errors=[error]))
+    return ConnectionError(f'AddMemberMessageAAQToPartner: error {code}', response)
+
+
+class _FakeConnection:
+    """按商品 ID 返回成功或抛出预设异常的 Trading 连接。"""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+        self.request = None
+
+    def execute(self, verb, data):
+        item_id = data['ItemID']
+        self.calls.append(item_id)
+        outcome = self.outcomes.get(item_id)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(reply=SimpleNamespace(Ack='Success'), content=b'<Ack>Success</Ack>')
+
+
+def _api(connection):
+    api = EbayAPI.__new__(EbayAPI)
+    api.api_trading = connection
+    api.api_rest = None
+    api._thread_trading_connection = lambda: connection
+    api._throttle = lambda verb: 0.0
+    return api
+
+
+def _enqueue(queue, *item_ids):
+    return [queue.enqueue(item_id, 'buyer1', f'Order {item_id}', 'Thanks for your order.') for item_id in item_ids]
+
+
+def test_enqueue_deduplicates(tmp_path):
+    with MessageQueue(str(tmp_path / 'messages.db')) as queue:
+        assert _enqueue(queue, '1', '2') == [True, True]
+        assert _enqueue(queue, '1') == [False]
+        assert queue.enqueue('1', 'buyer1', 'Another subject', 'Hi') is True
+        assert queue.stats() == {'pending': 3, 'sent': 0, 'failed': 0}
+
+
+def test_failed_vs_pending_and_resume_after_restart(tmp_path):
+    path = str(tmp_path / 'messages.db')
+    with MessageQueue(path) as queue:
+        _enqueue(queue, '1', '2', '3', '4', '5')
+
+    connection = _FakeConnection({
+        '2': _ack_failure('21916'),                        # eBay 明确拒绝：不再重试
+        '3': requests.ConnectionError('connection reset'),  # 网络错误：保留为 pending
+        '4': _ack_failure('518'),                          # 调用次数超限：保留为 pending
+        '5': ConnectionError('Service Unavailable', SimpleNamespace(status_code=503, text='', reply=None)),
+    })
+    with MessageQueue(path) as queue:
+        result = _api(connection).send_queued_messages(queue, max_workers=2)
+        assert (result['sent'], result['failed'], result['pending']) == (1, 4, 3)
+        assert queue.stats() == {'pending': 3, 'sent': 1, 'failed': 1}
+        failed = queue._conn.execute("SELECT item_id, last_error FROM messages WHERE status = 'failed'").fetchall()
+        assert [row['item_id'] for row in failed] == ['2'] and '21916' in failed[0]['last_error']
+
+    # 重启后只发送仍为 pending 的消息，已发送和已失败的不会重发
+    connection = _FakeConnection({})
+    with MessageQueue(path) as queue:
+        result = _api(connection).send_queued_messages(queue)
+        assert sorted(connection.calls) == ['3', '4', '5']
+        assert result['sent'] == 3 and queue.stats() == {'pending': 0, 'sent': 4, 'failed': 1}
+        assert _api(connection).send_queued_messages(queue)['total'] == 0
+
+
+def test_retryable_failures_give_up_after_max_attempts(tmp_path):
+    connection = _FakeConnection({'1': requests.Timeout('read timed out')})
+    with MessageQueue(str(tmp_path / 'messages.db')) as queue:
+        _enqueue(queue, '1')
+        api = _api(connection)
+        api.send_queued_messages(queue, max_attempts=2)
+        assert queue.stats()['pending'] == 1
+        api.send_queued_messages(queue, max_attempts=2)
+        assert queue.stats() == {'pending': 0, 'sent': 0, 'failed': 1}
+
+
+def test_rate_limit_wait_is_instrumented():
+    events = []
+    api = _api(_FakeConnection({}))
+    api._throttle = lambda verb: 1.5
+    api.add_instrumentation_hook(events.append)
+    assert api.send_message_to_buyer('1', 'buyer1', 'Hello', 'Thanks')['success']
+    assert [(e['operation'], e['rate_limit_wait']) for e in events] == [('AddMemberMessageAAQToPartner', 1.5)]
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+推送通知测试：NotificationSignature 验证、时间偏差、乱序事件合并、challenge_response 摘要和 HTTP 请求体检查。
+"""
+import http.client
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from lxml import etree
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.notifications import (MAX_BODY_SIZE, NotificationError, NotificationReceiver, NotificationServer,
+                                   OrderStore, challenge_response, notification_signature)
+
+CREDENTIALS = {'dev_id': 'dev-1', 'app_id': 'app-1', 'cert_id': 'cert-1'}
+
+
+def _timestamp(delta=timedelta()):
+    return (datetime.now(timezone.utc) + delta).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def _notification(timestamp, signature=None, buyer_info='<BuyerInfo/>', shipped=''):
+    signature = signature or notification_signature(timestamp, **CREDENTIALS)
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">
+  <soapenv:Header>
+    <ebl:RequesterCredentials xmlns:ebl="urn:ebay:apis:eBLBaseComponents">
+      <ebl:NotificationSignature>{signature}</ebl:NotificationSignature>
+    </ebl:RequesterCredentials>
+  </soapenv:Header>
+  <soapenv:Body>
+    <GetItemTransactionsResponse xmlns="urn:ebay:apis:eBLBaseComponents">
+      <Timestamp>{timestamp}</Timestamp>
+      <Ack>Success</Ack>
+      <NotificationEventName>FixedPriceTransaction</NotificationEventName>
+      <Item><ItemID>380000000001</ItemID><SKU>MUG-01</SKU><Title>Mug</Title></Item>
+      <TransactionArray>
+        <Transaction>
+          <TransactionID>2500000000001</TransactionID>
+          <Buyer><UserID>buyer_1</UserID>{buyer_info}</Buyer>
+          <Status><CompleteStatus>Complete</CompleteStatus></Status>
+          <ContainingOrder><OrderID>20-11111-22222</OrderID><OrderStatus>Completed</OrderStatus></ContainingOrder>
+          {shipped}
+        </Transaction>
+      </TransactionArray>
+    </GetItemTransactionsResponse>
+  </soapenv:Body>
+</soapenv:Envelope>""".encode('utf-8')
+
+
+@pytest.fixture
+def receiver():
+    with OrderStore(':memory:') as store:
+        yield NotificationReceiver(store, **CREDENTIALS)
+
+
+def test_valid_signature_updates_store(receiver):
+    events = []
+    receiver.on('FixedPriceTransaction', events.append)
+    event = receiver.handle_platform_notification(_notification(_timestamp()))
+    assert event['event'] == 'FixedPriceTransaction' and events == [event]
+    order = receiver.store.get('20-11111-22222')
+    assert order['OrderStatus'] == 'Completed' and order['BuyerUserID'] == 'buyer_1'
+    # 空的 <BuyerInfo/> 不影响处理
+    assert 'ShippingAddress' not in order
+    assert [o['OrderID'] for o in receiver.store.orders_requiring_shipment()] == ['20-11111-22222']
+
+
+def test_shipping_address_from_buyer_info(receiver):
+    buyer_info = '<BuyerInfo><ShippingAddress><Name>Ann</Name><PostalCode>62701</PostalCode></ShippingAddress></BuyerInfo>'
+    receiver.handle_platform_notification(_notification(_timestamp(), buyer_info=buyer_info))
+    assert receiver.store.get('20-11111-22222')['ShippingAddress'] == {'Name': 'Ann', 'PostalCode': '62701'}
+
+
+def test_bad_signature_is_rejected(receiver):
+    timestamp = _timestamp()
+    forged = notification_signature(timestamp, 'dev-1', 'app-1', 'wrong-cert')
+    with pytest.raises(NotificationError, match='签名'):
+        receiver.handle_platform_notification(_notification(timestamp, signature=forged))
+    # 签名对应的是另一个时间戳
+    with pytest.raises(NotificationError):
+        receiver.handle_platform_notification(
+            _notification(timestamp, signature=notification_signature(_timestamp(timedelta(seconds=-5)),
+                                                                      **CREDENTIALS)))
+    assert len(receiver.store) == 0
+
+
+@pytest.mark.parametrize('skew', [timedelta(minutes=-11), timedelta(minutes=11)])
+def test_clock_skew_is_rejected(receiver, skew):
+    with pytest.raises(NotificationError, match='时间'):
+        receiver.handle_platform_notification(_notification(_timestamp(skew)))
+    receiver.handle_platform_notification(_notification(_timestamp(skew / 2)))
+    assert len(receiver.store) == 1
+
+
+def test_out_of_order_events_keep_newer_state():
+    with OrderStore(':memory:') as store:
+        shipped = {'OrderLineItemID': 'A-1', 'ShippedTime': '2026-10-02T08:00:00.000Z'}
+        store.apply_transaction('O1', {'OrderStatus': 'Completed'}, shipped, 'ItemMarkedShipped',
+                                '2026-10-02T08:00:01.000Z')
+        # 更早的 FixedPriceTransaction 晚到：不覆盖已发货的交易和订单状态
+        order = store.apply_transaction('O1', {'OrderStatus': 'Active', 'BuyerUserID': 'b'},
+                                        {'OrderLineItemID': 'A-1'}, 'FixedPriceTransaction',
+                                        '2026-10-01T12:00:00.000Z')
+        assert order['OrderStatus'] == 'Completed' and 'BuyerUserID' not in order
+        assert order['TransactionArray']['Transaction'] == [shipped]
+        assert order['ShippedTime'] == '2026-10-02T08:00:00.000Z'
+        assert store.orders_requiring_shipment() == []
+
+        # 旧事件中的新行项目仍会追加
+        order = store.apply_transaction('O1', {}, {'OrderLineItemID': 'A-2'}, 'FixedPriceTransaction',
+                                        '2026-10-01T12:00:00.000Z')
+        assert [t['OrderLineItemID'] for t in order['TransactionArray']['Transaction']] == ['A-1', 'A-2']
+        assert [o['OrderID'] for o in store.orders_requiring_shipment()] == ['O1']
+
+
+def test_challenge_response_digest():
+    code = 'a8628072-3d33-45ee-9004-bee86830a22d'
+    token = 'token-0123456789abcdefghijklmnopqrstuvwxyz'
+    endpoint = 'https://example.com/ebay/notifications'
+    expected = 'c012d0b6848c311096e55e1694c2be892e4de0a714426002c71126120d751ac8'
+    assert challenge_response(code, token, endpoint) == expected
+    receiver = NotificationReceiver(verification_token=token, endpoint_url=endpoint)
+    assert receiver.challenge(code) == {'challengeResponse': expected}
+    with pytest.raises(NotificationError):
+        NotificationReceiver().challenge(code)
+
+
+def _post(port, headers, body=b''):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        connection.putrequest('POST', '/')
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+def test_http_body_checks(receiver):
+    with NotificationServer(receiver, host='127.0.0.1', port=0) as server:
+        assert _post(server.port, {'Content-Length': 'abc'}) == 400
+        assert _post(server.port, {'Content-Length': '-1'}) == 400
+        assert _post(server.port, {'Content-Length': str(MAX_BODY_SIZE + 1)}) == 413
+        assert _post(server.port, {'Content-Length': '9'}, b'not xml!!') == 400
+        body = _notification(_timestamp(), signature='bad')
+        assert _post(server.port, {'Content-Length': str(len(body))}, body) == 412
+        body = _notification(_timestamp())
+        assert _post(server.port, {'Content-Length': str(len(body))}, body) == 200
+    assert receiver.received == 1 and receiver.rejected == 2
+
+
+def test_doctype_rejected_before_signature_check(receiver):
+    entities = ''.join(f'<!ENTITY e{i} "&e{i - 1};&e{i - 1};&e{i - 1};&e{i - 1};">' for i in range(1, 10))
+    body = _notification(_timestamp()).replace(
+        b'<soapenv:Envelope', f'<!DOCTYPE soapenv:Envelope [<!ENTITY e0 "lol">{entities}]>\n<soapenv:Envelope'.encode(), 1)
+    body = body.replace(b'<SKU>MUG-01</SKU>', b'<SKU>&e9;</SKU>')
+    with pytest.raises(ValueError, match='DOCTYPE'):
+        receiver.handle_platform_notification(body)
+
+    with NotificationServer(receiver, host='127.0.0.1', port=0) as server:
+        assert _post(server.port, {'Content-Length': str(len(body))}, body) == 400
+        # 其他编码的请求体绕过字节检查时，解析器不展开实体，解析后同样拒绝
+        utf16 = body.decode('utf-8').replace('encoding="UTF-8"', 'encoding="UTF-16"').encode('utf-16')
+        with pytest.raises((ValueError, etree.XMLSyntaxError)):
+            receiver.handle_platform_notification(utf16)
+    assert receiver.received == 0 and receiver.rejected == 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+get_orders_last_days 按时间段切分：每个时间段只回放同一窗口的录制页面，
+相邻时间段共享的边界订单按 OrderID 去重。
+"""
+
+import os
+import sys
+
+import pytest
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebayapi.replay import ReplayEnvironment
+from replay_fixtures import (FrozenDatetime, ORDER_PAGES, ORDER_SLICES, ORDERS_PER_PAGE, SLICE_DAYS,
+                             build_fixture_dir)
+
+
+@pytest.fixture(scope='module')
+def api(tmp_path_factory):
+    directory = build_fixture_dir(str(tmp_path_factory.mktemp('replay')))
+    with ReplayEnvironment(directory) as replay_api:
+        replay_api.coalesce_requests = False
+        yield replay_api
+
+
+def test_get_orders_sliced(api, monkeypatch):
+    monkeypatch.setattr('ebayapi.ebayapi.datetime', FrozenDatetime)
+    orders = api.get_orders_last_days(days=SLICE_DAYS * ORDER_SLICES, slice_days=SLICE_DAYS, max_workers=4)
+
+    order_ids = [order['OrderID'] for order in orders]
+    assert len(set(order_ids)) == len(order_ids)
+    assert len(orders) == ORDER_SLICES * ORDER_PAGES * ORDERS_PER_PAGE - (ORDER_SLICES - 1)
+    # 每个时间段的每一页都被拉取，边界订单保留在前一个时间段的位置
+    for slice_index in range(1, ORDER_SLICES + 1):
+        for page in range(1, ORDER_PAGES + 1):
+            assert f'20-{slice_index * 100 + page:05d}-{ORDERS_PER_PAGE - 1:05d}' in order_ids
+    assert order_ids.index(f'20-{100 + ORDER_PAGES:05d}-{ORDERS_PER_PAGE - 1:05d}') < order_ids.index('20-00201-00001')
+
+
+def test_unrecorded_window_is_not_served(api):
+    # 当前时间不是录制时的时间，请求窗口没有对应夹具，不会拿不带窗口的录制顶替
+    orders = api.get_orders_last_days(days=SLICE_DAYS * ORDER_SLICES, slice_days=SLICE_DAYS, max_workers=4)
+    assert orders == []
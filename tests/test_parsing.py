@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+流式解析（ebayapi.parsing）与 ebaysdk 解析 + to_dict_recursive 的结果一致性。
+"""
+
+import os
+import sys
+
+import pytest
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebaysdk.response import Response
+from ebaysdk.trading import Connection as Trading
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.parsing import TradingResponseStream, parse_trading_page
+from replay_fixtures import orders_page, seller_list_page
+
+
+class _RawResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+@pytest.fixture(scope='module')
+def connection():
+    return Trading(config_file=None, appid='x', devid='x', certid='x', token='x')
+
+
+def _sdk_records(connection, verb, content, container, element):
+    list_nodes, datetime_nodes = EbayAPI._trading_parse_config(connection, verb)
+    reply = Response(_RawResponse(content), verb=verb, list_nodes=list_nodes, datetime_nodes=datetime_nodes).reply
+    return [EbayAPI.to_dict_recursive(obj) for obj in getattr(getattr(reply, container), element)]
+
+
+@pytest.mark.parametrize('verb, page, container, element', [
+    ('GetSellerList', seller_list_page, 'ItemArray', 'Item'),
+    ('GetOrders', orders_page, 'OrderArray', 'Order'),
+])
+def test_stream_matches_ebaysdk(connection, verb, page, container, element):
+    content = page(1).encode('utf-8')
+    expected = _sdk_records(connection, verb, content, container, element)
+    list_nodes, datetime_nodes = EbayAPI._trading_parse_config(connection, verb)
+
+    streamed = list(TradingResponseStream(content, verb, container, element, list_nodes, datetime_nodes))
+    assert streamed == expected
+    parsed = parse_trading_page(content, verb, list_nodes, datetime_nodes, container, element)
+    assert parsed['records'] == expected and parsed['error'] is None
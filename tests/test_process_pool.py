@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+多进程解析（process_workers）：与逐页串行解析的结果一致，子进程中解析到 Ack=Failure 的页面时报告错误。
+"""
+
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebayapi.replay import FixtureStore, ReplayEnvironment
+from replay_fixtures import LISTING_PAGES, LISTINGS_PER_PAGE, ORDER_PAGES, orders_page, seller_list_page
+
+START = datetime(2026, 6, 1, tzinfo=timezone.utc)
+END = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+_FAILURE_PAGE = """<?xml version="1.0" encoding="UTF-8"?>
+<GetSellerListResponse xmlns="urn:ebay:apis:eBLBaseComponents">
+  <Timestamp>2026-10-19T00:00:00.000Z</Timestamp>
+  <Ack>Failure</Ack>
+  <Errors>
+    <ShortMessage>Internal error.</ShortMessage>
+    <LongMessage>Internal error to the application.</LongMessage>
+    <ErrorCode>10007</ErrorCode>
+    <SeverityCode>Error</SeverityCode>
+  </Errors>
+  <Version>1193</Version>
+</GetSellerListResponse>"""
+
+
+@pytest.fixture
+def replay(tmp_path):
+    def start(failing_page=None):
+        store = FixtureStore(str(tmp_path))
+        for page in range(1, LISTING_PAGES + 1):
+            store.save_trading('GetSellerList', page, _FAILURE_PAGE if page == failing_page
+                               else seller_list_page(page))
+        for page in range(1, ORDER_PAGES + 1):
+            store.save_trading('GetOrders', page, orders_page(page))
+        environment = ReplayEnvironment(str(tmp_path), allow_unwindowed=True)
+        api = environment.start()
+        api.coalesce_requests = False
+        environments.append(environment)
+        return api
+
+    environments = []
+    yield start
+    for environment in environments:
+        environment.stop()
+
+
+def test_process_pool_matches_serial(replay):
+    api = replay()
+    serial = api.get_all_listings(days=120, granularity_level='Fine')
+    pooled = api.get_all_listings(days=120, granularity_level='Fine', process_workers=2)
+    assert len(serial) == LISTING_PAGES * LISTINGS_PER_PAGE
+    assert pooled == serial
+
+    serial_orders = api.get_orders_last_days(days=7)
+    pooled_orders = api.get_orders_last_days(days=7, process_workers=2)
+    assert pooled_orders == serial_orders and len(serial_orders) > 0
+
+
+def test_failure_page_in_worker_reported_as_error(replay, caplog):
+    api = replay(failing_page=2)
+    pages = list(api._iter_trading_pages_in_processes(
+        'GetSellerList', lambda page: api._seller_list_request(START, END, 'Coarse', page),
+        'ItemArray', 'Item', 'HasMoreItems', 2))
+
+    # 失败页不带 HasMoreItems，之后不再请求
+    assert [page for page, _ in pages] == [1, 2]
+    assert pages[0][1]['error'] is None and len(pages[0][1]['records']) == LISTINGS_PER_PAGE
+    assert pages[1][1]['ack'] == 'Failure'
+    assert pages[1][1]['error'] == 'Internal error to the application.'
+
+    with caplog.at_level(logging.ERROR, logger='ebayapi'):
+        listings = api.get_all_listings(days=120, process_workers=2)
+    assert 'Internal error to the application.' in caplog.text
+    # 失败页之后停止，只返回失败页之前已解析的记录（结果不完整，不写入缓存）
+    assert len(listings) == LISTINGS_PER_PAGE
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+对账表的金额拆分测试：销售额、成交费、广告费、退款、运单费用按订单汇总，各列之和等于净额。
+"""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.reconciliation import ROW_FIELDS, ReconciliationTable
+
+
+def _money(value):
+    return {'value': str(value), 'currency': 'USD'}
+
+
+def _table():
+    table = ReconciliationTable()
+    table.add_order({'OrderID': 'O2', 'CreatedTime': datetime(2026, 9, 5), 'BuyerUserID': 'bob', 'Total': _money(30)})
+    table.add_order({'OrderID': 'O1', 'CreatedTime': datetime(2026, 9, 1), 'BuyerUserID': 'amy', 'Total': _money(100)})
+    for tx in [
+        # 总额 100，成交费 13.25，代收税 0 → 净额 86.75
+        {'transaction_type': 'SALE', 'booking_entry': 'CREDIT', 'order_id': 'O1', 'payout_id': 'P1',
+         'amount': _money('86.75'), 'total_fee_amount': _money('13.25'), 'total_fee_basis_amount': _money(100)},
+        {'transaction_type': 'NON_SALE_CHARGE', 'booking_entry': 'DEBIT', 'fee_type': 'AD_FEE', 'payout_id': 'P1',
+         'amount': _money('4.00'), 'references': [{'reference_type': 'ORDER_ID', 'reference_id': 'O1'}]},
+        {'transaction_type': 'SHIPPING_LABEL', 'booking_entry': 'DEBIT', 'order_id': 'O1', 'payout_id': 'P2',
+         'amount': _money('7.50')},
+        {'transaction_type': 'REFUND', 'booking_entry': 'DEBIT', 'order_id': 'O1', 'payout_id': 'P2',
+         'amount': _money('20.00')},
+        # 没有 total_fee_basis_amount 时由净额 + 费用反推总额
+        {'transaction_type': 'SALE', 'booking_entry': 'CREDIT', 'order_id': 'O2', 'payout_id': 'P2',
+         'amount': _money('26.00'), 'total_fee_amount': _money('4.00')},
+        {'transaction_type': 'NON_SALE_CHARGE', 'booking_entry': 'DEBIT', 'order_id': 'O2',
+         'transaction_memo': 'Promoted Listings fee', 'amount': _money('1.20')},
+        {'transaction_type': 'NON_SALE_CHARGE', 'booking_entry': 'DEBIT', 'order_id': 'O2',
+         'fee_type': 'INSERTION_FEE', 'amount': _money('0.35')},
+        # 店铺订阅费没有订单号
+        {'transaction_type': 'NON_SALE_CHARGE', 'booking_entry': 'DEBIT', 'payout_id': 'P2',
+         'fee_type': 'SUBSCRIPTION_FEE', 'amount': _money('21.95')},
+    ]:
+        table.add_transaction(tx)
+    table.add_payout({'payout_id': 'P1', 'amount': _money('82.75'), 'payout_status': 'SUCCEEDED'})
+    return table
+
+
+def test_per_order_breakdown():
+    rows = _table().to_rows()
+    assert [row['order_id'] for row in rows] == ['O1', 'O2']
+    o1, o2 = rows
+    assert {field: o1[field] for field in ('sale', 'fees', 'ad_fees', 'refunds', 'shipping_labels', 'other', 'net')} == {
+        'sale': 100.0, 'fees': -13.25, 'ad_fees': -4.0, 'refunds': -20.0, 'shipping_labels': -7.5,
+        'other': 0.0, 'net': 55.25}
+    assert o1['payout_ids'] == ['P1', 'P2'] and o1['transaction_count'] == 4
+    assert o1['buyer'] == 'amy' and o1['order_total'] == 100.0 and o1['currency'] == 'USD'
+    assert (o2['sale'], o2['fees'], o2['ad_fees'], o2['other'], o2['net']) == (30.0, -4.0, -1.2, -0.35, 24.45)
+    for row in rows:
+        parts = row['sale'] + row['fees'] + row['ad_fees'] + row['refunds'] + row['shipping_labels'] + row['other']
+        assert round(parts, 2) == row['net']
+
+
+def test_totals_and_payouts():
+    table = _table()
+    assert len(table) == 2
+    assert table.totals() == {'sale': 130.0, 'fees': -17.25, 'ad_fees': -5.2, 'refunds': -20.0,
+                              'shipping_labels': -7.5, 'other': -0.35, 'net': 79.7, 'orders': 2,
+                              'unmatched': -21.95}
+    summary = table.payout_summary()
+    assert summary['P1']['transactions_total'] == 82.75 and summary['P1']['difference'] == 0.0
+    assert summary['P2']['transactions_total'] == round(-7.5 - 20 + 26 - 21.95, 2)
+    assert summary['P2']['amount'] is None
+
+
+def test_order_without_transactions_and_dataframe():
+    table = ReconciliationTable()
+    table.add_order({'OrderID': 'O9', 'CreatedTime': datetime(2026, 9, 9)})
+    rows = table.to_rows()
+    assert rows == [{'order_id': 'O9', 'order_date': datetime(2026, 9, 9), 'buyer': None, 'order_total': None,
+                     'currency': None, 'sale': 0.0, 'fees': 0.0, 'ad_fees': 0.0, 'refunds': 0.0,
+                     'shipping_labels': 0.0, 'other': 0.0, 'net': 0.0, 'payout_ids': [], 'transaction_count': 0}]
+    assert list(_table().to_dataframe().columns) == list(ROW_FIELDS)
+    assert ReconciliationTable().to_rows() == []
+
+
+def test_csv_export(tmp_path):
+    path = tmp_path / 'recon.csv'
+    _table().to_csv(str(path))
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert lines[0] == ','.join(ROW_FIELDS)
+    assert lines[1].startswith('O1,2026-09-01 00:00:00,amy,100.0,USD,100.0,-13.25,-4.0,-20.0,-7.5,0.0,55.25,P1;P2,4')
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+紧凑记录类型（ebayapi.records）的字段提取、比较与 to_dict。
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.records import Ad, Listing, Order, Transaction
+
+ITEM = {
+    'ItemID': '123', 'SKU': 'SKU-1', 'Title': 'Camera', 'Quantity': '10', 'ListingType': 'FixedPriceItem',
+    'SellingStatus': {'CurrentPrice': {'value': '19.99'}, 'QuantitySold': '3', 'ListingStatus': 'Active'},
+    'PrimaryCategory': {'CategoryID': '625'},
+    'ListingDetails': {'StartTime': datetime(2026, 9, 1), 'EndTime': datetime(2026, 11, 1),
+                       'ViewItemURL': 'https://www.ebay.com/itm/123'},
+}
+
+ORDER = {
+    'OrderID': '20-1', 'OrderStatus': 'Completed', 'BuyerUserID': 'buyer', 'Total': {'value': '39.98'},
+    'CreatedTime': datetime(2026, 10, 1), 'PaidTime': datetime(2026, 10, 1, 0, 5),
+    'TransactionArray': {'Transaction': {
+        'TransactionID': 'T1', 'OrderLineItemID': '123-T1', 'QuantityPurchased': '2',
+        'TransactionPrice': {'value': '19.99'}, 'Item': {'ItemID': '123', 'Title': 'Camera'},
+        'Variation': {'SKU': 'SKU-1-RED'},
+        'ShippingDetails': {'ShipmentTrackingDetails': [{'ShipmentTrackingNumber': '1Z'}, {}]},
+    }},
+}
+
+
+def test_listing_from_dict():
+    listing = Listing.from_dict(ITEM)
+    assert (listing.item_id, listing.sku, listing.price, listing.quantity, listing.quantity_sold) == \
+        ('123', 'SKU-1', 19.99, 10, 3)
+    assert listing.quantity_available == 7
+    assert listing.category_id == '625' and listing.listing_status == 'Active'
+    assert listing.is_active(now=datetime(2026, 10, 15, tzinfo=timezone.utc))
+    assert not listing.is_active(now=datetime(2026, 11, 2, tzinfo=timezone.utc))
+    assert listing.raw is None and Listing.from_dict(ITEM, keep_raw=True).raw is ITEM
+    assert Listing.from_dict({'ItemID': '1', 'StartPrice': '5'}).price == 5.0
+
+
+def test_order_and_transactions():
+    order = Order.from_dict(ORDER)
+    assert order.total == 39.98 and order.item_ids == ('123',)
+    transaction = order.transactions[0]
+    assert isinstance(transaction, Transaction)
+    assert (transaction.sku, transaction.quantity, transaction.price, transaction.tracking_numbers) == \
+        ('SKU-1-RED', 2, 19.99, ('1Z',))
+    as_dict = order.to_dict()
+    assert as_dict['transactions'][0]['transaction_id'] == 'T1'
+    assert 'raw' not in as_dict
+
+
+def test_ad_snake_and_camel_case():
+    camel = Ad.from_dict({'adId': 'A1', 'listingId': 123, 'bidPercentage': '5.5', 'adStatus': 'ACTIVE'})
+    snake = Ad.from_dict({'ad_id': 'A1', 'listing_id': '123', 'bid_percentage': 5.5, 'ad_status': 'ACTIVE'})
+    assert camel == snake
+    assert camel.listing_id == '123' and camel.bid_percentage == 5.5
+
+
+def test_equality_hash_and_slots():
+    assert Listing.from_dict(ITEM) == Listing.from_dict(ITEM)
+    assert Listing.from_dict(ITEM) != Listing.from_dict(dict(ITEM, SKU='SKU-2'))
+    assert Listing(item_id='1') != Ad(ad_id='1')
+    with pytest.raises(TypeError):
+        hash(Listing(item_id='1'))
+    assert not hasattr(Listing(), '__dict__')
+    assert Listing._field_names[0] == 'item_id' and 'raw' not in Order._field_names
+    assert repr(Ad(ad_id='A1')).startswith("Ad(ad_id='A1'")
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+录制回放（ebayapi.replay）的夹具匹配规则。
+"""
+
+import os
+import sys
+
+import pytest
+
+# 添加父目录到路径以便导入 ebayapi 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebaysdk.trading import Connection as Trading
+
+from ebayapi.replay import ANY_PARAMS, FixtureMissing, FixtureStore, ReplayRestClient, _request_window
+
+
+def test_rest_fixture_exact_and_wildcard(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    store.save_rest('sell_marketing_get_ads', {'args': ['C1'], 'kwargs': {}}, [{'record': 1}], generator=True)
+    store.save_rest('sell_finances_get_transactions', ANY_PARAMS, [{'record': 2}], generator=True)
+    client = ReplayRestClient(store)
+
+    assert list(client.sell_marketing_get_ads('C1')) == [{'record': 1}]
+    assert list(client.sell_finances_get_transactions(filter='transactionDate:[now]')) == [{'record': 2}]
+    # 同一方法的其他参数不会退而使用无关的录制
+    with pytest.raises(FixtureMissing):
+        client.sell_marketing_get_ads('C2')
+    with pytest.raises(FixtureMissing):
+        client.sell_fulfillment_get_orders()
+
+
+def test_http_fixture_miss(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    store.save_http('GET', '/sell/feed/v1/task/1', None, 200, {}, {'status': 'COMPLETED'})
+    assert store.load_http('GET', '/sell/feed/v1/task/1', None)['body'] == {'status': 'COMPLETED'}
+    assert store.load_http('GET', '/sell/feed/v1/task/1', {'x': '1'}) is None
+    assert store.load_http('GET', '/sell/feed/v1/task/2', None) is None
+
+
+def test_trading_fixture_keyed_by_window(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    first = {'CreateTimeFrom': '2026-10-01T00:00:00+00:00', 'CreateTimeTo': '2026-10-08T00:00:00+00:00'}
+    second = {'CreateTimeFrom': '2026-10-08T00:00:00+00:00', 'CreateTimeTo': '2026-10-15T00:00:00+00:00'}
+    store.save_trading('GetOrders', 1, b'<first/>', _request_window(dict(first, OrderStatus='All')))
+    store.save_trading('GetOrders', 1, b'<second/>', _request_window(second))
+    store.save_trading('GetOrders', 1, b'<any/>')
+
+    # 录制时取自请求字典，回放时取自桩服务器收到的 XML，两者得到相同的窗口
+    connection = Trading(config_file=None, appid='x', devid='x', certid='x', token='x')
+    body = connection.build_request_data('GetOrders', dict(second, Pagination={'PageNumber': 1}), None)
+    assert _request_window(body) == second
+
+    assert store.load_trading('GetOrders', 1, _request_window(first)) == b'<first/>'
+    assert store.load_trading('GetOrders', 1, _request_window(body)) == b'<second/>'
+    # 没有对应窗口的夹具时不会用不区分窗口的夹具顶替，除非显式允许
+    other = {'CreateTimeFrom': '2026-09-01T00:00:00+00:00', 'CreateTimeTo': '2026-09-08T00:00:00+00:00'}
+    with pytest.raises(FixtureMissing, match='allow_unwindowed'):
+        store.load_trading('GetOrders', 1, other)
+    assert store.load_trading('GetOrders', 1) == b'<any/>'
+
+    lenient = FixtureStore(str(tmp_path), allow_unwindowed=True)
+    assert lenient.load_trading('GetOrders', 1, other) == b'<any/>'
+    assert lenient.load_trading('GetOrders', 1, _request_window(first)) == b'<first/>'
+    with pytest.raises(FixtureMissing):
+        lenient.load_trading('GetOrders', 2, other)
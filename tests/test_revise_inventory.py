@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+批量修改库存（revise_inventory_bulk）：每次调用 4 个商品、跳过未变化的商品、
+Ack=Failure 时按 ErrorParameters 拆分逐商品结果，以及无效数量在提交前被拒绝。
+"""
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+from ebaysdk.exception import ConnectionError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+
+
+def _listing(item_id, price, quantity, quantity_sold=0):
+    return {'ItemID': item_id, 'Quantity': str(quantity),
+            'SellingStatus': {'CurrentPrice': {'value': str(price)}, 'QuantitySold': str(quantity_sold)}}
+
+
+def _success(chunk):
+    return SimpleNamespace(reply={'Ack': 'Success', 'InventoryStatus': [
+        {'ItemID': entry['ItemID'], 'StartPrice': entry.get('StartPrice'), 'Quantity': entry.get('Quantity')}
+        for entry in chunk]})
+
+
+def _api(respond=_success):
+    api = EbayAPI.__new__(EbayAPI)
+    api.api_trading = object()
+    api.api_rest = None
+    api._thread_trading_connection = lambda: api.api_trading
+    api._throttle = lambda verb: 0.0
+    api.calls = []
+    lock = threading.Lock()
+
+    def trading_execute(connection, verb, data=None, page=None, rate_limit_wait=0.0, **kwargs):
+        assert verb == 'ReviseInventoryStatus'
+        with lock:
+            api.calls.append(data['InventoryStatus'])
+        return respond(data['InventoryStatus'])
+
+    api._trading_execute = trading_execute
+    return api
+
+
+def test_packs_four_items_per_call():
+    api = _api()
+    revisions = {str(1000 + i): (10 + i, 5) for i in range(10)}
+    result = api.revise_inventory_bulk(revisions, skip_unchanged=False)
+
+    assert result['success'] and result['revised'] == 10 and result['calls'] == 3
+    assert sorted(len(chunk) for chunk in api.calls) == [2, 4, 4]
+    sent = {entry['ItemID']: entry for chunk in api.calls for entry in chunk}
+    assert sent['1003'] == {'ItemID': '1003', 'StartPrice': '13.00', 'Quantity': '5'}
+
+
+def test_skips_items_already_at_target():
+    api = _api()
+    current = [
+        _listing('1', 19.99, 10, quantity_sold=3),   # 可售 7
+        _listing('2', 5.0, 4),
+        _listing('3', 8.5, 2),
+    ]
+    revisions = {
+        '1': (19.991, 7),     # 四舍五入后价格相同，可售数量相同
+        '2': (None, 3),       # 只修改数量
+        '3': (8.49, None),    # 只修改价格
+        '4': (1.0, 1),        # 不在当前商品中，总是提交
+    }
+    result = api.revise_inventory_bulk(revisions, current_listings=current)
+
+    assert result['results']['1']['status'] == 'unchanged'
+    assert result['unchanged'] == 1 and result['revised'] == 3 and result['calls'] == 1
+    assert sorted(api.calls[0], key=lambda entry: entry['ItemID']) == [
+        {'ItemID': '2', 'Quantity': '3'},
+        {'ItemID': '3', 'StartPrice': '8.49'},
+        {'ItemID': '4', 'StartPrice': '1.00', 'Quantity': '1'},
+    ]
+
+
+def test_partial_failure_maps_error_parameters_to_items():
+    def respond(chunk):
+        reply = {'Ack': 'Failure',
+                 'InventoryStatus': [{'ItemID': '1', 'Quantity': '2'}, {'ItemID': '3', 'Quantity': '2'}],
+                 'Errors': [
+                     {'SeverityCode': 'Error', 'LongMessage': 'Item 2 has ended.',
+                      'ErrorParameters': {'ParamID': '0', 'Value': '2'}},
+                     {'SeverityCode': 'Warning', 'LongMessage': 'ignored',
+                      'ErrorParameters': [{'ParamID': '0', 'Value': '4'}]},
+                     {'SeverityCode': 'Error', 'LongMessage': 'Invalid quantity for item 4.',
+                      'ErrorParameters': [{'ParamID': '0', 'Value': '4'}]},
+                 ]}
+        raise ConnectionError('ReviseInventoryStatus: Failure', SimpleNamespace(reply=reply))
+
+    api = _api(respond)
+    result = api.revise_inventory_bulk({str(i): (None, 2) for i in range(1, 5)}, skip_unchanged=False)
+
+    outcomes = result['results']
+    assert not result['success'] and result['revised'] == 2 and result['failed'] == 2
+    assert outcomes['1']['status'] == outcomes['3']['status'] == 'revised'
+    assert outcomes['2'] == {'status': 'failed', 'price': None, 'quantity': '2', 'error': 'Item 2 has ended.'}
+    assert outcomes['4']['error'] == 'Invalid quantity for item 4.'
+
+
+def test_invalid_quantities_rejected_before_any_call():
+    api = _api()
+    result = api.revise_inventory_bulk({'1': (None, -1), '2': (None, 'abc'), '3': (None, 2.5),
+                                        '4': (-3, None), '5': (None, True)}, skip_unchanged=False)
+
+    assert api.calls == []
+    assert result['failed'] == 5 and result['calls'] == 0 and not result['success']
+    assert result['results']['1']['error'] == '库存数量不能为负数'
+
+    # 同批中有效的商品照常提交，无效的商品不会出现在请求中
+    result = api.revise_inventory_bulk({'1': (None, -1), '2': (None, 3)}, skip_unchanged=False)
+    assert api.calls == [[{'ItemID': '2', 'Quantity': '3'}]]
+    assert result['results']['1']['status'] == 'failed' and result['results']['2']['status'] == 'revised'
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+createShippingFulfillment 的重试与去重：只在连接失败和可重试状态码时重发，
+读超时后先查询已有发货记录；批次内重复行复制第一次提交的结果；发货时间转换为 UTC。
+"""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+import urllib3
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.fulfillment import FulfillmentLedger
+
+FULFILLMENT_PATH = '/sell/fulfillment/v1/order/{}/shipping_fulfillment'
+
+
+class _Response:
+    def __init__(self, status_code=201, data=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = '' if status_code < 400 else f'error {status_code}'
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+def _http_error(status):
+    return requests.HTTPError(f'{status} error', response=_Response(status))
+
+
+def _connect_error():
+    reason = urllib3.exceptions.NewConnectionError(None, 'Failed to establish a new connection')
+    return requests.ConnectionError(urllib3.exceptions.MaxRetryError(None, '/', reason))
+
+
+class _FakeRest:
+    """按顺序返回预设结果的 _rest_request；fulfillments 模拟 eBay 已保存的发货记录。"""
+
+    def __init__(self, post_outcomes=(), fulfillments=None):
+        self.post_outcomes = list(post_outcomes)
+        self.fulfillments = fulfillments if fulfillments is not None else {}
+        self.calls = []
+
+    def __call__(self, method, path, params=None, body=None, **kwargs):
+        self.calls.append((method, path, body))
+        order_id = path.split('/')[5]
+        if method == 'GET':
+            return _Response(200, {'fulfillments': [
+                {'fulfillmentId': fid, 'shipmentTrackingNumber': tracking}
+                for tracking, fid in self.fulfillments.get(order_id, {}).items()]})
+        outcome = self.post_outcomes.pop(0) if self.post_outcomes else None
+        if outcome == 'created_then_timeout':
+            self.fulfillments.setdefault(order_id, {})[body['trackingNumber']] = f'F-{order_id}'
+            raise requests.ReadTimeout('read timed out')
+        if isinstance(outcome, Exception):
+            raise outcome
+        fulfillment_id = f'F-{order_id}-{len(self.calls)}'
+        self.fulfillments.setdefault(order_id, {})[body['trackingNumber']] = fulfillment_id
+        return _Response(201, headers={'Location': f'https://api.ebay.com{path}/{fulfillment_id}'})
+
+    def posts(self):
+        return [call for call in self.calls if call[0] == 'POST']
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr('ebayapi.ebayapi.time.sleep', lambda seconds: None)
+
+
+def _api(fake):
+    api = EbayAPI.__new__(EbayAPI)
+    api.api_rest = object()
+    api._rest_request = fake
+    return api
+
+
+def _create(api, order_id='1-1', **kwargs):
+    return api.create_shipping_fulfillment(order_id, 'TRACK1', 'USPS', line_items=['L1'], **kwargs)
+
+
+def test_read_timeout_after_creation_is_not_resubmitted():
+    fake = _FakeRest(['created_then_timeout'])
+    result = _create(_api(fake))
+    assert result['success'] and result['fulfillment_id'] == 'F-1-1'
+    assert len(fake.posts()) == 1
+    assert fake.calls[1] == ('GET', FULFILLMENT_PATH.format('1-1'), None)
+
+
+def test_read_timeout_before_creation_is_resubmitted():
+    fake = _FakeRest([requests.ReadTimeout('read timed out')])
+    result = _create(_api(fake))
+    assert result['success'] and len(fake.posts()) == 2
+
+
+def test_connect_error_and_429_are_retried_without_lookup():
+    fake = _FakeRest([_connect_error(), _http_error(429)])
+    result = _create(_api(fake))
+    assert result['success'] and [call[0] for call in fake.calls] == ['POST', 'POST', 'POST']
+
+
+def test_non_retryable_status_and_exhausted_retries():
+    fake = _FakeRest([_http_error(400)])
+    result = _create(_api(fake))
+    assert not result['success'] and result['status_code'] == 400 and len(fake.calls) == 1
+
+    fake = _FakeRest([_http_error(503)] * 3)
+    result = _create(_api(fake), max_retries=2)
+    assert not result['success'] and result['status_code'] == 503 and len(fake.posts()) == 3
+
+
+def test_failed_lookup_does_not_resubmit():
+    fake = _FakeRest([requests.ReadTimeout('read timed out')])
+
+    def rest(method, path, **kwargs):
+        if method == 'GET':
+            raise requests.ConnectionError('connection reset')
+        return fake(method, path, **kwargs)
+
+    result = _create(_api(rest))
+    assert not result['success'] and '无法确认' in result['error'] and len(fake.posts()) == 1
+
+
+def test_shipped_time_is_converted_to_utc():
+    fake = _FakeRest()
+    shipped = datetime(2026, 10, 1, 20, 30, tzinfo=timezone(timedelta(hours=8)))
+    _create(_api(fake), shipped_time=shipped)
+    assert fake.posts()[0][2]['shippedDate'] == '2026-10-01T12:30:00.000Z'
+
+    naive = datetime(2026, 10, 1, 20, 30)
+    _create(_api(fake), order_id='1-2', shipped_time=naive)
+    expected = naive.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    assert fake.posts()[1][2]['shippedDate'] == expected
+
+
+def test_bulk_duplicates_copy_primary_result(tmp_path):
+    fake = _FakeRest([None, _http_error(400)])
+    shipments = [
+        {'order_id': '1-1', 'tracking_number': 'T1', 'shipping_carrier': 'USPS', 'line_items': ['L1']},
+        {'order_id': '1-2', 'tracking_number': 'T2', 'shipping_carrier': 'USPS', 'line_items': ['L2']},
+        {'order_id': '1-1', 'tracking_number': 'T1', 'shipping_carrier': 'USPS', 'line_items': ['L1']},
+        {'order_id': '1-2', 'tracking_number': 'T2', 'shipping_carrier': 'USPS', 'line_items': ['L2']},
+    ]
+    with FulfillmentLedger(str(tmp_path / 'ledger.db')) as ledger:
+        result = _api(fake).bulk_create_shipping_fulfillments(shipments, ledger=ledger, max_workers=1)
+        first, failed, duplicate, failed_duplicate = result['results']
+        assert first['success'] and not first['skipped']
+        assert duplicate == dict(first, skipped=True)
+        assert not failed['success'] and not failed_duplicate['success'] and failed_duplicate['skipped']
+        assert (result['submitted'], result['succeeded'], result['failed'], result['skipped']) == (2, 1, 1, 2)
+        assert len(fake.posts()) == 2
+
+        # 台账中已有的组合直接跳过
+        again = _api(_FakeRest()).bulk_create_shipping_fulfillments(shipments[:1], ledger=ledger)
+        assert again['skipped'] == 1 and again['results'][0]['fulfillment_id'] == first['fulfillment_id']
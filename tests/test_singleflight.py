@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+并发相同请求的合并（ebayapi.singleflight）与 EbayAPI 实例上的锁。
+"""
+
+import copy
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebayapi.ebayapi import EbayAPI, _coalesced
+from ebayapi.replay import ReplayEnvironment
+from ebayapi.singleflight import SingleFlight
+from replay_fixtures import LISTING_PAGES, build_fixture_dir
+
+
+def _run_concurrently(count, target):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_waiters_get_independent_copies():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return [{'ItemID': '1'}]
+
+    results = _run_concurrently(4, lambda: flight.do('key', fetch, copy=copy.deepcopy)[0])
+    assert len(calls) == 1 and flight.shared == 3
+    assert all(result == [{'ItemID': '1'}] for result in results)
+    assert len({id(result) for result in results}) == 4
+    results[0][0]['ItemID'] = 'changed'
+    assert all(result[0]['ItemID'] == '1' for result in results[1:])
+
+
+def test_waiters_raise_their_own_exception_copy():
+    from ebay_rest import Error
+    flight = SingleFlight()
+
+    cause = OSError('connection reset')
+
+    def fetch():
+        time.sleep(0.1)
+        raise Error(number=99503, reason='Service Unavailable', cause=cause)
+
+    def call():
+        try:
+            flight.do('key', fetch)
+        except Error as e:
+            return e
+
+    errors = _run_concurrently(4, call)
+    assert all(isinstance(e, Error) and e.number == 99503 and e.reason == 'Service Unavailable' for e in errors)
+    assert len({id(e) for e in errors}) == 4
+    assert all(e.__cause__ is cause for e in errors)
+    # 每个线程的回溯各自独立
+    assert len({id(e.__traceback__) for e in errors}) == 4
+
+
+class _Listings(EbayAPI):
+    def __init__(self):
+        self.calls = []
+
+    @_coalesced
+    def listings(self, since=None):
+        self.calls.append(since)
+        time.sleep(0.1)
+        return [{'ItemID': '1'}]
+
+
+def test_coalesced_methods_return_copies_and_skip_unserializable_args():
+    api = _Listings()
+    since = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    results = _run_concurrently(4, lambda: api.listings(since))
+    assert len(api.calls) == 1
+    assert len({id(result) for result in results}) == 4
+
+    # 没有确定序列化方式的参数不作为合并键，每次调用各自执行
+    api.calls.clear()
+    marker = object()
+    _run_concurrently(3, lambda: api.listings(marker))
+    assert len(api.calls) == 3
+
+
+def test_concurrent_reads_coalesced(tmp_path):
+    seller_list_calls = []
+
+    def hook(event):
+        if event['api'] == 'trading' and event['operation'] == 'GetSellerList':
+            seller_list_calls.append(event)
+            time.sleep(0.05)   # 让其余线程在第一次拉取结束前到达
+
+    with ReplayEnvironment(build_fixture_dir(str(tmp_path)), allow_unwindowed=True) as api:
+        api.add_instrumentation_hook(hook)
+        results = _run_concurrently(8, api.get_active_listings)
+
+    assert len(seller_list_calls) == LISTING_PAGES
+    # 每个线程拿到各自的副本
+    assert all(result == results[0] for result in results)
+    assert len({id(result) for result in results}) == len(results)
+
+
+def test_locks_are_per_instance():
+    first, second = EbayAPI.__new__(EbayAPI), EbayAPI.__new__(EbayAPI)
+    assert first._state_lock is first._state_lock
+    assert first._state_lock is not second._state_lock
+    assert first._rate_limiters_lock is not second._rate_limiters_lock
+    assert first.get_rate_limiter('ReviseInventoryStatus') is not second.get_rate_limiter('ReviseInventoryStatus')
+
+    # 一个实例持有锁时不阻塞其他实例
+    with first._state_lock:
+        assert second._state_lock.acquire(timeout=1)
+        second._state_lock.release()
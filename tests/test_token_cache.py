@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+共享令牌缓存（ebayapi.token_cache）：并发初始化只刷新一次，ebay_rest 内部实现不兼容时退回普通路径。
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ebay_rest.token import _OAuthToken
+
+from ebayapi.ebayapi import EbayAPI
+from ebayapi.token_cache import TokenCache
+
+
+class _FakeUserToken:
+    """模拟 ebay_rest 的 UserToken：get() 即一次 OAuth 刷新，计入共享的计数器。"""
+
+    def __init__(self, counter: list):
+        self.counter = counter
+        self._user_scopes = None
+        self._user_token = None
+
+    def _determine_user_scopes(self):
+        self._user_scopes = ['https://api.ebay.com/oauth/api_scope/sell.fulfillment']
+
+    def get(self):
+        self.counter.append(1)
+        time.sleep(0.1)
+        expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=2)
+        self._user_token = _OAuthToken(access_token=f'token-{len(self.counter)}', token_expiry=expiry)
+        return self._user_token.access_token
+
+
+class _FakeRest:
+    def __init__(self, user_token):
+        self._user_token = user_token
+
+
+def _make_api(cache, user_token):
+    api = EbayAPI.__new__(EbayAPI)
+    api.application = 'app'
+    api.user = 'seller'
+    api.token_cache = cache
+    api.api_rest = _FakeRest(user_token)
+    return api
+
+
+def test_concurrent_instances_refresh_once(tmp_path):
+    counter = []
+    cache = TokenCache(str(tmp_path / 'tokens.json'))
+    apis = [_make_api(cache, _FakeUserToken(counter)) for _ in range(4)]
+    tokens = [None] * len(apis)
+    barrier = threading.Barrier(len(apis))
+
+    def init(index):
+        barrier.wait()
+        tokens[index] = apis[index]._user_access_token()
+
+    threads = [threading.Thread(target=init, args=(i,)) for i in range(len(apis))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(counter) == 1
+    assert tokens == ['token-1'] * len(apis)
+    # 读到缓存的实例也把令牌注入了 ebay_rest，之后不会再刷新
+    assert all(api.api_rest._user_token._user_token.access_token == 'token-1' for api in apis)
+    assert cache.get('app', 'seller', apis[0].api_rest._user_token._user_scopes)[0] == 'token-1'
+
+
+def test_threads_sharing_instance_refresh_once(tmp_path):
+    counter = []
+    api = _make_api(TokenCache(str(tmp_path / 'tokens.json')), _FakeUserToken(counter))
+    tokens = []
+    barrier = threading.Barrier(4)
+
+    def init():
+        barrier.wait()
+        tokens.append(api._user_access_token())
+
+    threads = [threading.Thread(target=init) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(counter) == 1
+    assert tokens == ['token-1'] * 4
+
+
+def test_falls_back_when_ebay_rest_internals_missing(tmp_path):
+    class _OtherUserToken:
+        def __init__(self):
+            self.calls = 0
+
+        def get(self):
+            self.calls += 1
+            return 'direct'
+
+    cache = TokenCache(str(tmp_path / 'tokens.json'))
+    user_token = _OtherUserToken()
+    api = _make_api(cache, user_token)
+
+    assert api._user_access_token() == 'direct'
+    assert user_token.calls == 1
+    assert not os.path.exists(cache.path)
+
+
+def test_falls_back_when_oauth_token_class_missing(tmp_path, monkeypatch):
+    counter = []
+    cache = TokenCache(str(tmp_path / 'tokens.json'))
+    api = _make_api(cache, _FakeUserToken(counter))
+    monkeypatch.setattr(EbayAPI, '_oauth_token_class', staticmethod(lambda: None))
+
+    assert api._user_access_token() == 'token-1'
+    assert not os.path.exists(cache.path)